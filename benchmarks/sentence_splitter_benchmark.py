@@ -0,0 +1,102 @@
+"""
+Compares splitting a streamed LLM reply with `split_sentences` on the whole
+unconfirmed buffer after every chunk (the previous handle_text_message loop)
+against `StreamingSentenceSplitter`.
+
+Usage:
+    python -m benchmarks.sentence_splitter_benchmark
+    python -m benchmarks.sentence_splitter_benchmark --chunk-chars 1 --sentences 50 200
+
+Each reply is built from varied English sentences and fed in chunks of
+`--chunk-chars` characters (1 matches DummyLLM, a few characters is closer to
+real token streams). The report shows the milliseconds spent splitting per
+reply and whether each splitter produced the same sentences as
+`split_sentences` on the complete reply. The buffer loop stripped the
+unconfirmed text after every chunk, so it loses the spaces that fall on chunk
+boundaries and fails that check.
+"""
+import argparse
+import time
+from typing import Callable, List
+
+from src.utils.sentence_splitter import StreamingSentenceSplitter, split_sentences
+
+SENTENCES = [
+    "Sure, I can help you with that.",
+    "Let me think about it for a moment.",
+    "The museum opens at 9 a.m. and closes at 5 p.m. on weekdays.",
+    "Dr. Smith said the results look promising!",
+    "Did you know that it costs about 3.50 dollars?",
+    "That is a great question, and the answer depends on a few things.",
+    "First, we need to check the weather.",
+    "Then, if it is sunny, we can go for a walk in the park.",
+]
+
+
+def make_reply(num_sentences: int) -> str:
+    return " ".join(SENTENCES[i % len(SENTENCES)] for i in range(num_sentences))
+
+
+def chunked(text: str, size: int) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def split_with_buffer(chunks: List[str]) -> List[str]:
+    """The loop handle_text_message used before the streaming splitter."""
+    result = []
+    sentence_buffer = ""
+    first_sentence_processed = False
+    for chunk in chunks:
+        sentence_buffer += chunk
+        sentences = split_sentences(sentence_buffer, faster_first_response=not first_sentence_processed)
+        if sentences:
+            for sentence in sentences[:-1]:
+                if sentence.strip():
+                    result.append(sentence)
+                    first_sentence_processed = True
+            sentence_buffer = sentences[-1]
+    if sentence_buffer.strip():
+        result.append(sentence_buffer)
+    return result
+
+
+def split_streaming(chunks: List[str]) -> List[str]:
+    splitter = StreamingSentenceSplitter(faster_first_response=True)
+    result = []
+    for chunk in chunks:
+        result.extend(splitter.feed(chunk))
+    remaining = splitter.flush()
+    if remaining.strip():
+        result.append(remaining)
+    return result
+
+
+def time_ms(split: Callable[[List[str]], List[str]], chunks: List[str], repeats: int) -> tuple[float, List[str]]:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        sentences = split(chunks)
+    return 1000 * (time.perf_counter() - start) / repeats, sentences
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[5, 20, 80], help="Reply lengths in sentences.")
+    parser.add_argument("--chunk-chars", type=int, default=4, help="Characters per streamed chunk.")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'sentences':>10}{'chars':>8}{'buffer ms':>12}{'streaming ms':>14}{'speedup':>10}{'buffer ok':>11}{'streaming ok':>14}")
+    for num_sentences in args.sentences:
+        reply = make_reply(num_sentences)
+        expected = split_sentences(reply)
+        chunks = chunked(reply, args.chunk_chars)
+        legacy_ms, legacy_sentences = time_ms(split_with_buffer, chunks, args.repeats)
+        streaming_ms, streaming_sentences = time_ms(split_streaming, chunks, args.repeats)
+        print(
+            f"{num_sentences:>10}{len(reply):>8}{legacy_ms:>12.1f}{streaming_ms:>14.1f}"
+            f"{legacy_ms / streaming_ms:>9.1f}x{str(legacy_sentences == expected):>11}{str(streaming_sentences == expected):>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
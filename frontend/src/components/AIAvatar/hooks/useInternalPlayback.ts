@@ -1,10 +1,14 @@
 import { useCallback, useEffect, useRef, useState } from 'react';
 import { AIAvatarAction, AiState, PlaybackTask } from '../state/types';
-import { audioBufferToWav } from '../utils/audio';
+import { AudioChunkStream } from '../services/audioStream';
+import { audioBufferToWav, StreamingAudioSplitter } from '../utils/audio';
 
 // eslint-disable-next-line @typescript-eslint/no-explicit-any
 type Live2DModel = any;
 
+// Lead time for the first piece of streamed audio, so it is not scheduled in the past
+const STREAM_START_DELAY_SECONDS = 0.05;
+
 interface UseInternalPlaybackProps {
     playbackQueue: PlaybackTask[];
     aiState: AiState;
@@ -28,6 +32,13 @@ export const useInternalPlayback = ({
     const currentAudioRef = useRef<HTMLAudioElement | null>(null);
     const currentModelRef = useRef<Live2DModel | null>(null);
     const currentUrlRef = useRef<string | null>(null);
+    // Pieces of streamed audio scheduled on the AudioContext, and the timers that
+    // hand each piece to lip sync when it starts
+    const scheduledSourcesRef = useRef<AudioBufferSourceNode[]>([]);
+    const lipSyncTimersRef = useRef<number[]>([]);
+    const pieceUrlsRef = useRef<string[]>([]);
+    // Bumped on interrupt, so a stream still being read stops scheduling audio
+    const streamGenerationRef = useRef(0);
 
     // Single shared AudioContext for playback
     const audioContextRef = useRef<AudioContext | null>(null);
@@ -49,21 +60,39 @@ export const useInternalPlayback = ({
             URL.revokeObjectURL(currentUrlRef.current);
             currentUrlRef.current = null;
         }
+        streamGenerationRef.current++;
+        for (const timer of lipSyncTimersRef.current) {
+            window.clearTimeout(timer);
+        }
+        lipSyncTimersRef.current = [];
+        for (const source of scheduledSourcesRef.current) {
+            source.stop();
+        }
+        scheduledSourcesRef.current = [];
+        for (const url of pieceUrlsRef.current) {
+            URL.revokeObjectURL(url);
+        }
+        pieceUrlsRef.current = [];
         if (currentModelRef.current && currentModelRef.current._wavFileHandler) {
             currentModelRef.current._wavFileHandler.releasePcmData();
         }
         setIsSpeaking(false);
     }, []);
 
-    /** Plays a base64-encoded WAV or PCM audio string through a separate path */
+    /** Plays base64-encoded or raw audio through a separate path */
     const playAudio = useCallback(
-        async (audioBase64: string) => {
+        async (audioData: string | ArrayBuffer) => {
             const audioContext = audioContextRef.current!;
-            const decodedData = atob(audioBase64);
-            const arrayBuffer = new ArrayBuffer(decodedData.length);
-            const uint8Array = new Uint8Array(arrayBuffer);
-            for (let i = 0; i < decodedData.length; i++) {
-                uint8Array[i] = decodedData.charCodeAt(i);
+            let arrayBuffer: ArrayBuffer;
+            if (typeof audioData === 'string') {
+                const decodedData = atob(audioData);
+                arrayBuffer = new ArrayBuffer(decodedData.length);
+                const uint8Array = new Uint8Array(arrayBuffer);
+                for (let i = 0; i < decodedData.length; i++) {
+                    uint8Array[i] = decodedData.charCodeAt(i);
+                }
+            } else {
+                arrayBuffer = audioData;
             }
 
             const audioBuffer = await audioContext.decodeAudioData(arrayBuffer);
@@ -145,6 +174,79 @@ export const useInternalPlayback = ({
         []
     );
 
+    /**
+     * Plays audio that is still arriving. Each piece is decoded as soon as it is
+     * complete and scheduled right after the previous one.
+     */
+    const playStream = useCallback(async (stream: AudioChunkStream) => {
+        const audioContext = audioContextRef.current!;
+        const generation = streamGenerationRef.current;
+        const splitter = new StreamingAudioSplitter();
+        let nextStartTime = 0;
+        let lastSource: AudioBufferSourceNode | null = null;
+
+        if (audioContext.state === 'suspended') {
+            // Pieces scheduled while suspended play once the context resumes
+            audioContext.resume().catch((error) => console.warn('Failed to resume audio context:', error));
+        }
+
+        const schedule = async (piece: ArrayBuffer) => {
+            const audioBuffer = await audioContext.decodeAudioData(piece);
+            if (generation !== streamGenerationRef.current) return;
+
+            const source = audioContext.createBufferSource();
+            source.buffer = audioBuffer;
+            const gainNode = audioContext.createGain();
+            gainNode.gain.value = 1.0;
+            source.connect(gainNode).connect(audioContext.destination);
+            const startTime = Math.max(nextStartTime, audioContext.currentTime + STREAM_START_DELAY_SECONDS);
+            source.start(startTime);
+            nextStartTime = startTime + audioBuffer.duration;
+            scheduledSourcesRef.current.push(source);
+            source.onended = () => {
+                scheduledSourcesRef.current = scheduledSourcesRef.current.filter((s) => s !== source);
+            };
+            lastSource = source;
+
+            // Lip sync follows the piece that is playing
+            const url = URL.createObjectURL(new Blob([audioBufferToWav(audioBuffer)], { type: 'audio/wav' }));
+            pieceUrlsRef.current.push(url);
+            const timer = window.setTimeout(() => {
+                lipSyncTimersRef.current = lipSyncTimersRef.current.filter((t) => t !== timer);
+                const model = (
+                    window as { getLive2DManager?: () => { getModel: (index: number) => Live2DModel } }
+                ).getLive2DManager?.()?.getModel(0);
+                if (model?._wavFileHandler) {
+                    currentModelRef.current = model;
+                    model._wavFileHandler.start(url);
+                }
+            }, Math.max(0, (startTime - audioContext.currentTime) * 1000));
+            lipSyncTimersRef.current.push(timer);
+        };
+
+        for await (const chunk of stream) {
+            if (generation !== streamGenerationRef.current) return;
+            for (const piece of splitter.push(chunk)) {
+                await schedule(piece);
+            }
+        }
+        for (const piece of splitter.flush()) {
+            await schedule(piece);
+        }
+
+        const finalSource = lastSource as AudioBufferSourceNode | null;
+        if (finalSource && generation === streamGenerationRef.current) {
+            await new Promise<void>((resolve) => {
+                finalSource.addEventListener('ended', () => resolve());
+            });
+        }
+        for (const url of pieceUrlsRef.current) {
+            URL.revokeObjectURL(url);
+        }
+        pieceUrlsRef.current = [];
+        currentModelRef.current = null;
+    }, []);
+
     /** Handles queued playback execution */
     useEffect(() => {
         if (playbackQueue.length > 0 && !isSpeaking) {
@@ -152,6 +254,7 @@ export const useInternalPlayback = ({
             setIsSpeaking(true);
 
             const executeTask = async (taskToExecute: PlaybackTask) => {
+                const generation = streamGenerationRef.current;
                 try {
                     if (taskToExecute.expressions.length > 0) {
                         setExpression(taskToExecute.expressions[0].name);
@@ -160,20 +263,25 @@ export const useInternalPlayback = ({
                         startMotion(taskToExecute.motions[0].group, taskToExecute.motions[0].index, 2);
                     }
 
-                    if (taskToExecute.audio) {
+                    if (taskToExecute.audioStream) {
+                        await playStream(taskToExecute.audioStream);
+                    } else if (taskToExecute.audio) {
                         await playAudio(taskToExecute.audio);
                     }
                 } catch (error) {
                     console.error('Error executing playback task:', error);
                 } finally {
-                    setIsSpeaking(false);
-                    dispatch({ type: 'SYSTEM_PLAYBACK_FINISHED' });
+                    // An interrupted task was already cleared from the queue
+                    if (generation === streamGenerationRef.current) {
+                        setIsSpeaking(false);
+                        dispatch({ type: 'SYSTEM_PLAYBACK_FINISHED' });
+                    }
                 }
             };
 
             executeTask(task);
         }
-    }, [playbackQueue, isSpeaking, dispatch, playAudio, setExpression, startMotion]);
+    }, [playbackQueue, isSpeaking, dispatch, playAudio, playStream, setExpression, startMotion]);
 
     /** Stop playback if AI state changes out of speaking modes */
     useEffect(() => {
@@ -1,8 +1,12 @@
 import { useMicVAD } from '@ricky0123/vad-react';
-import { useCallback, useEffect, useState } from 'react';
+import { useCallback, useEffect, useRef, useState } from 'react';
+import { floatToPcm16 } from '../services/binaryProtocol';
 import { WebSocketClient } from '../services/WebSocketClient';
 import { AIAvatarAction, AiState, AsrState, VoiceInputState } from '../state/types';
 
+// Frames kept from before the VAD detects speech, so the first syllable is not cut
+const PRE_SPEECH_FRAMES = 8;
+
 interface UseInternalVoiceInputProps {
     voiceInputState: VoiceInputState;
     aiState: AiState;
@@ -13,6 +17,10 @@ interface UseInternalVoiceInputProps {
 
 export const useInternalVoiceInput = ({ voiceInputState, aiState, asrState, dispatch, webSocketClient }: UseInternalVoiceInputProps) => {
     const [isVadRunning, setIsVadRunning] = useState(false);
+    // Mic frames are streamed to the server while speech is active, so it can
+    // send partial transcripts and detect the end of the utterance itself
+    const speechActiveRef = useRef(false);
+    const preSpeechFramesRef = useRef<Float32Array[]>([]);
 
     // Automatic interrupt for conversation mode
     const onSpeechRealStart = useCallback(() => {
@@ -22,39 +30,48 @@ export const useInternalVoiceInput = ({ voiceInputState, aiState, asrState, disp
         }
     }, [aiState, voiceInputState, dispatch, webSocketClient]);
 
-    const onSpeechEnd = useCallback(
-        (audio: Float32Array) => {
-            if (!webSocketClient) return;
-
-            const pcm16 = new Int16Array(audio.length);
-            for (let i = 0; i < audio.length; i++) {
-                pcm16[i] = Math.max(-1, Math.min(1, audio[i])) * 0x7fff;
-            }
+    const onSpeechStart = useCallback(() => {
+        if (!webSocketClient) return;
 
-            const buffer = pcm16.buffer;
-            const blob = new Blob([buffer], { type: 'application/octet-stream' });
-            const reader = new FileReader();
-
-            reader.onloadend = () => {
-                if (typeof reader.result === 'string') {
-                    const base64data = reader.result.split(',')[1];
-                    webSocketClient.sendMessage('user:audio_chunk', { data: base64data });
-                    dispatch({ type: 'USER_AUDIO_CHUNK_SENT' });
-                    if (voiceInputState.mode === 'conversation') {
-                        webSocketClient.sendMessage('user:audio_end', {});
-                        dispatch({ type: 'USER_AUDIO_END_SENT' });
-                    }
-                }
-            };
+        speechActiveRef.current = true;
+        for (const frame of preSpeechFramesRef.current) {
+            webSocketClient.sendAudioChunk(floatToPcm16(frame));
+        }
+        preSpeechFramesRef.current = [];
+        dispatch({ type: 'USER_AUDIO_CHUNK_SENT' });
+    }, [webSocketClient, dispatch]);
 
-            reader.readAsDataURL(blob);
+    const onFrameProcessed = useCallback(
+        (_probabilities: unknown, frame: Float32Array) => {
+            if (speechActiveRef.current) {
+                webSocketClient?.sendAudioChunk(floatToPcm16(frame));
+                return;
+            }
+            const frames = preSpeechFramesRef.current;
+            frames.push(frame);
+            if (frames.length > PRE_SPEECH_FRAMES) {
+                frames.shift();
+            }
         },
-        [webSocketClient, voiceInputState]
+        [webSocketClient]
     );
 
+    // The utterance was already streamed frame by frame, so only its end is sent
+    const endUtterance = useCallback(() => {
+        if (!speechActiveRef.current) return;
+        speechActiveRef.current = false;
+        if (webSocketClient && voiceInputState.mode === 'conversation') {
+            webSocketClient.sendMessage('user:audio_end', {});
+            dispatch({ type: 'USER_AUDIO_END_SENT' });
+        }
+    }, [webSocketClient, voiceInputState, dispatch]);
+
     const { loading, start, pause } = useMicVAD({
+        onSpeechStart,
         onSpeechRealStart,
-        onSpeechEnd,
+        onFrameProcessed,
+        onSpeechEnd: endUtterance,
+        onVADMisfire: endUtterance,
         redemptionFrames: 20,
         submitUserSpeechOnPause: true,
     });
@@ -67,6 +84,8 @@ export const useInternalVoiceInput = ({ voiceInputState, aiState, asrState, disp
             setIsVadRunning(true);
         } else if (!shouldBeListening && isVadRunning) {
             pause();
+            speechActiveRef.current = false;
+            preSpeechFramesRef.current = [];
             // In manual mode, explicitly send audio_end when recording stops
             if (voiceInputState.mode === 'manual' && asrState === 'PROCESSING') {
                 webSocketClient?.sendMessage('user:audio_end', {});
@@ -1,10 +1,31 @@
-import { AIAvatarAction, Character } from '../state/types';
+import { AIAvatarAction, Character, PlaybackTask } from '../state/types';
+import { AudioChunkStream } from './audioStream';
+import { decodeFrame, encodeFrame, FLAG_FINAL, FORMAT_PCM_S16LE, MSG_AVATAR_SPEAK_AUDIO, MSG_USER_AUDIO_CHUNK } from './binaryProtocol';
 
 type Dispatch = React.Dispatch<AIAvatarAction>;
 
+// Identity of this tab's session, kept in sessionStorage so every WebSocketClient
+// (and a page reload) resumes the same conversation
+const CLIENT_ID_KEY = 'aiAvatar.clientId';
+const RESUME_TOKEN_KEY = 'aiAvatar.resumeToken';
+// Sent by the server when the resume token does not match the client id's session
+const CLOSE_INVALID_RESUME_TOKEN = 4003;
+
+function getClientId(): string {
+    let clientId = sessionStorage.getItem(CLIENT_ID_KEY);
+    if (!clientId) {
+        clientId = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+        sessionStorage.setItem(CLIENT_ID_KEY, clientId);
+    }
+    return clientId;
+}
+
 export class WebSocketClient {
     private ws: WebSocket | null = null;
     private dispatch: Dispatch;
+    private audioSequence = 0;
+    // Audio of avatar:speak messages whose binary frames are still arriving, keyed by audio_id
+    private pendingAudio = new Map<number, AudioChunkStream>();
 
     constructor(dispatch: Dispatch) {
         this.dispatch = dispatch;
@@ -15,20 +36,29 @@ export class WebSocketClient {
             this.disconnect();
         }
 
-        const clientId = Date.now();
-        const wsUrl = `${url}/ws/${clientId}`;
+        const resumeToken = sessionStorage.getItem(RESUME_TOKEN_KEY);
+        const query = resumeToken ? `?resume_token=${encodeURIComponent(resumeToken)}` : '';
+        const wsUrl = `${url}/ws/${encodeURIComponent(getClientId())}${query}`;
         this.ws = new WebSocket(wsUrl);
+        this.ws.binaryType = 'arraybuffer';
+        this.audioSequence = 0;
+        this.finishPendingAudio();
 
         this.ws.onopen = () => {
             this.dispatch({ type: 'SERVER_CONNECT_SUCCESS' });
-            this.sendMessage('session:start', { character_id: characterId });
+            this.sendMessage('session:start', { character_id: characterId, binary_audio: true });
         };
 
         this.ws.onmessage = (event) => {
+            if (event.data instanceof ArrayBuffer) {
+                this.handleBinaryMessage(event.data);
+                return;
+            }
             try {
                 const message = JSON.parse(event.data);
                 switch (message.type) {
                     case 'session:ready': {
+                        sessionStorage.setItem(RESUME_TOKEN_KEY, message.payload.resume_token);
                         const fullCharacter = {
                             ...(message.payload.character as Record<string, unknown>),
                             live2d_model_info: message.payload.live2d_model_info,
@@ -36,9 +66,16 @@ export class WebSocketClient {
                         this.dispatch({ type: 'SERVER_CHARACTER_READY', payload: { character: fullCharacter as Character } });
                         break;
                     }
-                    case 'avatar:speak':
-                        this.dispatch({ type: 'SERVER_AVATAR_SPEAK', payload: message.payload });
+                    case 'avatar:speak': {
+                        const task: PlaybackTask = message.payload;
+                        if (task.audio_id !== undefined) {
+                            // Queued right away, so playback can start with the first audio frame
+                            task.audioStream = new AudioChunkStream();
+                            this.pendingAudio.set(task.audio_id, task.audioStream);
+                        }
+                        this.dispatch({ type: 'SERVER_AVATAR_SPEAK', payload: task });
                         break;
+                    }
                     case 'avatar:idle':
                         this.dispatch({ type: 'SERVER_AVATAR_IDLE' });
                         break;
@@ -57,7 +94,13 @@ export class WebSocketClient {
             }
         };
 
-        this.ws.onclose = () => {
+        this.ws.onclose = (event) => {
+            if (event.code === CLOSE_INVALID_RESUME_TOKEN) {
+                // The stored identity cannot be resumed; the next connection starts a new session
+                sessionStorage.removeItem(CLIENT_ID_KEY);
+                sessionStorage.removeItem(RESUME_TOKEN_KEY);
+            }
+            this.finishPendingAudio();
             this.dispatch({ type: 'SERVER_DISCONNECTED' });
         };
 
@@ -67,7 +110,40 @@ export class WebSocketClient {
         };
     }
 
+    private handleBinaryMessage(data: ArrayBuffer): void {
+        try {
+            const frame = decodeFrame(data);
+            if (frame.messageType !== MSG_AVATAR_SPEAK_AUDIO) {
+                console.warn('Unknown binary message type:', frame.messageType);
+                return;
+            }
+            const stream = this.pendingAudio.get(frame.sequence);
+            if (!stream) {
+                console.warn('Received audio for unknown avatar:speak id:', frame.sequence);
+                return;
+            }
+            if (frame.payload.byteLength > 0) {
+                stream.push(frame.payload);
+            }
+            if (frame.flags & FLAG_FINAL) {
+                this.pendingAudio.delete(frame.sequence);
+                stream.finish();
+            }
+        } catch (error) {
+            console.error('Failed to parse binary WebSocket message:', error);
+        }
+    }
+
+    /** Ends audio that will never complete, so its playback does not wait forever. */
+    private finishPendingAudio(): void {
+        for (const stream of this.pendingAudio.values()) {
+            stream.finish();
+        }
+        this.pendingAudio.clear();
+    }
+
     public disconnect(): void {
+        this.finishPendingAudio();
         if (this.ws) {
             this.ws.onclose = null; // Prevent dispatching DISCONNECT on manual close
             this.ws.close();
@@ -81,4 +157,11 @@ export class WebSocketClient {
             this.ws.send(JSON.stringify(message));
         }
     }
+
+    /** Sends microphone audio as a binary frame instead of base64 inside JSON. */
+    public sendAudioChunk(pcm16: Int16Array): void {
+        if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+            this.ws.send(encodeFrame(MSG_USER_AUDIO_CHUNK, this.audioSequence++, FORMAT_PCM_S16LE, pcm16));
+        }
+    }
 }
\ No newline at end of file
@@ -0,0 +1,42 @@
+/**
+ * Audio bytes of one avatar:speak message. The message is queued for playback as
+ * soon as it arrives, and its binary audio frames are pushed here as they follow.
+ */
+export class AudioChunkStream {
+    private chunks: ArrayBuffer[] = [];
+    private finished = false;
+    private wake: (() => void) | null = null;
+
+    public push(chunk: ArrayBuffer): void {
+        if (this.finished) return;
+        this.chunks.push(chunk);
+        this.notify();
+    }
+
+    /** Marks the end of the audio, including when synthesis failed part way. */
+    public finish(): void {
+        this.finished = true;
+        this.notify();
+    }
+
+    private notify(): void {
+        const wake = this.wake;
+        this.wake = null;
+        wake?.();
+    }
+
+    async *[Symbol.asyncIterator](): AsyncGenerator<ArrayBuffer> {
+        let index = 0;
+        while (true) {
+            if (index < this.chunks.length) {
+                yield this.chunks[index++];
+            } else if (this.finished) {
+                return;
+            } else {
+                await new Promise<void>((resolve) => {
+                    this.wake = resolve;
+                });
+            }
+        }
+    }
+}
@@ -0,0 +1,59 @@
+// Binary WebSocket frames start with an 8-byte little-endian header:
+//   uint8  message type
+//   uint8  sample format
+//   uint16 flags
+//   uint32 sequence number
+// followed by the raw payload. Must match src/binary_protocol.py on the server.
+export const HEADER_SIZE = 8;
+
+// Set on the last audio frame of an avatar:speak message
+export const FLAG_FINAL = 1;
+
+export const MSG_USER_AUDIO_CHUNK = 1;
+export const MSG_AVATAR_SPEAK_AUDIO = 2;
+
+export const FORMAT_ENCODED = 0;
+export const FORMAT_PCM_S16LE = 1;
+export const FORMAT_PCM_F32LE = 2;
+
+export function encodeFrame(messageType: number, sequence: number, sampleFormat: number, payload: ArrayBufferView, flags = 0): ArrayBuffer {
+    const buffer = new ArrayBuffer(HEADER_SIZE + payload.byteLength);
+    const view = new DataView(buffer);
+    view.setUint8(0, messageType);
+    view.setUint8(1, sampleFormat);
+    view.setUint16(2, flags, true);
+    view.setUint32(4, sequence, true);
+    new Uint8Array(buffer, HEADER_SIZE).set(new Uint8Array(payload.buffer, payload.byteOffset, payload.byteLength));
+    return buffer;
+}
+
+export interface BinaryFrame {
+    messageType: number;
+    sampleFormat: number;
+    sequence: number;
+    flags: number;
+    payload: ArrayBuffer;
+}
+
+export function decodeFrame(buffer: ArrayBuffer): BinaryFrame {
+    if (buffer.byteLength < HEADER_SIZE) {
+        throw new Error(`Binary frame of ${buffer.byteLength} bytes is shorter than the header`);
+    }
+    const view = new DataView(buffer);
+    return {
+        messageType: view.getUint8(0),
+        sampleFormat: view.getUint8(1),
+        sequence: view.getUint32(4, true),
+        flags: view.getUint16(2, true),
+        payload: buffer.slice(HEADER_SIZE),
+    };
+}
+
+/** Converts float samples in [-1, 1] to 16-bit little-endian PCM. */
+export function floatToPcm16(audio: Float32Array): Int16Array {
+    const pcm16 = new Int16Array(audio.length);
+    for (let i = 0; i < audio.length; i++) {
+        pcm16[i] = Math.max(-1, Math.min(1, audio[i])) * 0x7fff;
+    }
+    return pcm16;
+}
@@ -44,7 +44,8 @@ export const aiAvatarReducer = (state: AIAvatarState, action: AIAvatarAction): A
                 asrState: 'LISTENING_PROCESSING',
             };
         case 'USER_AUDIO_END_SENT':
-            if (state.voiceInput.mode === 'conversation') {
+            // The server may have finalized the utterance at an endpoint already
+            if (state.voiceInput.mode === 'conversation' && state.asrState === 'LISTENING_PROCESSING') {
                 return {
                     ...state,
                     asrState: state.voiceInput.continuous ? 'LISTENING_PROCESSING' : 'PROCESSING',
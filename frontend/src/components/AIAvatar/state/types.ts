@@ -1,3 +1,5 @@
+import { AudioChunkStream } from '../services/audioStream';
+
 export interface WavFileHandler {
     update: (deltaTimeSeconds: number) => unknown;
     releasePcmData: () => void;
@@ -60,7 +62,11 @@ export interface Message {
 // A single unit of work for the avatar to perform (speak text, play audio, show expression)
 export interface PlaybackTask {
     text: string;
-    audio: string;
+    // Base64-encoded audio, or raw audio bytes when binary audio was negotiated
+    audio?: string | ArrayBuffer;
+    audio_id?: number;
+    // Binary audio that is still arriving, played as it comes in
+    audioStream?: AudioChunkStream;
     expressions: { name: string; value: number }[];
     motions: { group: string; index: number }[];
 }
@@ -52,4 +52,202 @@ export function audioBufferToWav(buffer: AudioBuffer): ArrayBuffer {
     floatTo16BitPCM(view, 44, result);
 
     return arrayBuffer;
-}
\ No newline at end of file
+}
+
+// Bitrates in kbit/s of MPEG-1 and MPEG-2/2.5 Layer III frames, by bitrate index
+const MP3_BITRATES = {
+    mpeg1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    mpeg2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+};
+// Sample rates by MPEG version bits (0: 2.5, 2: 2, 3: 1) and sample rate index
+const MP3_SAMPLE_RATES: Record<number, number[]> = {
+    0: [11025, 12000, 8000],
+    2: [22050, 24000, 16000],
+    3: [44100, 48000, 32000],
+};
+
+// The first piece is kept short so playback starts early; later pieces are
+// longer, since every separately decoded piece may carry a little decoder delay
+const FIRST_PIECE_SECONDS = 0.3;
+const PIECE_SECONDS = 1.0;
+
+function concatBytes(a: Uint8Array, b: Uint8Array) {
+    const result = new Uint8Array(a.length + b.length);
+    result.set(a, 0);
+    result.set(b, a.length);
+    return result;
+}
+
+function readString(bytes: Uint8Array, offset: number, length: number): string {
+    return String.fromCharCode(...bytes.subarray(offset, offset + length));
+}
+
+/** Returns the length and sample count of the MP3 frame at offset, or null if there is none. */
+function mp3FrameAt(bytes: Uint8Array, offset: number): { length: number; samples: number; sampleRate: number } | null {
+    if (offset + 4 > bytes.length || bytes[offset] !== 0xff || (bytes[offset + 1] & 0xe0) !== 0xe0) return null;
+    const version = (bytes[offset + 1] >> 3) & 0x03;
+    const layer = (bytes[offset + 1] >> 1) & 0x03;
+    const bitrateIndex = bytes[offset + 2] >> 4;
+    const sampleRateIndex = (bytes[offset + 2] >> 2) & 0x03;
+    const padding = (bytes[offset + 2] >> 1) & 0x01;
+    // Only Layer III, which is what TTS services send
+    if (version === 1 || layer !== 1 || bitrateIndex === 0 || bitrateIndex === 15 || sampleRateIndex === 3) return null;
+
+    const bitrate = (version === 3 ? MP3_BITRATES.mpeg1 : MP3_BITRATES.mpeg2)[bitrateIndex] * 1000;
+    const sampleRate = MP3_SAMPLE_RATES[version][sampleRateIndex];
+    const samples = version === 3 ? 1152 : 576;
+    return { length: Math.floor((samples / 8) * bitrate / sampleRate) + padding, samples, sampleRate };
+}
+
+/**
+ * Splits an encoded audio stream into pieces that decodeAudioData can decode on
+ * their own, so playback can start before the whole stream has arrived. WAV is
+ * split at sample frames and MP3 at frame boundaries; any other format comes
+ * out as a single piece once the stream is flushed.
+ */
+export class StreamingAudioSplitter {
+    private pending = new Uint8Array(0);
+    private format: 'unknown' | 'wav' | 'mp3' | 'other' = 'unknown';
+    private wavHeader: { formatCode: number; channels: number; sampleRate: number; bitsPerSample: number } | null = null;
+    private piecesEmitted = 0;
+
+    /** Adds the next chunk of the stream and returns the pieces that are complete. */
+    public push(chunk: ArrayBuffer): ArrayBuffer[] {
+        this.pending = concatBytes(this.pending, new Uint8Array(chunk));
+        if (this.format === 'unknown') {
+            this.detectFormat();
+        }
+        if (this.format === 'wav') return this.takeWav(false);
+        if (this.format === 'mp3') return this.takeMp3(false);
+        return [];
+    }
+
+    /** Returns whatever is left once the stream has ended. */
+    public flush(): ArrayBuffer[] {
+        if (this.format === 'wav') return this.takeWav(true);
+        if (this.format === 'mp3') return this.takeMp3(true);
+        const rest = this.pending;
+        this.pending = new Uint8Array(0);
+        return rest.length > 0 ? [rest.slice().buffer] : [];
+    }
+
+    private pieceSeconds(): number {
+        return this.piecesEmitted === 0 ? FIRST_PIECE_SECONDS : PIECE_SECONDS;
+    }
+
+    private detectFormat(): void {
+        const bytes = this.pending;
+        if (bytes.length < 12) return;
+        if (readString(bytes, 0, 4) === 'RIFF' && readString(bytes, 8, 4) === 'WAVE') {
+            this.format = 'wav';
+        } else if (readString(bytes, 0, 3) === 'ID3' || mp3FrameAt(bytes, 0)) {
+            this.format = 'mp3';
+        } else {
+            this.format = 'other';
+        }
+    }
+
+    private takeWav(final: boolean): ArrayBuffer[] {
+        if (!this.wavHeader && !this.parseWavHeader()) {
+            // A header that never completes is left to the browser's decoder
+            if (final) this.format = 'other';
+            return final ? this.flush() : [];
+        }
+        const { channels, sampleRate, bitsPerSample } = this.wavHeader!;
+        const blockAlign = channels * (bitsPerSample / 8);
+        const pieces: ArrayBuffer[] = [];
+        while (true) {
+            const minBytes = final ? blockAlign : Math.ceil(this.pieceSeconds() * sampleRate) * blockAlign;
+            if (this.pending.length < minBytes) break;
+            const length = this.pending.length - (this.pending.length % blockAlign);
+            pieces.push(this.wavPiece(this.pending.subarray(0, length)));
+            this.pending = this.pending.slice(length);
+            this.piecesEmitted++;
+        }
+        return pieces;
+    }
+
+    /** Reads the fmt chunk and drops everything up to the samples of the data chunk. */
+    private parseWavHeader(): boolean {
+        const bytes = this.pending;
+        const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+        let offset = 12;
+        let header: StreamingAudioSplitter['wavHeader'] = null;
+        while (offset + 8 <= bytes.length) {
+            const id = readString(bytes, offset, 4);
+            const size = view.getUint32(offset + 4, true);
+            if (id === 'data') {
+                if (!header) return false;
+                this.wavHeader = header;
+                this.pending = bytes.slice(offset + 8);
+                return true;
+            }
+            if (offset + 8 + size > bytes.length) return false;
+            if (id === 'fmt ') {
+                header = {
+                    formatCode: view.getUint16(offset + 8, true),
+                    channels: view.getUint16(offset + 10, true),
+                    sampleRate: view.getUint32(offset + 12, true),
+                    bitsPerSample: view.getUint16(offset + 22, true),
+                };
+            }
+            offset += 8 + size + (size % 2);
+        }
+        return false;
+    }
+
+    private wavPiece(samples: Uint8Array): ArrayBuffer {
+        const { formatCode, channels, sampleRate, bitsPerSample } = this.wavHeader!;
+        const blockAlign = channels * (bitsPerSample / 8);
+        const buffer = new ArrayBuffer(44 + samples.length);
+        const view = new DataView(buffer);
+        writeString(view, 0, 'RIFF');
+        view.setUint32(4, 36 + samples.length, true);
+        writeString(view, 8, 'WAVE');
+        writeString(view, 12, 'fmt ');
+        view.setUint32(16, 16, true);
+        view.setUint16(20, formatCode, true);
+        view.setUint16(22, channels, true);
+        view.setUint32(24, sampleRate, true);
+        view.setUint32(28, sampleRate * blockAlign, true);
+        view.setUint16(32, blockAlign, true);
+        view.setUint16(34, bitsPerSample, true);
+        writeString(view, 36, 'data');
+        view.setUint32(40, samples.length, true);
+        new Uint8Array(buffer, 44).set(samples);
+        return buffer;
+    }
+
+    private takeMp3(final: boolean): ArrayBuffer[] {
+        // An ID3v2 tag at the start carries no audio
+        if (readString(this.pending, 0, 3) === 'ID3') {
+            if (this.pending.length < 10) return [];
+            const tagSize =
+                10 + ((this.pending[6] << 21) | (this.pending[7] << 14) | (this.pending[8] << 7) | this.pending[9]);
+            if (this.pending.length < tagSize) return [];
+            this.pending = this.pending.slice(tagSize);
+        }
+
+        const pieces: ArrayBuffer[] = [];
+        let offset = 0;
+        let seconds = 0;
+        while (true) {
+            const frame = mp3FrameAt(this.pending, offset);
+            if (!frame || offset + frame.length > this.pending.length) break;
+            offset += frame.length;
+            seconds += frame.samples / frame.sampleRate;
+            if (seconds >= this.pieceSeconds()) {
+                pieces.push(this.pending.slice(0, offset).buffer);
+                this.pending = this.pending.slice(offset);
+                this.piecesEmitted++;
+                offset = 0;
+                seconds = 0;
+            }
+        }
+        if (final && this.pending.length > 0) {
+            pieces.push(this.pending.slice().buffer);
+            this.pending = new Uint8Array(0);
+        }
+        return pieces;
+    }
+}
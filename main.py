@@ -1,5 +1,9 @@
 import uvicorn
-from src.main import app
+from loguru import logger
+from src.config import app_config
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    if app_config.WORKERS > 1 and app_config.SESSION_STORE_URL in ("", "memory"):
+        logger.warning("Multiple workers with the in-memory session store: a reconnecting client only keeps its conversation if it reaches the same worker.")
+    # Workers need the app as an import string, since each process imports it itself
+    uvicorn.run("src.main:app", host="0.0.0.0", port=8000, workers=app_config.WORKERS)
@@ -0,0 +1,155 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+from loguru import logger
+
+from .asr_interface import ASRInterface
+from .. import metrics
+
+
+class ASRQueueFullError(RuntimeError):
+    """Raised when an ASR request cannot get a queue slot in time."""
+
+
+@dataclass
+class ASRResult:
+    text: str
+    queue_wait: float
+    compute_time: float
+
+
+# Engine owned by a worker process when running in "process" mode.
+_worker_engine: ASRInterface | None = None
+
+
+def _init_worker(engine_name: str, engine_kwargs: Dict[str, Any]):
+    global _worker_engine
+    from .asr_factory import ASRFactory
+    _worker_engine = ASRFactory.get_asr_system(engine_name, **engine_kwargs)
+
+
+def _timed_call(submitted_at: float, func: Callable, *args) -> tuple[Any, float, float]:
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+def _transcribe_in_worker(submitted_at: float, audio: np.ndarray) -> tuple[str, float, float]:
+    return _timed_call(submitted_at, _worker_engine.transcribe_np, audio)
+
+
+class ASRExecutor:
+    """
+    Runs ASR inference off the asyncio event loop.
+
+    Requests are executed on a thread pool (sharing the in-process engine) or on
+    a process pool (each worker loads its own engine). The number of requests
+    queued or running at once is bounded; callers beyond that limit wait for a
+    slot and are rejected with ASRQueueFullError after `queue_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        asr_engine: ASRInterface | None = None,
+        mode: str = "thread",
+        max_workers: int = 1,
+        max_pending: int = 32,
+        queue_timeout: Optional[float] = 10.0,
+        engine_name: str | None = None,
+        engine_kwargs: Dict[str, Any] | None = None,
+    ):
+        self.asr_engine = asr_engine
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pending = 0
+
+        if mode == "thread":
+            if asr_engine is None:
+                raise ValueError("Thread mode requires an ASR engine instance.")
+            self._pool: Executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asr")
+        elif mode == "process":
+            if engine_name is None:
+                raise ValueError("Process mode requires an ASR engine name.")
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(engine_name, engine_kwargs or {}),
+            )
+        else:
+            raise ValueError(f"Unknown ASR executor mode: {mode}")
+
+        logger.info(f"ASR executor started in {mode} mode with {max_workers} worker(s), max {max_pending} pending.")
+
+    @property
+    def pending(self) -> int:
+        """Number of requests currently queued or running."""
+        return self._pending
+
+    async def _acquire_slot(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ASRQueueFullError(
+                f"ASR queue is full ({self.max_pending} pending), gave up after {self.queue_timeout} seconds."
+            )
+
+    async def _submit(self, func: Callable, *args) -> tuple[Any, float, float]:
+        submitted_at = time.time()
+        await self._acquire_slot()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, func, submitted_at, *args)
+        finally:
+            self._pending -= 1
+            self._slots.release()
+
+    def _require_thread_mode(self):
+        if self.mode != "thread":
+            raise RuntimeError("Streaming ASR requires the thread executor mode.")
+
+    async def transcribe(self, audio: np.ndarray) -> ASRResult:
+        """
+        Transcribes the audio on the worker pool.
+
+        Args:
+            audio: Mono float32 audio at 16 kHz.
+
+        Returns:
+            The transcription together with the time spent waiting for a worker
+            and the time spent decoding.
+        """
+        if self.mode == "process":
+            text, queue_wait, compute_time = await self._submit(_transcribe_in_worker, audio)
+        else:
+            text, queue_wait, compute_time = await self._submit(_timed_call, self.asr_engine.transcribe_np, audio)
+
+        metrics.asr_queue_wait_seconds.observe(queue_wait)
+        metrics.asr_decode_seconds.observe(compute_time)
+        logger.info(f"ASR request waited {queue_wait:.3f} seconds in queue, decode took {compute_time:.3f} seconds")
+        return ASRResult(text=text, queue_wait=queue_wait, compute_time=compute_time)
+
+    async def process_stream(self, stream: Any, audio: np.ndarray) -> tuple[str, bool]:
+        """Feeds audio into a streaming engine's per-session stream on the worker pool."""
+        self._require_thread_mode()
+        result, _, _ = await self._submit(_timed_call, self.asr_engine.process_stream, stream, audio)
+        return result
+
+    async def finalize_stream(self, stream: Any) -> str:
+        """Flushes a streaming engine's per-session stream on the worker pool."""
+        self._require_thread_mode()
+        text, queue_wait, compute_time = await self._submit(_timed_call, self.asr_engine.finalize_stream, stream)
+        metrics.asr_queue_wait_seconds.observe(queue_wait)
+        metrics.asr_decode_seconds.observe(compute_time)
+        logger.info(f"ASR finalize waited {queue_wait:.3f} seconds in queue, decode took {compute_time:.3f} seconds")
+        return text
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,4 +1,5 @@
 from .sherpa_onnx_asr import SherpaOnnxASR
+from .sherpa_onnx_streaming_asr import SherpaOnnxStreamingASR
 from .faster_whisper_asr import FasterWhisperASR
 from .asr_interface import ASRInterface
 
@@ -7,7 +8,39 @@ class ASRFactory:
     def get_asr_system(name: str, **kwargs) -> ASRInterface:
         if name == "sherpa_onnx_asr":
             return SherpaOnnxASR(**kwargs)
+        elif name == "sherpa_onnx_streaming_asr":
+            return SherpaOnnxStreamingASR(**kwargs)
         elif name == "faster_whisper_asr":
             return FasterWhisperASR(**kwargs)
         else:
-            raise ValueError(f"Unknown ASR system: {name}")
\ No newline at end of file
+            raise ValueError(f"Unknown ASR system: {name}")
+
+    @staticmethod
+    def engine_kwargs(config) -> dict:
+        """Engine arguments from the ASR_ settings, for `get_asr_system(config.ENGINE, ...)`."""
+        kwargs = dict(
+            device=config.DEVICE,
+            model=config.MODEL,
+            compute_type=config.COMPUTE_TYPE,
+            num_threads=config.CPU_THREADS,
+            batch_max_size=config.BATCH_MAX_SIZE,
+            batch_max_wait_ms=config.BATCH_MAX_WAIT_MS
+        )
+        if config.ENGINE == "faster_whisper_asr":
+            kwargs.update(
+                language=config.LANGUAGE,
+                beam_size=config.WHISPER_BEAM_SIZE,
+                streaming=config.WHISPER_STREAMING,
+                min_chunk_seconds=config.WHISPER_MIN_CHUNK_SECONDS,
+                agreement=config.WHISPER_AGREEMENT,
+                max_buffer_seconds=config.WHISPER_MAX_BUFFER_SECONDS
+            )
+        elif config.ENGINE == "sherpa_onnx_asr":
+            kwargs["language"] = config.LANGUAGE
+        return kwargs
+
+    @staticmethod
+    def is_streaming(name: str, **kwargs) -> bool:
+        if name == "sherpa_onnx_streaming_asr":
+            return True
+        return name == "faster_whisper_asr" and kwargs.get("streaming", False)
\ No newline at end of file
@@ -1,7 +1,32 @@
 from abc import ABC, abstractmethod
+from typing import Any, Tuple
 import numpy as np
 
 class ASRInterface(ABC):
+    # Streaming engines keep a per-session stream and decode audio as it arrives.
+    supports_streaming: bool = False
+
     @abstractmethod
     def transcribe_np(self, audio: np.ndarray) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    def create_stream(self) -> Any:
+        """Creates a new per-session stream. Only implemented by streaming engines."""
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming.")
+
+    def process_stream(self, stream: Any, audio: np.ndarray) -> Tuple[str, bool]:
+        """
+        Feeds audio into a stream and decodes what is ready.
+
+        Returns:
+            The text of the current utterance so far and whether an endpoint was
+            detected. On an endpoint the stream is reset for the next utterance.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming.")
+
+    def finalize_stream(self, stream: Any) -> str:
+        """
+        Flushes the stream and returns the text of the last utterance. The
+        stream cannot accept more audio afterwards.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming.")
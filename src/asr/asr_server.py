@@ -0,0 +1,104 @@
+"""
+Host-wide ASR server. Loads the recognizer configured by the ASR_ settings
+once and serves transcriptions to every web worker on the host over a Unix
+socket, so memory does not grow with the number of workers. Requests from
+all workers go through one ASRExecutor, so concurrent utterances are decoded
+in batches when ASR_BATCH_MAX_SIZE is above 1.
+
+Run with `python -m src.asr.asr_server` and point the web workers at the same
+socket with ASR_SERVER_SOCKET.
+"""
+import asyncio
+import os
+
+import numpy as np
+from loguru import logger
+
+from src.config import asr_config
+from .asr_executor import ASRExecutor, ASRQueueFullError
+from .asr_factory import ASRFactory
+from .remote_asr import REQUEST_HEADER, RESPONSE_HEADER, STATUS_ERROR, STATUS_OK, attach_shared_memory
+
+
+class ASRServer:
+    def __init__(self, socket_path: str, executor: ASRExecutor):
+        self.socket_path = socket_path
+        self.executor = executor
+        self.requests = 0
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # A client keeps writing to the same buffer, so it stays attached
+        # until the client switches to a larger one
+        segment = None
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(REQUEST_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    return
+                name_length, num_samples = REQUEST_HEADER.unpack(header)
+                name = (await reader.readexactly(name_length)).decode("utf-8")
+
+                try:
+                    if segment is None or segment.name.lstrip("/") != name.lstrip("/"):
+                        if segment is not None:
+                            segment.close()
+                        segment = attach_shared_memory(name)
+                    # Copied out, since the client reuses the buffer for its next request
+                    audio = np.ndarray((num_samples,), dtype=np.float32, buffer=segment.buf).copy()
+                    result = await self.executor.transcribe(audio)
+                    status, payload = STATUS_OK, result.text
+                except (ASRQueueFullError, OSError, ValueError) as e:
+                    status, payload = STATUS_ERROR, str(e)
+                except Exception as e:
+                    logger.exception("ASR request failed")
+                    status, payload = STATUS_ERROR, f"ASR request failed: {e}"
+
+                data = payload.encode("utf-8")
+                writer.write(RESPONSE_HEADER.pack(status, len(data)) + data)
+                await writer.drain()
+                self.requests += 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if segment is not None:
+                segment.close()
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        logger.info(f"ASR server listening on {self.socket_path}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    if not asr_config.SERVER_SOCKET:
+        raise SystemExit("Set ASR_SERVER_SOCKET to the path of the Unix socket to listen on.")
+    engine_kwargs = ASRFactory.engine_kwargs(asr_config)
+    if ASRFactory.is_streaming(asr_config.ENGINE, **engine_kwargs):
+        raise SystemExit("The ASR server does not support streaming engines.")
+
+    asr_engine = ASRFactory.get_asr_system(asr_config.ENGINE, **engine_kwargs)
+
+    async def run():
+        executor = ASRExecutor(
+            asr_engine=asr_engine,
+            mode="thread",
+            # Enough threads for full batches to form
+            max_workers=max(asr_config.EXECUTOR_WORKERS, asr_config.BATCH_MAX_SIZE),
+            max_pending=asr_config.EXECUTOR_MAX_PENDING,
+            queue_timeout=asr_config.EXECUTOR_QUEUE_TIMEOUT,
+        )
+        try:
+            await ASRServer(asr_config.SERVER_SOCKET, executor).serve()
+        finally:
+            executor.shutdown()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
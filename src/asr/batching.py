@@ -0,0 +1,126 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+from loguru import logger
+
+from .. import metrics
+
+
+@dataclass
+class _PendingUtterance:
+    audio: np.ndarray
+    submitted_at: float
+    future: Future = field(default_factory=Future)
+
+
+class BatchDecoder:
+    """
+    Collects utterances submitted from different sessions and decodes them with
+    a single `decode_streams` call on a sherpa-onnx offline recognizer.
+
+    A batch is closed once it holds `max_batch_size` utterances or the oldest
+    one has waited `max_wait_ms`, whichever comes first. `decode` blocks the
+    calling thread until its own result is ready, so callers run it from the
+    ASR worker pool; that pool needs at least `max_batch_size` workers for full
+    batches to form.
+    """
+
+    def __init__(self, recognizer, max_batch_size: int = 8, max_wait_ms: float = 20.0, sample_rate: int = 16000):
+        self.recognizer = recognizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.sample_rate = sample_rate
+
+        self._queue: "queue.Queue[_PendingUtterance | None]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._batch_sizes: Dict[int, int] = {}
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="asr-batcher", daemon=True)
+        self._thread.start()
+
+    def decode(self, audio: np.ndarray) -> str:
+        """Queues the audio for the next batch and waits for its transcription."""
+        item = _PendingUtterance(audio=audio, submitted_at=time.monotonic())
+        self._queue.put(item)
+        return item.future.result()
+
+    def _collect_batch(self, first: _PendingUtterance) -> List[_PendingUtterance]:
+        batch = [first]
+        deadline = first.submitted_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Put the shutdown marker back so the loop sees it after this batch.
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect_batch(first)
+            started_at = time.monotonic()
+
+            try:
+                streams = []
+                for item in batch:
+                    stream = self.recognizer.create_stream()
+                    stream.accept_waveform(self.sample_rate, item.audio)
+                    streams.append(stream)
+                self.recognizer.decode_streams(streams)
+            except Exception as e:
+                logger.error(f"Batched ASR decode of {len(batch)} utterance(s) failed: {e}")
+                for item in batch:
+                    item.future.set_exception(e)
+                continue
+
+            for item, stream in zip(batch, streams):
+                item.future.set_result(stream.result.text.strip())
+
+            self._record(batch, started_at)
+
+    def _record(self, batch: List[_PendingUtterance], started_at: float):
+        waits = [started_at - item.submitted_at for item in batch]
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+            self._total_wait += sum(waits)
+            self._max_wait_seen = max(self._max_wait_seen, max(waits))
+        metrics.asr_batch_size.observe(len(batch))
+        for wait in waits:
+            metrics.asr_batch_wait_seconds.observe(wait)
+
+    def stats(self) -> Dict:
+        """Returns batch-size and wait-time statistics collected so far."""
+        with self._stats_lock:
+            return {
+                "batches": self._batches,
+                "requests": self._requests,
+                "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+                "batch_size_counts": dict(sorted(self._batch_sizes.items())),
+                "mean_wait_ms": 1000.0 * self._total_wait / self._requests if self._requests else 0.0,
+                "max_wait_ms": 1000.0 * self._max_wait_seen,
+            }
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
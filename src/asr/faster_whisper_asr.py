@@ -1,19 +1,189 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Tuple
 from faster_whisper import WhisperModel
 import numpy as np
 from .asr_interface import ASRInterface
 
+
+@dataclass
+class _Word:
+    start: float
+    end: float
+    text: str
+
+    @property
+    def key(self) -> str:
+        return re.sub(r"[^\w']", "", self.text.lower())
+
+
+@dataclass
+class WhisperStreamState:
+    """Rolling audio window and committed transcript of one session."""
+    audio: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float32))
+    # Absolute time (seconds) of the first sample in `audio`
+    offset: float = 0.0
+    # Samples received since the last decode
+    new_samples: int = 0
+    # The whole committed transcript, and the last committed words, as many
+    # as the prompt of the next decode needs
+    committed_text: str = ""
+    committed: List[_Word] = field(default_factory=list)
+    # Recent uncommitted hypotheses, newest last
+    hypotheses: List[List[_Word]] = field(default_factory=list)
+
+    @property
+    def committed_end(self) -> float:
+        return max(self.committed[-1].end, self.offset) if self.committed else self.offset
+
+
 class FasterWhisperASR(ASRInterface):
-    def __init__(self, model="distil-small.en", device="cpu", compute_type="default", language=None, num_threads=4, **kwargs):
+    """
+    ASR using faster-whisper.
+
+    In one-shot mode every call transcribes the audio it is given. In streaming
+    mode each session keeps a rolling audio window: only the audio after the last
+    committed word is re-decoded, with the committed text passed as the prompt,
+    and a word is committed once `agreement` consecutive decodes agree on it
+    (local agreement). This keeps the cost of a long turn roughly linear in its
+    length instead of quadratic. When decodes keep disagreeing, the window would
+    grow without bound, so once it exceeds `max_buffer_seconds` the words of the
+    latest decode are committed anyway.
+    """
+
+    SAMPLE_RATE = 16000
+
+    def __init__(
+        self,
+        model="distil-small.en",
+        device="cpu",
+        compute_type="default",
+        language=None,
+        num_threads=4,
+        beam_size: int = 5,
+        streaming: bool = False,
+        min_chunk_seconds: float = 1.0,
+        agreement: int = 2,
+        max_buffer_seconds: float = 15.0,
+        prompt_chars: int = 200,
+        **kwargs,
+    ):
         model_name = model.replace("whisper-", "")
         self.model = WhisperModel(model_size_or_path=model_name, download_root="./models/whisper", device=device, compute_type=compute_type, cpu_threads=num_threads)
+        self.language = language or None
+        self.beam_size = beam_size
+        self.supports_streaming = streaming
+        # Latency knob: how much new audio to collect before decoding again
+        self.min_chunk_seconds = min_chunk_seconds
+        # Stability knob: how many consecutive decodes must agree before a word is committed
+        self.agreement = max(1, agreement)
+        self.max_buffer_seconds = max_buffer_seconds
+        self.prompt_chars = prompt_chars
 
     def transcribe(self, audio_data: np.ndarray, sample_rate: int) -> str:
-        segments, _ = self.model.transcribe(audio_data, beam_size=5, language=self.language)
+        segments, _ = self.model.transcribe(audio_data, beam_size=self.beam_size, language=self.language)
         return " ".join([segment.text for segment in segments])
 
     def transcribe_np(self, audio_np: np.ndarray) -> str:
-        # faster-whisper works on the full audio, so we just transcribe it directly
-        # This implementation is not streaming, it will re-transcribe the whole buffer every time.
-        # For a production scenario, a more sophisticated streaming implementation would be needed.
-        segments, _ = self.model.transcribe(audio_np)
-        return " ".join([segment.text for segment in segments])
\ No newline at end of file
+        segments, _ = self.model.transcribe(audio_np, beam_size=self.beam_size, language=self.language)
+        return " ".join([segment.text for segment in segments])
+
+    def create_stream(self) -> WhisperStreamState:
+        return WhisperStreamState()
+
+    def _decode_tail(self, stream: WhisperStreamState) -> List[_Word]:
+        prompt = " ".join(word.text for word in stream.committed)[-self.prompt_chars:] or None
+        segments, _ = self.model.transcribe(
+            stream.audio,
+            beam_size=self.beam_size,
+            language=self.language,
+            initial_prompt=prompt,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+        )
+        words = []
+        for segment in segments:
+            for word in segment.words or []:
+                start = stream.offset + word.start
+                end = stream.offset + word.end
+                # Words overlapping the committed prefix were already emitted
+                if end <= stream.committed_end:
+                    continue
+                words.append(_Word(start=start, end=end, text=word.word.strip()))
+        stream.new_samples = 0
+        return words
+
+    def _commit(self, stream: WhisperStreamState, words: List[_Word]) -> None:
+        stream.hypotheses.append(words)
+        stream.hypotheses = stream.hypotheses[-self.agreement:]
+        if len(stream.hypotheses) < self.agreement:
+            return
+
+        agreed = 0
+        for position, word in enumerate(words):
+            if all(position < len(h) and h[position].key == word.key for h in stream.hypotheses):
+                agreed += 1
+            else:
+                break
+        if not agreed:
+            return
+
+        self._append_committed(stream, words[:agreed])
+        stream.hypotheses = [h[agreed:] for h in stream.hypotheses]
+        self._trim_audio(stream)
+
+    def _force_commit(self, stream: WhisperStreamState, words: List[_Word]) -> None:
+        """Commits the latest decode without agreement and caps the window."""
+        self._append_committed(stream, words)
+        stream.hypotheses = []
+        self._trim_audio(stream)
+        # Audio without any words, such as a long stretch of noise, is dropped too
+        excess = len(stream.audio) - int(self.max_buffer_seconds * self.SAMPLE_RATE)
+        if excess > 0:
+            stream.audio = stream.audio[excess:]
+            stream.offset += excess / self.SAMPLE_RATE
+
+    def _append_committed(self, stream: WhisperStreamState, words: List[_Word]) -> None:
+        if not words:
+            return
+        stream.committed_text = self._text([stream.committed_text, self._text(words)])
+        stream.committed.extend(words)
+        # Older words are only part of the committed text
+        chars = 0
+        for index in range(len(stream.committed) - 1, 0, -1):
+            chars += len(stream.committed[index].text) + 1
+            if chars >= self.prompt_chars:
+                del stream.committed[:index]
+                break
+
+    def _trim_audio(self, stream: WhisperStreamState) -> None:
+        # Drop the committed audio so the next decode only covers the tail
+        cut = int((stream.committed_end - stream.offset) * self.SAMPLE_RATE)
+        if cut > 0:
+            stream.audio = stream.audio[cut:]
+            stream.offset = stream.committed_end
+
+    @staticmethod
+    def _text(words: List[_Word | str]) -> str:
+        return " ".join(word if isinstance(word, str) else word.text for word in words).strip()
+
+    def process_stream(self, stream: WhisperStreamState, audio: np.ndarray) -> Tuple[str, bool]:
+        stream.audio = np.concatenate([stream.audio, audio.astype(np.float32, copy=False)])
+        stream.new_samples += len(audio)
+
+        if stream.new_samples >= self.min_chunk_seconds * self.SAMPLE_RATE:
+            words = self._decode_tail(stream)
+            if len(stream.audio) > self.max_buffer_seconds * self.SAMPLE_RATE:
+                self._force_commit(stream, words)
+            else:
+                self._commit(stream, words)
+
+        tail = stream.hypotheses[-1] if stream.hypotheses else []
+        # Whisper has no endpoint detection; the turn ends on user:audio_end.
+        return self._text([stream.committed_text, *tail]), False
+
+    def finalize_stream(self, stream: WhisperStreamState) -> str:
+        if len(stream.audio):
+            self._append_committed(stream, self._decode_tail(stream))
+        stream.hypotheses = []
+        return stream.committed_text
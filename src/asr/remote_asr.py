@@ -0,0 +1,133 @@
+import socket
+import struct
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from typing import List
+
+import numpy as np
+from loguru import logger
+
+from .asr_interface import ASRInterface
+
+# Request: length of the shared memory name, number of float32 samples, then the name.
+# Response: status, length of the payload, then the UTF-8 text or error message.
+REQUEST_HEADER = struct.Struct("<HI")
+RESPONSE_HEADER = struct.Struct("<BI")
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Shared memory buffers grow in steps of this size, so they are rarely recreated
+BUFFER_STEP_BYTES = 16000 * 4 * 5
+
+
+class RemoteASRError(RuntimeError):
+    """Raised when the ASR server fails a request."""
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("ASR server closed the connection.")
+        data += chunk
+    return bytes(data)
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attaches to a segment owned by another process without registering it with
+    this process's resource tracker, which would unlink it on exit.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no `track` argument
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+class RemoteASR(ASRInterface):
+    """
+    Client of the host-wide ASR server (`python -m src.asr.asr_server`), so web
+    workers share one loaded model instead of each loading their own.
+
+    Audio is written to a shared memory buffer that the server reads directly,
+    and only the buffer name and length go over the Unix socket. Each calling
+    thread has its own connection and buffer, so requests from the ASR
+    executor's threads reach the server concurrently and can be batched there.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._segments: List[shared_memory.SharedMemory] = []
+        self._segments_lock = threading.Lock()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _buffer(self, size: int) -> shared_memory.SharedMemory:
+        segment = getattr(self._local, "segment", None)
+        if segment is None or segment.size < size:
+            if segment is not None:
+                self._release(segment)
+            capacity = -(-size // BUFFER_STEP_BYTES) * BUFFER_STEP_BYTES
+            segment = shared_memory.SharedMemory(create=True, size=capacity)
+            with self._segments_lock:
+                self._segments.append(segment)
+            self._local.segment = segment
+        return segment
+
+    def _release(self, segment: shared_memory.SharedMemory):
+        with self._segments_lock:
+            if segment in self._segments:
+                self._segments.remove(segment)
+        segment.close()
+        segment.unlink()
+
+    def _drop_connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def transcribe_np(self, audio: np.ndarray) -> str:
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        segment = self._buffer(max(audio.nbytes, 1))
+        np.ndarray(audio.shape, dtype=np.float32, buffer=segment.buf)[:] = audio
+        name = segment.name.encode("utf-8")
+        request = REQUEST_HEADER.pack(len(name), audio.size) + name
+
+        # A connection the server closed while idle is reopened once
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                sock.sendall(request)
+                status, length = RESPONSE_HEADER.unpack(recv_exactly(sock, RESPONSE_HEADER.size))
+                payload = recv_exactly(sock, length).decode("utf-8")
+                break
+            except (ConnectionError, OSError) as e:
+                self._drop_connection()
+                if attempt:
+                    raise RemoteASRError(f"ASR server at {self.socket_path} unavailable: {e}") from e
+                logger.warning(f"Lost connection to the ASR server, reconnecting: {e}")
+
+        if status != STATUS_OK:
+            raise RemoteASRError(payload)
+        return payload
+
+    def close(self):
+        with self._segments_lock:
+            segments, self._segments = self._segments, []
+        for segment in segments:
+            segment.close()
+            segment.unlink()
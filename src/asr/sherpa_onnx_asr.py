@@ -4,6 +4,7 @@ import sherpa_onnx
 from loguru import logger
 from .asr_interface import ASRInterface
 from .utils import download_and_extract, check_and_extract_local_file
+from .batching import BatchDecoder
 import onnxruntime
 
 
@@ -16,6 +17,8 @@ class SherpaOnnxASR(ASRInterface):
         device: str = "cpu",
         compute_type: str = "",
         language: str = "",
+        batch_max_size: int = 1,
+        batch_max_wait_ms: float = 20.0,
     ) -> None:
         self.model_name = model
         self.num_threads = num_threads
@@ -38,6 +41,15 @@ class SherpaOnnxASR(ASRInterface):
 
         self.recognizer = self._create_recognizer()
 
+        self.batch_decoder: BatchDecoder | None = None
+        if batch_max_size > 1:
+            self.batch_decoder = BatchDecoder(
+                self.recognizer,
+                max_batch_size=batch_max_size,
+                max_wait_ms=batch_max_wait_ms,
+            )
+            logger.info(f"Sherpa-Onnx-ASR: Batching up to {batch_max_size} utterances, waiting at most {batch_max_wait_ms} ms")
+
     def _create_recognizer(self):
         if self.model_name.startswith("whisper"):
             encoder_path, decoder_path, tokens_path = self._get_model_paths()
@@ -175,6 +187,8 @@ class SherpaOnnxASR(ASRInterface):
 
 
     def transcribe_np(self, audio: np.ndarray) -> str:
+        if self.batch_decoder:
+            return self.batch_decoder.decode(audio)
         stream = self.recognizer.create_stream()
         stream.accept_waveform(16000, audio)
         self.recognizer.decode_streams([stream])
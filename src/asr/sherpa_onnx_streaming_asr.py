@@ -0,0 +1,157 @@
+import glob
+import os
+from typing import Tuple
+import numpy as np
+import sherpa_onnx
+from loguru import logger
+from .asr_interface import ASRInterface
+from .utils import download_and_extract, check_and_extract_local_file
+import onnxruntime
+
+
+class SherpaOnnxStreamingASR(ASRInterface):
+    """
+    Streaming ASR using the sherpa-onnx OnlineRecognizer.
+
+    Each session owns an OnlineStream that accepts audio incrementally, so the
+    transcript is available while the user is still talking and the utterance
+    end is found with the recognizer's built-in endpoint detection.
+    """
+
+    supports_streaming = True
+
+    SAMPLE_RATE = 16000
+    # Silence appended on finalize so the model emits the trailing tokens.
+    TAIL_PADDING_SECONDS = 0.66
+
+    def __init__(
+        self,
+        model: str = "streaming-zipformer-en",
+        num_threads: int = 4,
+        debug: bool = False,
+        device: str = "cpu",
+        compute_type: str = "",
+        rule1_min_trailing_silence: float = 2.4,
+        rule2_min_trailing_silence: float = 1.2,
+        rule3_min_utterance_length: float = 20.0,
+        **kwargs,
+    ) -> None:
+        self.model_name = model
+        self.num_threads = num_threads
+        self.debug = debug
+        self.device = device
+        self.compute_type = compute_type
+        self.endpoint_rules = dict(
+            rule1_min_trailing_silence=rule1_min_trailing_silence,
+            rule2_min_trailing_silence=rule2_min_trailing_silence,
+            rule3_min_utterance_length=rule3_min_utterance_length,
+        )
+        if self.device == "cuda":
+            try:
+                if "CUDAExecutionProvider" not in onnxruntime.get_available_providers():
+                    logger.warning(
+                        "CUDA provider not available for ONNX. Falling back to CPU."
+                    )
+                    self.device = "cpu"
+            except ImportError:
+                logger.warning("ONNX Runtime not installed. Falling back to CPU.")
+                self.device = "cpu"
+        logger.info(f"Sherpa-Onnx-Streaming-ASR: Using {self.device} for inference")
+
+        self.recognizer = self._create_recognizer()
+
+    def _create_recognizer(self):
+        model_dir = self._get_model_dir()
+        tokens_path = os.path.join(model_dir, "tokens.txt")
+        common = dict(
+            tokens=tokens_path,
+            num_threads=self.num_threads,
+            sample_rate=self.SAMPLE_RATE,
+            feature_dim=80,
+            enable_endpoint_detection=True,
+            debug=self.debug,
+            provider=self.device,
+            **self.endpoint_rules,
+        )
+
+        if "paraformer" in self.model_name:
+            return sherpa_onnx.OnlineRecognizer.from_paraformer(
+                encoder=self._find_model_file(model_dir, "encoder"),
+                decoder=self._find_model_file(model_dir, "decoder"),
+                **common,
+            )
+        elif "zipformer" in self.model_name:
+            return sherpa_onnx.OnlineRecognizer.from_transducer(
+                encoder=self._find_model_file(model_dir, "encoder"),
+                decoder=self._find_model_file(model_dir, "decoder"),
+                joiner=self._find_model_file(model_dir, "joiner"),
+                decoding_method="greedy_search",
+                **common,
+            )
+        else:
+            raise ValueError(f"Unsupported streaming model name: {self.model_name}")
+
+    def _get_model_dir(self) -> str:
+        model_path_dict = {
+            "streaming-zipformer-en": "sherpa-onnx-streaming-zipformer-en-2023-06-26",
+            "streaming-zipformer-bilingual-zh-en": "sherpa-onnx-streaming-zipformer-bilingual-zh-en-2023-02-20",
+            "streaming-paraformer-bilingual-zh-en": "sherpa-onnx-streaming-paraformer-bilingual-zh-en",
+        }
+        if self.model_name not in model_path_dict:
+            raise ValueError(f"Unsupported streaming model name: {self.model_name}. Supported models are: {list(model_path_dict.keys())}")
+
+        model_dir_name = model_path_dict[self.model_name]
+        logger.info(f"Using streaming asr model: {model_dir_name}")
+        model_dir = f"./models/{model_dir_name}"
+
+        if not os.path.exists(model_dir):
+            logger.info(f"Model not found at {model_dir}. Downloading...")
+            url = f"https://github.com/k2-fsa/sherpa-onnx/releases/download/asr-models/{model_dir_name}.tar.bz2"
+            output_dir = "./models"
+            local_result = check_and_extract_local_file(url, output_dir)
+
+            if local_result is None:
+                logger.info("Local file not found. Downloading...")
+                download_and_extract(url, output_dir)
+            else:
+                logger.info("Local file found. Using existing file.")
+
+        return model_dir
+
+    def _find_model_file(self, model_dir: str, part: str) -> str:
+        """Picks the encoder/decoder/joiner file, preferring int8 weights when requested."""
+        candidates = sorted(glob.glob(os.path.join(model_dir, f"{part}*.onnx")))
+        if not candidates:
+            raise FileNotFoundError(f"No {part} model found in {model_dir}")
+        int8 = [path for path in candidates if path.endswith(".int8.onnx")]
+        full = [path for path in candidates if not path.endswith(".int8.onnx")]
+        if self.compute_type == "int8" and int8:
+            return int8[0]
+        return (full or int8)[0]
+
+    def create_stream(self) -> "sherpa_onnx.OnlineStream":
+        return self.recognizer.create_stream()
+
+    def _decode_ready(self, stream) -> str:
+        while self.recognizer.is_ready(stream):
+            self.recognizer.decode_stream(stream)
+        return self.recognizer.get_result(stream).strip()
+
+    def process_stream(self, stream, audio: np.ndarray) -> Tuple[str, bool]:
+        stream.accept_waveform(self.SAMPLE_RATE, audio)
+        text = self._decode_ready(stream)
+        is_endpoint = self.recognizer.is_endpoint(stream)
+        if is_endpoint:
+            self.recognizer.reset(stream)
+        return text, is_endpoint
+
+    def finalize_stream(self, stream) -> str:
+        tail_padding = np.zeros(int(self.SAMPLE_RATE * self.TAIL_PADDING_SECONDS), dtype=np.float32)
+        stream.accept_waveform(self.SAMPLE_RATE, tail_padding)
+        stream.input_finished()
+        return self._decode_ready(stream)
+
+    def transcribe_np(self, audio: np.ndarray) -> str:
+        stream = self.create_stream()
+        stream.accept_waveform(self.SAMPLE_RATE, audio)
+        return self.finalize_stream(stream)
@@ -1,18 +1,36 @@
 import numpy as np
 from loguru import logger
-import noisereduce as nr
-import pyloudnorm as pyln
-from scipy.signal import butter, lfilter
 from ..config import app_config
+from .dsp import DSPStage, create_dsp_chain
+
+
+def _configured_stages() -> list[str]:
+    if app_config.DSP_STAGES.strip():
+        return [name.strip() for name in app_config.DSP_STAGES.split(',') if name.strip()]
+
+    # Legacy flags
+    stages = []
+    if app_config.BAND_PASS_FILTER:
+        stages.append("band_pass")
+    if app_config.NOISE_REDUCTION:
+        stages.append("noisereduce")
+    if app_config.LOUDNESS_NORMALIZATION:
+        stages.append("loudness")
+    return stages
+
 
 class AudioProcessor:
-    def _band_pass_filter(self, data, sample_rate, lowcut=300.0, highcut=3400.0, order=5):
-        nyquist = 0.5 * sample_rate
-        low = lowcut / nyquist
-        high = highcut / nyquist
-        b, a = butter(order, [low, high], btype='band')
-        y = lfilter(b, a, data)
-        return y
+    """
+    Per-session audio processing pipeline.
+
+    Runs the DSP stages configured through `APP_DSP_STAGES` in order. Every
+    stage keeps its own state (filter memory, noise profile, gain) across the
+    chunks of a session, so each chunk is processed on its own, without padding.
+    """
+
+    def __init__(self, stages: list[str] | None = None):
+        self.stages: list[DSPStage] = create_dsp_chain(stages if stages is not None else _configured_stages())
+        self._sample_rate: int | None = None
 
     def process(self, audio_np: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
         """
@@ -21,21 +39,16 @@ class AudioProcessor:
         if not app_config.ENABLE_AUDIO_PROCESSING:
             return audio_np
 
-        padding = np.zeros(int(sample_rate * 1), dtype=np.float32)
-        processed_audio = np.concatenate([padding, audio_np])
-
-        if app_config.NOISE_REDUCTION:
-            try:
-                processed_audio = nr.reduce_noise(y=processed_audio, sr=sample_rate)
-            except Exception as e:
-                logger.warning(f"Failed to apply noise reduction: {e}")
+        if sample_rate != self._sample_rate:
+            self._sample_rate = sample_rate
+            for stage in self.stages:
+                stage.reset()
 
-        if app_config.LOUDNESS_NORMALIZATION:
+        processed_audio = audio_np
+        for stage in self.stages:
             try:
-                meter = pyln.Meter(sample_rate)
-                loudness = meter.integrated_loudness(processed_audio)
-                processed_audio = pyln.normalize.loudness(processed_audio, loudness, -23.0)
+                processed_audio = stage.process(processed_audio, sample_rate)
             except Exception as e:
-                logger.warning(f"Failed to apply loudness normalization: {e}")
+                logger.warning(f"Failed to apply {type(stage).__name__}: {e}")
 
-        return processed_audio
\ No newline at end of file
+        return processed_audio.astype(np.float32, copy=False)
@@ -0,0 +1,251 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+from loguru import logger
+
+from .. import metrics
+
+Region = Tuple[int, int]
+
+
+@dataclass
+class VADResult:
+    segments: List[np.ndarray]
+    input_seconds: float
+    kept_seconds: float
+
+    @property
+    def removed_seconds(self) -> float:
+        return self.input_seconds - self.kept_seconds
+
+
+class VADInterface(ABC):
+    """
+    Abstract base class for voice activity detectors.
+    """
+
+    @abstractmethod
+    def detect(self, audio: np.ndarray, sample_rate: int) -> List[Region]:
+        """
+        Finds the speech regions in the audio.
+
+        Args:
+            audio: Mono float32 audio.
+            sample_rate: The sample rate of the audio.
+
+        Returns:
+            A list of (start, end) sample indices, in order and non-overlapping.
+        """
+        pass
+
+
+def _frame_rms_db(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    num_frames = len(audio) // frame_length
+    if num_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:num_frames * frame_length].reshape(num_frames, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20.0 * np.log10(rms + 1e-10)
+
+
+class EnergyVAD(VADInterface):
+    """
+    Frame energy VAD. A frame is speech when it is louder than both an absolute
+    floor and the estimated noise floor of the chunk plus a margin. Chunks with
+    too little silence to estimate the noise floor from, where the estimate
+    comes out above `max_noise_db`, use the absolute floor alone.
+    """
+
+    def __init__(
+        self,
+        frame_ms: float = 30.0,
+        min_db: float = -50.0,
+        noise_margin_db: float = 10.0,
+        max_noise_db: float = -40.0,
+        min_speech_ms: float = 150.0,
+        min_silence_ms: float = 300.0,
+        speech_pad_ms: float = 100.0,
+    ):
+        self.frame_ms = frame_ms
+        self.min_db = min_db
+        self.noise_margin_db = noise_margin_db
+        self.max_noise_db = max_noise_db
+        self.min_speech_ms = min_speech_ms
+        self.min_silence_ms = min_silence_ms
+        self.speech_pad_ms = speech_pad_ms
+
+    def detect(self, audio: np.ndarray, sample_rate: int) -> List[Region]:
+        frame_length = int(sample_rate * self.frame_ms / 1000)
+        levels = _frame_rms_db(audio, frame_length)
+        if len(levels) == 0:
+            return []
+
+        # The quietest tenth of the frames is the background noise, unless the
+        # chunk is nearly all speech and those frames are speech too
+        noise_floor = np.percentile(levels, 10)
+        if noise_floor > self.max_noise_db:
+            threshold = self.min_db
+        else:
+            threshold = max(self.min_db, noise_floor + self.noise_margin_db)
+        is_speech = levels > threshold
+
+        # Runs of speech frames, as [start, end) frame indices
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], is_speech.astype(np.int8), [0]])))
+        runs = list(zip(edges[::2], edges[1::2]))
+
+        min_silence = self.min_silence_ms / self.frame_ms
+        min_speech = self.min_speech_ms / self.frame_ms
+        merged: List[List[int]] = []
+        for start, end in runs:
+            if merged and start - merged[-1][1] < min_silence:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+
+        pad = int(sample_rate * self.speech_pad_ms / 1000)
+        regions = []
+        for start, end in merged:
+            if end - start < min_speech:
+                continue
+            regions.append((max(0, start * frame_length - pad), min(len(audio), end * frame_length + pad)))
+        return regions
+
+
+class SileroVAD(VADInterface):
+    """
+    Model-based VAD using the Silero ONNX model through sherpa-onnx.
+    """
+
+    MODEL_URL = "https://github.com/k2-fsa/sherpa-onnx/releases/download/asr-models/silero_vad.onnx"
+
+    def __init__(
+        self,
+        model_path: str = "./models/silero_vad.onnx",
+        threshold: float = 0.5,
+        min_speech_ms: float = 150.0,
+        min_silence_ms: float = 300.0,
+        sample_rate: int = 16000,
+        num_threads: int = 1,
+    ):
+        import sherpa_onnx
+        from ..asr.utils import download_and_extract
+
+        if not os.path.exists(model_path):
+            logger.info(f"VAD model not found at {model_path}. Downloading...")
+            download_and_extract(self.MODEL_URL, os.path.dirname(model_path))
+
+        config = sherpa_onnx.VadModelConfig()
+        config.silero_vad.model = model_path
+        config.silero_vad.threshold = threshold
+        config.silero_vad.min_speech_duration = min_speech_ms / 1000
+        config.silero_vad.min_silence_duration = min_silence_ms / 1000
+        config.sample_rate = sample_rate
+        config.num_threads = num_threads
+
+        self.sample_rate = sample_rate
+        self.window_size = config.silero_vad.window_size
+        self.detector = sherpa_onnx.VoiceActivityDetector(config, buffer_size_in_seconds=60)
+        # The detector is stateful, so calls from different worker threads take turns
+        self._lock = threading.Lock()
+
+    def detect(self, audio: np.ndarray, sample_rate: int) -> List[Region]:
+        if sample_rate != self.sample_rate:
+            raise ValueError(f"SileroVAD was configured for {self.sample_rate} Hz, got {sample_rate} Hz.")
+
+        regions = []
+        with self._lock:
+            self.detector.reset()
+            for i in range(0, len(audio), self.window_size):
+                self.detector.accept_waveform(audio[i:i + self.window_size])
+            self.detector.flush()
+            while not self.detector.empty():
+                segment = self.detector.front
+                regions.append((segment.start, segment.start + len(segment.samples)))
+                self.detector.pop()
+        return regions
+
+
+class VADStage:
+    """
+    Pipeline stage in front of the ASR. It trims leading and trailing silence,
+    drops chunks without speech, and cuts long speech regions into segments of
+    at most `max_segment_seconds` at the quietest point near the limit, so each
+    segment can be decoded as soon as it is ready.
+    """
+
+    def __init__(self, vad: VADInterface, max_segment_seconds: float = 15.0):
+        self.vad = vad
+        self.max_segment_seconds = max_segment_seconds
+        self._lock = threading.Lock()
+        self.chunks = 0
+        self.dropped_chunks = 0
+        self.input_seconds = 0.0
+        self.removed_seconds = 0.0
+
+    def _split_long(self, audio: np.ndarray, region: Region, sample_rate: int) -> List[Region]:
+        max_length = int(self.max_segment_seconds * sample_rate)
+        frame_length = int(sample_rate * 0.02)
+        start, end = region
+        pieces = []
+        while end - start > max_length:
+            # Look for the quietest frame in the last 40% of the window
+            search_start = start + int(max_length * 0.6)
+            levels = _frame_rms_db(audio[search_start:start + max_length], frame_length)
+            cut = search_start + int(np.argmin(levels)) * frame_length if len(levels) else start + max_length
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+        return pieces
+
+    def process(self, audio: np.ndarray, sample_rate: int = 16000) -> VADResult:
+        regions = []
+        for region in self.vad.detect(audio, sample_rate):
+            regions.extend(self._split_long(audio, region, sample_rate))
+
+        segments = [audio[start:end] for start, end in regions]
+        result = VADResult(
+            segments=segments,
+            input_seconds=len(audio) / sample_rate,
+            kept_seconds=sum(len(segment) for segment in segments) / sample_rate,
+        )
+
+        with self._lock:
+            self.chunks += 1
+            self.dropped_chunks += 0 if segments else 1
+            self.input_seconds += result.input_seconds
+            self.removed_seconds += result.removed_seconds
+        metrics.vad_input_seconds.inc(result.input_seconds)
+        metrics.vad_removed_seconds.inc(result.removed_seconds)
+        if not segments:
+            metrics.vad_dropped_chunks.inc()
+        logger.info(
+            f"VAD kept {len(segments)} segment(s), removed {result.removed_seconds:.2f} of {result.input_seconds:.2f} seconds"
+        )
+        return result
+
+    def stats(self) -> dict:
+        """Returns how much audio the stage has kept away from the recognizer so far."""
+        with self._lock:
+            return {
+                "chunks": self.chunks,
+                "dropped_chunks": self.dropped_chunks,
+                "input_seconds": self.input_seconds,
+                "removed_seconds": self.removed_seconds,
+                "removed_ratio": self.removed_seconds / self.input_seconds if self.input_seconds else 0.0,
+            }
+
+
+def create_vad_stage(engine: str, max_segment_seconds: float = 15.0, **kwargs) -> VADStage | None:
+    if engine in ("", "none"):
+        return None
+    elif engine == "energy":
+        vad = EnergyVAD(**kwargs)
+    elif engine == "silero":
+        vad = SileroVAD(**kwargs)
+    else:
+        raise ValueError(f"Unknown VAD engine: {engine}")
+    return VADStage(vad, max_segment_seconds=max_segment_seconds)
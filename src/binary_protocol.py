@@ -0,0 +1,78 @@
+import struct
+from dataclasses import dataclass
+import numpy as np
+
+# Binary WebSocket frames start with an 8-byte little-endian header:
+#   uint8  message type
+#   uint8  sample format
+#   uint16 flags
+#   uint32 sequence number
+# followed by the raw payload. The header size keeps the payload aligned for
+# both int16 and float32 samples.
+HEADER = struct.Struct("<BBHI")
+HEADER_SIZE = HEADER.size
+
+# Flags
+# Set on the last audio frame of an avatar:speak message
+FLAG_FINAL = 1
+
+# Message types
+MSG_USER_AUDIO_CHUNK = 1
+# Server -> client TTS audio for the avatar:speak message whose audio_id is the
+# sequence number. Audio may arrive in several frames; the last has FLAG_FINAL.
+MSG_AVATAR_SPEAK_AUDIO = 2
+
+# Sample formats (0 means the payload is an encoded file, e.g. MP3 or WAV)
+FORMAT_ENCODED = 0
+FORMAT_PCM_S16LE = 1
+FORMAT_PCM_F32LE = 2
+
+_SAMPLE_DTYPES = {
+    FORMAT_PCM_S16LE: np.dtype("<i2"),
+    FORMAT_PCM_F32LE: np.dtype("<f4"),
+}
+
+
+class BinaryProtocolError(ValueError):
+    """Raised when a binary frame cannot be parsed."""
+
+
+@dataclass
+class BinaryFrame:
+    message_type: int
+    sample_format: int
+    sequence: int
+    flags: int
+    payload: memoryview
+
+
+def parse_frame(data: bytes) -> BinaryFrame:
+    if len(data) < HEADER_SIZE:
+        raise BinaryProtocolError(f"Binary frame of {len(data)} bytes is shorter than the {HEADER_SIZE}-byte header.")
+    message_type, sample_format, flags, sequence = HEADER.unpack_from(data)
+    return BinaryFrame(message_type, sample_format, sequence, flags, memoryview(data)[HEADER_SIZE:])
+
+
+def pack_header(message_type: int, sequence: int, sample_format: int = FORMAT_ENCODED, flags: int = 0) -> bytes:
+    return HEADER.pack(message_type, sample_format, flags, sequence)
+
+
+def audio_from_frame(frame: BinaryFrame) -> np.ndarray:
+    """
+    Returns the frame's PCM payload as mono float32 audio in [-1, 1].
+
+    float32 payloads are returned as a read-only view of the received buffer
+    without copying; int16 payloads are viewed in place and converted once.
+    """
+    dtype = _SAMPLE_DTYPES.get(frame.sample_format)
+    if dtype is None:
+        raise BinaryProtocolError(f"Unknown sample format: {frame.sample_format}")
+    if len(frame.payload) % dtype.itemsize:
+        raise BinaryProtocolError(f"Payload of {len(frame.payload)} bytes is not a whole number of samples.")
+
+    samples = np.frombuffer(frame.payload, dtype=dtype)
+    if frame.sample_format == FORMAT_PCM_F32LE:
+        return samples
+    audio = samples.astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
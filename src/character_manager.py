@@ -1,8 +1,13 @@
 from loguru import logger
+import asyncio
+import json
+import threading
 import yaml
 import os
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from .live2d.live2d_model import Live2dModel
+from .prompts import prompt_loader
 
 @dataclass
 class Character:
@@ -15,39 +20,209 @@ class Character:
     tts_engine: Dict[str, Any]
     extra_data: Dict[str, Any]
 
+@dataclass(frozen=True)
+class CharacterBundle:
+    """
+    Everything a session needs from a character, prepared when the character
+    is loaded so starting a session does no file I/O. Shared by all sessions
+    of the character and must not be modified.
+    """
+    character: Character
+    live2d_model: Live2dModel
+    system_prompt: str
+
+PROMPT_UTILS = ["live2d_expression_prompt", "live2d_motion_prompt", "speakable_prompt", "concise_style_prompt"]
+
+def _load_prompt_utils() -> Dict[str, str | None]:
+    prompts = {}
+    for name in PROMPT_UTILS:
+        try:
+            prompts[name] = prompt_loader.load_util(name)
+        except Exception:
+            prompts[name] = None
+    return prompts
+
+def build_system_prompt(character: Character, live2d_model: Live2dModel, prompts: Dict[str, str | None]) -> str:
+    if prompts["live2d_expression_prompt"] is not None:
+        expression_prompt = prompts["live2d_expression_prompt"].replace(
+            "[<insert_emomap_keys>]", live2d_model.emo_str
+        )
+    else:
+        logger.error("Error loading expression prompt, falling back to default.")
+        expression_prompt = f"You can use the following expressions: {live2d_model.emo_str}"
+
+    if prompts["live2d_motion_prompt"] is not None:
+        motion_prompt = prompts["live2d_motion_prompt"].replace(
+            "[<insert_motion_keys>]", live2d_model.motion_str
+        )
+    else:
+        logger.error("Error loading motion prompt, falling back to default.")
+        motion_prompt = f"You can use the following motions: {live2d_model.motion_str}"
+
+    speakable_prompt = prompts["speakable_prompt"] or ""
+    concise_style_prompt = prompts["concise_style_prompt"] or ""
+
+    return f"{character.llm_persona}\n\n{speakable_prompt}\n\n{expression_prompt}\n\n{motion_prompt}\n\n{concise_style_prompt}"
+
 class CharacterManager:
-    def __init__(self, characters_dir: str = "characters"):
-        self.characters: Dict[str, Character] = {}
+    """
+    Loads the character configs and prepares a bundle per character.
+
+    `reload()` picks up added, edited and deleted config files. The new
+    characters and bundles are built aside and swapped in by one assignment,
+    so readers never see a half-reloaded set, and sessions keep the bundle
+    they started with. A character whose edited config fails to load keeps
+    its previous version.
+    """
+
+    def __init__(self, characters_dir: str = "characters", model_dict_path: str = "model_dict.json"):
         self.characters_dir = characters_dir
-        self._load_characters()
+        self.model_dict_path = model_dict_path
+        self._catalog: Tuple[Dict[str, Character], Dict[str, CharacterBundle]] = ({}, {})
+        # Modification times of the files the catalog was built from
+        self._mtimes: Dict[str, float] = {}
+        self._reload_lock = threading.Lock()
+        self.reload()
+
+    @property
+    def characters(self) -> Dict[str, Character]:
+        return self._catalog[0]
+
+    @property
+    def bundles(self) -> Dict[str, CharacterBundle]:
+        return self._catalog[1]
 
-    def _load_characters(self):
+    def _scan(self) -> Dict[str, float]:
         if not os.path.isdir(self.characters_dir):
             logger.warning(f"Characters directory '{self.characters_dir}' not found. Creating it.")
             os.makedirs(self.characters_dir)
-            return
 
+        mtimes = {}
         for filename in os.listdir(self.characters_dir):
             if filename.endswith(".yaml") or filename.endswith(".yml"):
                 filepath = os.path.join(self.characters_dir, filename)
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    try:
-                        config = yaml.safe_load(f)
-                        char_id = filename.split('.')[0]
-                        character = Character(
-                            id=char_id,
-                            name=config.get("name", "Unknown"),
-                            llm_persona=config.get("llm_persona", ""),
-                            live2d_model_name=config.get("live2d_model_name", ""),
-                            motion_map=config.get("motion_map", {}),
-                            asr_engine=config.get("asr_engine", {}),
-                            tts_engine=config.get("tts_engine", {}),
-                            extra_data=config.get("extra_data", {})
-                        )
-                        self.characters[char_id] = character
-                        logger.info(f"Loaded character: {character.name}")
-                    except yaml.YAMLError as e:
-                        logger.error(f"Error loading character from {filename}: {e}")
+                try:
+                    mtimes[filepath] = os.stat(filepath).st_mtime
+                except FileNotFoundError:
+                    continue
+        try:
+            mtimes[self.model_dict_path] = os.stat(self.model_dict_path).st_mtime
+        except FileNotFoundError:
+            pass
+        return mtimes
+
+    def _load_character(self, filepath: str) -> Character | None:
+        filename = os.path.basename(filepath)
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError) as e:
+            logger.error(f"Error loading character from {filename}: {e}")
+            return None
+        if not isinstance(config, dict):
+            logger.error(f"Error loading character from {filename}: expected a mapping, got {type(config).__name__}")
+            return None
+
+        char_id = filename.split('.')[0]
+        character = Character(
+            id=char_id,
+            name=config.get("name", "Unknown"),
+            llm_persona=config.get("llm_persona", ""),
+            live2d_model_name=config.get("live2d_model_name", ""),
+            motion_map=config.get("motion_map", {}),
+            asr_engine=config.get("asr_engine", {}),
+            tts_engine=config.get("tts_engine", {}),
+            extra_data=config.get("extra_data", {})
+        )
+        logger.info(f"Loaded character: {character.name}")
+        return character
+
+    def _build_bundle(self, character: Character, model_dict: List[Dict], prompts: Dict[str, str | None]) -> CharacterBundle | None:
+        try:
+            live2d_model = Live2dModel(
+                live2d_model_name=character.live2d_model_name,
+                model_dict_path=self.model_dict_path,
+                model_dict=model_dict
+            )
+        except Exception as e:
+            logger.error(f"Error loading Live2D model for character {character.name}: {e}")
+            return None
+        return CharacterBundle(
+            character=character,
+            live2d_model=live2d_model,
+            system_prompt=build_system_prompt(character, live2d_model, prompts)
+        )
+
+    def reload(self) -> bool:
+        """
+        Rebuilds the characters whose config changed since the last load.
+        Returns whether anything changed.
+        """
+        with self._reload_lock:
+            mtimes = self._scan()
+            if mtimes == self._mtimes:
+                return False
+
+            try:
+                with open(self.model_dict_path, 'r', encoding='utf-8') as f:
+                    model_dict = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.error(f"Error loading model dictionary {self.model_dict_path}: {e}")
+                return False
+
+            # Every bundle depends on the model dictionary
+            rebuild_all = mtimes.get(self.model_dict_path) != self._mtimes.get(self.model_dict_path)
+            old_characters, old_bundles = self._catalog
+            characters: Dict[str, Character] = {}
+            bundles: Dict[str, CharacterBundle] = {}
+            prompts = None
+            for filepath, mtime in mtimes.items():
+                if filepath == self.model_dict_path:
+                    continue
+                char_id = os.path.basename(filepath).split('.')[0]
+                if not rebuild_all and self._mtimes.get(filepath) == mtime and char_id in old_characters:
+                    characters[char_id] = old_characters[char_id]
+                    if char_id in old_bundles:
+                        bundles[char_id] = old_bundles[char_id]
+                    continue
+
+                character = self._load_character(filepath)
+                bundle = None
+                if character is not None:
+                    if prompts is None:
+                        prompts = _load_prompt_utils()
+                    bundle = self._build_bundle(character, model_dict, prompts)
+                if bundle is None and char_id in old_characters:
+                    # A broken edit does not take a loaded character away
+                    logger.warning(f"Keeping the previous version of character '{char_id}'.")
+                    characters[char_id] = old_characters[char_id]
+                    if char_id in old_bundles:
+                        bundles[char_id] = old_bundles[char_id]
+                    continue
+                if character is None:
+                    continue
+                characters[char_id] = character
+                if bundle is not None:
+                    bundles[char_id] = bundle
+
+            for char_id in old_characters.keys() - characters.keys():
+                logger.info(f"Removed character: {old_characters[char_id].name}")
+
+            self._catalog = (characters, bundles)
+            self._mtimes = mtimes
+            return True
+
+    async def watch(self, interval: float):
+        """Polls the config files every `interval` seconds and reloads changes."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as e:
+                logger.error(f"Error reloading characters: {e}")
+
+    def get_bundle(self, character_id: str) -> CharacterBundle | None:
+        return self.bundles.get(character_id)
 
     def get_character(self, character_id: str) -> Character | None:
         return self.characters.get(character_id)
@@ -9,21 +9,51 @@ class LLMConfig(BaseSettings):
     LLM_MODEL: str = Field(default="z-ai/glm-4.5-air:free", description="LLM model to use.")
     OPENROUTER_API_KEY: Optional[str] = Field(default=None, description="OpenRouter API key.")
     GEMINI_API_KEY: Optional[str] = Field(default=None, description="Google Gemini API key.")
+    LLM_TIMEOUT: float = Field(default=60.0, description="Seconds to wait for LLM response data before the request fails.")
 
 class ASRConfig(BaseSettings):
     model_config = SettingsConfigDict(env_prefix='ASR_', case_sensitive=False, env_file='.env', extra='ignore')
 
-    ENGINE: str = Field(default="sherpa_onnx_asr", description="ASR engine to use. Options: 'sherpa_onnx_asr', 'faster_whisper_asr'")
+    ENGINE: str = Field(default="sherpa_onnx_asr", description="ASR engine to use. Options: 'sherpa_onnx_asr', 'sherpa_onnx_streaming_asr', 'faster_whisper_asr'")
     DEVICE: str = Field(default="cpu", description="Device for ASR inference, e.g., 'cpu', 'cuda', auto")
     MODEL: str = Field(default="parakeet", description="Model for Faster Whisper ASR or Model for Sherpa.")
     COMPUTE_TYPE: str = Field(default=None, description="Compute type for ASR.")
     CPU_THREADS: int = Field(default=4, description="Number of CPU threads for ASR.")
+    EXECUTOR_MODE: str = Field(default="thread", description="Where ASR inference runs. Options: 'thread', 'process'")
+    EXECUTOR_WORKERS: int = Field(default=1, description="Number of ASR worker threads or processes.")
+    EXECUTOR_MAX_PENDING: int = Field(default=32, description="Maximum number of ASR requests queued or running before callers have to wait.")
+    EXECUTOR_QUEUE_TIMEOUT: float = Field(default=10.0, description="Seconds an ASR request may wait for a queue slot before it is rejected.")
+    LANGUAGE: str = Field(default="", description="Language of the speech, e.g. 'en'. Empty for automatic detection where supported.")
+    WHISPER_BEAM_SIZE: int = Field(default=5, description="Beam size for Faster Whisper ASR.")
+    WHISPER_STREAMING: bool = Field(default=False, description="Decode Faster Whisper ASR incrementally with local agreement instead of one shot per chunk.")
+    WHISPER_MIN_CHUNK_SECONDS: float = Field(default=1.0, description="Seconds of new audio collected before the streaming Whisper decoder runs again. Lower is faster but costs more CPU.")
+    WHISPER_AGREEMENT: int = Field(default=2, description="Number of consecutive streaming Whisper decodes that must agree before words are committed. Higher is more stable but slower.")
+    WHISPER_MAX_BUFFER_SECONDS: float = Field(default=15.0, description="Seconds of uncommitted audio after which the streaming Whisper decoder commits its latest words without agreement, so each decode stays bounded.")
+    BATCH_MAX_SIZE: int = Field(default=1, description="Maximum number of utterances decoded together by Sherpa ASR. 1 disables batching.")
+    BATCH_MAX_WAIT_MS: float = Field(default=20.0, description="Maximum time in milliseconds an utterance waits for a batch to fill.")
+    SERVER_SOCKET: str = Field(default="", description="Unix socket of the host-wide ASR server. When set, web workers send audio to the server instead of loading the model themselves.")
+    SERVER_TIMEOUT: float = Field(default=30.0, description="Seconds to wait for the ASR server to answer a request.")
 
 class ChatterboxTTSConfig(BaseSettings):
     model_config = SettingsConfigDict(env_prefix='CHATTERBOX_TTS_', case_sensitive=False, env_file='.env', extra='ignore')
 
     BASE_URL: str = Field(default=None, description="Base URL for Chatterbox TTS.")
     API_KEY: Optional[str] = Field(default=None, description="API key for Chatterbox TTS.")
+    TIMEOUT: float = Field(default=30.0, description="Seconds to wait for Chatterbox TTS audio before the request fails.")
+
+class HTTPConfig(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix='HTTP_', case_sensitive=False, env_file='.env', extra='ignore')
+
+    MAX_CONNECTIONS: int = Field(default=100, description="Maximum number of open connections per pooled HTTP client.")
+    MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, description="Maximum number of idle connections kept alive per pooled HTTP client.")
+    KEEPALIVE_EXPIRY: float = Field(default=30.0, description="Seconds an idle connection is kept alive.")
+    HTTP2: bool = Field(default=False, description="Use HTTP/2 where the server supports it. Requires the 'h2' package.")
+    CONNECT_TIMEOUT: float = Field(default=5.0, description="Seconds to wait for a connection to be established.")
+    READ_TIMEOUT: float = Field(default=30.0, description="Seconds to wait for response data.")
+    WRITE_TIMEOUT: float = Field(default=10.0, description="Seconds to wait while sending request data.")
+    POOL_TIMEOUT: float = Field(default=5.0, description="Seconds to wait for a free connection from the pool.")
+    RETRIES: int = Field(default=2, description="Number of retries for failed idempotent requests.")
+    RETRY_BACKOFF: float = Field(default=0.2, description="Base delay in seconds of the exponential retry backoff. Each delay is randomized (full jitter).")
 
 class AppConfig(BaseSettings):
     model_config = SettingsConfigDict(env_prefix='APP_', case_sensitive=False, env_file='.env', extra='ignore')
@@ -31,10 +61,35 @@ class AppConfig(BaseSettings):
     ALLOWED_ORIGINS: str = Field(default="*", description="Allowed origins for CORS, comma-separated. Use '*' for all.")
     DEBUG_SAVE_AUDIO: bool = Field(default=False, description="Save original and normalized audio for debugging.")
     ENABLE_AUDIO_PROCESSING: bool = Field(default=True, description="Enable audio processing.")
+    DSP_STAGES: str = Field(default="", description="Comma-separated DSP stages applied to user audio, in order. Options: 'band_pass', 'spectral_gate', 'agc', 'noisereduce', 'loudness'. Empty uses the legacy flags below.")
+    BAND_PASS_FILTER: bool = Field(default=False, description="Enable the 300-3400 Hz band-pass filter.")
     NOISE_REDUCTION: bool = Field(default=True, description="Enable noise reduction.")
     LOUDNESS_NORMALIZATION: bool = Field(default=True, description="Enable loudness normalization.")
+    VAD_ENGINE: str = Field(default="none", description="Server-side VAD run in front of the ASR. Options: 'none', 'energy', 'silero'")
+    VAD_MIN_SPEECH_MS: float = Field(default=150.0, description="Speech regions shorter than this are dropped as noise.")
+    VAD_MIN_SILENCE_MS: float = Field(default=300.0, description="Pauses shorter than this do not split speech regions.")
+    VAD_MAX_SEGMENT_SECONDS: float = Field(default=15.0, description="Longer speech regions are cut into segments that are decoded one after another.")
+    CONTEXT_MAX_TOKENS: int = Field(default=3000, description="Approximate token budget of the conversation sent to the LLM each turn, including the system prompt.")
+    CONTEXT_SUMMARIZE_TOKENS: int = Field(default=1000, description="Approximate tokens of old turns that have to leave the context window before they are folded into the summary.")
+    SEND_QUEUE_MAX_MESSAGES: int = Field(default=512, description="Messages queued for a client before it is considered too slow and disconnected. Outdated partial transcriptions are dropped first.")
+    SEND_QUEUE_MAX_BYTES: int = Field(default=8 * 1024 * 1024, description="Bytes queued for a client before it is considered too slow and disconnected.")
+    SEND_QUEUE_HIGH_WATER_BYTES: int = Field(default=512 * 1024, description="Bytes queued for a client above which TTS audio waits for the client to catch up instead of being queued.")
+    SEND_TIMEOUT: float = Field(default=10.0, description="Seconds a client may take to accept one message before it is disconnected.")
+    TRACE_BUFFER_SIZE: int = Field(default=200, description="Number of recent conversational turns whose latency traces are kept for /debug/turns.")
+    TRACE_EXPORT_PATH: str = Field(default="", description="File that finished turn traces are appended to, in the Chrome trace event format. Empty disables the export.")
+    SESSION_STORE_URL: str = Field(default="memory", description="Where session state is kept between connections: 'memory' for this process only, or a 'redis://[:password@]host[:port][/db]' URL shared by all workers.")
+    SESSION_TTL_SECONDS: float = Field(default=1800.0, description="Seconds a disconnected session's state is kept for the client to reconnect.")
+    WORKERS: int = Field(default=1, description="Number of server worker processes. More than one requires a shared session store.")
+    TTS_LOOKAHEAD: int = Field(default=2, description="Number of sentences synthesized ahead of the one being spoken. 0 synthesizes one sentence at a time.")
+    TTS_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024, description="Memory budget of the synthesized audio cache in bytes. 0 disables the cache.")
+    TTS_CACHE_DIR: str = Field(default="", description="Directory for the on-disk tier of the TTS cache. Empty keeps the cache in memory only.")
+    TTS_CACHE_DISK_MAX_BYTES: int = Field(default=1024 * 1024 * 1024, description="Size limit of the on-disk TTS cache in bytes. 0 means unlimited.")
+    TTS_ENGINE_IDLE_SECONDS: float = Field(default=300.0, description="TTS engines no session has used for this many seconds are unloaded.")
+    TTS_WARMUP_CHARACTERS: str = Field(default="", description="Comma-separated ids of characters whose TTS engine synthesizes a short phrase at startup, before the service reports ready.")
+    CHARACTERS_RELOAD_INTERVAL: float = Field(default=2.0, description="Seconds between checks of the character configs for changes. 0 disables hot reload.")
 
 app_config = AppConfig()
 llm_config = LLMConfig()
 asr_config = ASRConfig()
-chatterbox_tts_config = ChatterboxTTSConfig()
\ No newline at end of file
+chatterbox_tts_config = ChatterboxTTSConfig()
+http_config = HTTPConfig()
\ No newline at end of file
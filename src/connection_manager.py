@@ -1,23 +1,277 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
 from fastapi import WebSocket
+from loguru import logger
+
+from .config import app_config
+
+# Close code for clients that cannot keep up ("Try Again Later")
+CLOSE_TOO_SLOW = 1013
+# Close code for a connection the same client replaced with a new one
+CLOSE_REPLACED = 4000
+# Close code for a client id whose session was asked for without its resume token
+CLOSE_INVALID_RESUME_TOKEN = 4003
+
+
+@dataclass
+class OutboundMessage:
+    data: str | bytes
+    # Messages with the same key supersede each other while still queued
+    replace_key: str | None = None
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class Connection:
+    """
+    A websocket with a queue of outgoing messages, bounded by message count
+    and size, drained by its own writer task, so callers never wait for a slow
+    client. Producers of bulk data, such as TTS audio, call `drain()` to wait
+    while the queue is above its high-water mark (half of `max_messages`, or
+    `high_water_bytes`), so they are paced by the client instead.
+
+    When the queue is full, queued messages that can be superseded (such as
+    partial transcriptions) are dropped first. A client whose queue is still
+    full, or that takes longer than `send_timeout` to accept one message, is
+    disconnected.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        max_messages: int = 512,
+        max_bytes: int = 8 * 1024 * 1024,
+        high_water_bytes: int = 512 * 1024,
+        send_timeout: float = 10.0,
+    ):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.high_water_bytes = high_water_bytes
+        self.send_timeout = send_timeout
+        self._queue: deque[OutboundMessage] = deque()
+        self._bytes = 0
+        self._ready = asyncio.Event()
+        # Set while the queue is below its high-water mark, or closed
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self.closed = False
+        self._closer: asyncio.Task | None = None
+
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.max_bytes_queued = 0
+        self.last_send_latency = 0.0
+        self.max_send_latency = 0.0
+        self._total_send_latency = 0.0
+        self.max_queue_wait = 0.0
+
+        self._writer = asyncio.create_task(self._write())
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def queued_bytes(self) -> int:
+        return self._bytes
+
+    def enqueue(self, data: str | bytes, replace_key: str | None = None):
+        if self.closed:
+            return
+        message = OutboundMessage(data, replace_key)
+        if replace_key is not None:
+            for index, queued in enumerate(self._queue):
+                if queued.replace_key == replace_key:
+                    # The new message still goes to the end, so it never
+                    # overtakes messages queued after the one it replaces
+                    self._remove(index)
+                    self.dropped += 1
+                    break
+
+        while self._is_full(len(data)):
+            if not self._drop_replaceable():
+                logger.warning(
+                    f"Send queue of client {self.client_id} is full ({len(self._queue)} messages, {self._bytes} bytes). Disconnecting."
+                )
+                self._close(CLOSE_TOO_SLOW, "Client too slow")
+                return
+
+        self._queue.append(message)
+        self._bytes += len(data)
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self.max_bytes_queued = max(self.max_bytes_queued, self._bytes)
+        self._update_writable()
+        self._ready.set()
+
+    async def drain(self):
+        """Waits until the queue is below its high-water mark, or the connection is closed."""
+        await self._writable.wait()
+
+    def _is_full(self, size: int) -> bool:
+        # A single message larger than max_bytes is still sent on its own
+        return len(self._queue) >= self.max_messages or (self._queue and self._bytes + size > self.max_bytes)
+
+    def _update_writable(self):
+        if self.closed or (self._bytes <= self.high_water_bytes and len(self._queue) <= self.max_messages // 2):
+            self._writable.set()
+        else:
+            self._writable.clear()
+
+    def _remove(self, index: int):
+        self._bytes -= len(self._queue[index].data)
+        del self._queue[index]
+
+    def _clear(self):
+        self.closed = True
+        self._queue.clear()
+        self._bytes = 0
+        # Wakes producers waiting in drain()
+        self._writable.set()
+
+    def _drop_replaceable(self) -> bool:
+        for index, queued in enumerate(self._queue):
+            if queued.replace_key is not None:
+                self._remove(index)
+                self.dropped += 1
+                return True
+        return False
+
+    async def _send(self, message: OutboundMessage):
+        if isinstance(message.data, bytes):
+            await self.websocket.send_bytes(message.data)
+        else:
+            await self.websocket.send_text(message.data)
+
+    async def _write(self):
+        try:
+            while True:
+                if not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                message = self._queue.popleft()
+                self._bytes -= len(message.data)
+                self._update_writable()
+                started = time.perf_counter()
+                self.max_queue_wait = max(self.max_queue_wait, started - message.enqueued_at)
+                try:
+                    await asyncio.wait_for(self._send(message), timeout=self.send_timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Sending to client {self.client_id} took over {self.send_timeout} seconds. Disconnecting.")
+                    self._close(CLOSE_TOO_SLOW, "Client too slow")
+                    return
+                except Exception as e:
+                    # The receive loop notices the broken connection and cleans up
+                    logger.info(f"Stopped sending to client {self.client_id}: {e}")
+                    self._clear()
+                    return
+                latency = time.perf_counter() - started
+                self.sent += 1
+                self.last_send_latency = latency
+                self.max_send_latency = max(self.max_send_latency, latency)
+                self._total_send_latency += latency
+        except asyncio.CancelledError:
+            pass
+
+    def _close(self, code: int, reason: str):
+        self._clear()
+        self._closer = asyncio.create_task(self._close_websocket(code, reason))
+
+    async def _close_websocket(self, code: int, reason: str):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code, reason=reason), timeout=1.0)
+        except Exception:
+            pass
+
+    def cancel(self):
+        self._clear()
+        self._writer.cancel()
+
+    def close(self, code: int, reason: str):
+        """Stops sending and closes the websocket in the background."""
+        self._writer.cancel()
+        self._close(code, reason)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self.max_depth,
+            "queue_bytes": self._bytes,
+            "max_queue_bytes": self.max_bytes_queued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "last_send_latency_ms": 1000 * self.last_send_latency,
+            "mean_send_latency_ms": 1000 * self._total_send_latency / self.sent if self.sent else 0.0,
+            "max_send_latency_ms": 1000 * self.max_send_latency,
+            "max_queue_wait_ms": 1000 * self.max_queue_wait,
+        }
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: dict[str, WebSocket] = {}
+        self.active_connections: dict[str, Connection] = {}
 
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
-        self.active_connections[client_id] = websocket
+        previous = self.active_connections.get(client_id)
+        if previous is not None:
+            # Ends the old socket's receive loop, which leaves the session to this one
+            previous.close(CLOSE_REPLACED, "Replaced by a new connection")
+        self.active_connections[client_id] = Connection(
+            websocket,
+            client_id,
+            max_messages=app_config.SEND_QUEUE_MAX_MESSAGES,
+            max_bytes=app_config.SEND_QUEUE_MAX_BYTES,
+            high_water_bytes=app_config.SEND_QUEUE_HIGH_WATER_BYTES,
+            send_timeout=app_config.SEND_TIMEOUT
+        )
+
+    def is_current(self, client_id: str, websocket: WebSocket) -> bool:
+        """Whether `websocket` is still the client's connection, and not one it replaced."""
+        connection = self.active_connections.get(client_id)
+        return connection is not None and connection.websocket is websocket
 
-    def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
+    def disconnect(self, client_id: str, websocket: WebSocket | None = None):
+        # A client that already reconnected keeps its new connection
+        if client_id in self.active_connections and (websocket is None or self.is_current(client_id, websocket)):
+            self.active_connections.pop(client_id).cancel()
 
-    async def send_personal_message(self, message: str, client_id: str):
-        if client_id in self.active_connections:
-            await self.active_connections[client_id].send_text(message)
+    async def send_personal_message(self, message: str, client_id: str, replace_key: str | None = None, drain: bool = False):
+        """
+        Queues a message for the client and returns right away. A queued
+        message with the same `replace_key` is replaced instead of sent.
+        Producers of large messages, such as base64-encoded audio, pass
+        `drain=True` to wait like `send_personal_bytes` does.
+        """
+        connection = self.active_connections.get(client_id)
+        if connection is not None:
+            connection.enqueue(message, replace_key)
+            if drain:
+                await connection.drain()
+
+    async def send_personal_bytes(self, data: bytes, client_id: str):
+        """
+        Queues binary data for the client, then waits while the client's queue
+        is above its high-water mark, so audio is sent at the client's pace
+        instead of overflowing its queue.
+        """
+        connection = self.active_connections.get(client_id)
+        if connection is not None:
+            connection.enqueue(data)
+            await connection.drain()
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections.values():
-            await connection.send_text(message)
+        # Each connection has its own writer, so a slow client delays no one else
+        for connection in list(self.active_connections.values()):
+            connection.enqueue(message)
+
+    def stats(self) -> dict:
+        return {client_id: connection.stats() for client_id, connection in self.active_connections.items()}
 
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
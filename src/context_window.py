@@ -0,0 +1,123 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List
+
+from loguru import logger
+
+from . import metrics
+from .llm.llm_interface import LLMInterface
+from .prompts import prompt_loader
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count without a tokenizer: about four characters per token for
+    English, plus a few tokens of per-message overhead.
+    """
+    return len(text) // 4 + 4
+
+
+@dataclass
+class ContextMessage:
+    role: str
+    content: str
+    tokens: int
+
+
+class ContextWindow:
+    """
+    Conversation context of a session, bounded by a token budget.
+
+    The system prompt is always sent. The most recent messages are sent as long
+    as they fit in `max_tokens`; older messages are folded into a rolling
+    summary that is sent along with the system prompt. Summarization runs in a
+    background task once `summarize_tokens` worth of messages have left the
+    window, so it never delays a reply. Until it finishes, those messages are
+    simply left out.
+    """
+
+    SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+    def __init__(self, system_prompt: str = "", max_tokens: int = 3000, summarize_tokens: int = 1000):
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.summarize_tokens = summarize_tokens
+        self.messages: List[ContextMessage] = []
+        self.summary = ""
+        self._summary_task: asyncio.Task | None = None
+
+    def set_system_prompt(self, system_prompt: str):
+        self.system_prompt = system_prompt
+
+    def append(self, role: str, content: str):
+        self.messages.append(ContextMessage(role, content, estimate_tokens(content)))
+
+    def _system_message(self) -> Dict[str, str]:
+        content = self.system_prompt
+        if self.summary:
+            content = f"{content}\n\n{self.SUMMARY_HEADER}\n{self.summary}"
+        return {"role": "system", "content": content}
+
+    def _window_start(self, budget: int) -> int:
+        """Index of the oldest message that still fits in the budget."""
+        used = 0
+        start = len(self.messages)
+        while start > 0 and used + self.messages[start - 1].tokens <= budget:
+            start -= 1
+            used += self.messages[start].tokens
+        # Always send the latest message, even if it alone exceeds the budget
+        start = min(start, len(self.messages) - 1) if self.messages else 0
+        # Don't start the window with an assistant reply whose question was cut
+        while start < len(self.messages) - 1 and self.messages[start].role == "assistant":
+            start += 1
+        return start
+
+    def build(self) -> List[Dict[str, str]]:
+        """
+        Returns the messages to send to the LLM for this turn and records the
+        prompt size.
+        """
+        system_message = self._system_message()
+        budget = max(0, self.max_tokens - estimate_tokens(system_message["content"]))
+        start = self._window_start(budget)
+        window = self.messages[start:]
+
+        prompt_tokens = estimate_tokens(system_message["content"]) + sum(message.tokens for message in window)
+        metrics.llm_prompt_tokens.observe(prompt_tokens)
+        logger.info(f"LLM prompt: ~{prompt_tokens} tokens, {len(window)} of {len(self.messages)} messages, summary {'on' if self.summary else 'off'}")
+
+        return [system_message] + [{"role": message.role, "content": message.content} for message in window]
+
+    def maybe_summarize(self, llm_engine: LLMInterface):
+        """
+        Starts folding the messages that no longer fit in the window into the
+        summary, if enough of them have piled up and no summary is running.
+        """
+        if self._summary_task and not self._summary_task.done():
+            return
+        budget = max(0, self.max_tokens - estimate_tokens(self._system_message()["content"]))
+        start = self._window_start(budget)
+        if sum(message.tokens for message in self.messages[:start]) < self.summarize_tokens:
+            return
+        self._summary_task = asyncio.create_task(self._summarize(llm_engine, self.messages[:start]))
+
+    async def _summarize(self, llm_engine: LLMInterface, dropped: List[ContextMessage]):
+        transcript = "\n".join(f"{message.role}: {message.content}" for message in dropped)
+        prompt = prompt_loader.load_util("summarize_prompt")
+        prompt = prompt.replace("<insert_summary>", self.summary or "(none)").replace("<insert_messages>", transcript)
+        try:
+            summary = "".join([chunk async for chunk in llm_engine.chat([{"role": "user", "content": prompt}], stream=False)])
+        except Exception as e:
+            logger.error(f"Failed to summarize conversation: {e}")
+            return
+        if not summary.strip():
+            return
+
+        self.summary = summary.strip()
+        # The summarized messages are always the oldest ones
+        del self.messages[:len(dropped)]
+        logger.info(f"Folded {len(dropped)} messages into the conversation summary ({estimate_tokens(self.summary)} tokens).")
+
+    def cancel(self):
+        if self._summary_task:
+            self._summary_task.cancel()
@@ -1,9 +1,14 @@
-from typing import Dict
 from .asr.asr_interface import ASRInterface
+from .asr.asr_executor import ASRExecutor
 from .llm.llm_interface import LLMInterface
-from .tts.tts_interface import TTSInterface
+from .tts.tts_cache import TTSAudioCache
+from .tts.tts_registry import TTSEngineRegistry
+from .audio.vad import VADStage
 
 # Global instances for AI modules
 asr_engine: ASRInterface | None = None
+asr_executor: ASRExecutor | None = None
+vad_stage: VADStage | None = None
 llm_engine: LLMInterface | None = None
-tts_engines: Dict[str, TTSInterface] = {}
\ No newline at end of file
+tts_registry: TTSEngineRegistry | None = None
+tts_cache: TTSAudioCache | None = None
\ No newline at end of file
@@ -0,0 +1,156 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict
+
+import httpx
+from loguru import logger
+
+from . import metrics
+from .config import http_config
+
+# Responses worth retrying: the request did not reach a healthy backend
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+# Numbers the attempts of SDKs that retry on their own, such as the OpenAI client
+SDK_RETRY_COUNT_HEADER = "x-stainless-retry-count"
+
+
+class HTTPClientStats:
+    """
+    Connection reuse and pool wait statistics of a pooled client, collected
+    through httpcore trace events and exported to /metrics by client name.
+    Every request of the client is traced, including those sent by SDKs that
+    were handed the client.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.retries = 0
+        self.pool_wait_total = 0.0
+        self.pool_wait_max = 0.0
+
+    def _record_request(self, new_connection: bool, pool_wait: float):
+        with self._lock:
+            self.requests += 1
+            self.new_connections += 1 if new_connection else 0
+            self.pool_wait_total += pool_wait
+            self.pool_wait_max = max(self.pool_wait_max, pool_wait)
+        metrics.http_requests.inc(client=self.name)
+        if new_connection:
+            metrics.http_new_connections.inc(client=self.name)
+        metrics.http_pool_wait_seconds.observe(pool_wait, client=self.name)
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+        metrics.http_retries.inc(client=self.name)
+
+    def trace(self):
+        """Returns an httpcore trace callback that times one request."""
+        started = time.perf_counter()
+        state = {"recorded": False, "new_connection": False}
+
+        async def callback(event_name: str, info: Dict[str, Any]):
+            if state["recorded"]:
+                return
+            if event_name.startswith("connection.connect_tcp") or event_name.startswith("connection.connect_unix_socket"):
+                state["new_connection"] = True
+            if event_name.endswith("send_request_headers.started"):
+                # Time spent before the request could be written is time spent
+                # waiting for a pooled connection, plus any new connection setup
+                state["recorded"] = True
+                self._record_request(state["new_connection"], time.perf_counter() - started)
+
+        return callback
+
+    async def on_request(self, request: httpx.Request):
+        """httpx request hook that traces the request and counts SDK retries."""
+        request.extensions["trace"] = self.trace()
+        if request.headers.get(SDK_RETRY_COUNT_HEADER, "0") != "0":
+            self.record_retry()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "connection_reuse_ratio": 1.0 - self.new_connections / self.requests if self.requests else 0.0,
+                "retries": self.retries,
+                "mean_pool_wait_ms": 1000 * self.pool_wait_total / self.requests if self.requests else 0.0,
+                "max_pool_wait_ms": 1000 * self.pool_wait_max,
+            }
+
+
+class HTTPClientManager:
+    """
+    Process-wide pool of `httpx.AsyncClient` instances, one per name, so
+    connections to a backend are kept alive and reused across requests and
+    sessions. Clients are created on first use and closed in `aclose()`.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, HTTPClientStats] = {}
+
+    def _http2_enabled(self) -> bool:
+        if not http_config.HTTP2:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed. Falling back to HTTP/1.1.")
+            return False
+        return True
+
+    def get_client(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=self._http2_enabled(),
+                limits=httpx.Limits(
+                    max_connections=http_config.MAX_CONNECTIONS,
+                    max_keepalive_connections=http_config.MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=http_config.KEEPALIVE_EXPIRY,
+                ),
+                timeout=self.timeout(),
+                event_hooks={"request": [self.get_stats(name).on_request]},
+            )
+            self._clients[name] = client
+        return client
+
+    def get_stats(self, name: str) -> HTTPClientStats:
+        if name not in self._stats:
+            self._stats[name] = HTTPClientStats(name)
+        return self._stats[name]
+
+    @staticmethod
+    def timeout(read: float | None = None) -> httpx.Timeout:
+        """The configured timeouts, optionally with a different read timeout."""
+        return httpx.Timeout(
+            connect=http_config.CONNECT_TIMEOUT,
+            read=http_config.READ_TIMEOUT if read is None else read,
+            write=http_config.WRITE_TIMEOUT,
+            pool=http_config.POOL_TIMEOUT,
+        )
+
+    @staticmethod
+    async def backoff(attempt: int):
+        """Sleeps before retry number `attempt` (from 1), with full jitter."""
+        delay = http_config.RETRY_BACKOFF * (2 ** (attempt - 1))
+        await asyncio.sleep(random.uniform(0, delay))
+
+    def stats(self) -> dict:
+        return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+    async def aclose(self):
+        for name, client in self._clients.items():
+            await client.aclose()
+            logger.info(f"HTTP client '{name}' closed. Stats: {self._stats[name].snapshot()}")
+        self._clients.clear()
+
+
+http_clients = HTTPClientManager()
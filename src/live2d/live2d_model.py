@@ -1,11 +1,14 @@
 from loguru import logger
 import json
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
+from ..utils.actions_extractor import ActionMatcher
 
 class Live2dModel:
-    def __init__(self, live2d_model_name: str, model_dict_path: str = "model_dict.json"):
+    def __init__(self, live2d_model_name: str, model_dict_path: str = "model_dict.json", model_dict: Optional[List[Dict]] = None):
         self.model_dict_path = model_dict_path
+        # Already parsed model_dict.json, so building many models reads it once
+        self._model_dict = model_dict
         self.live2d_model_name = live2d_model_name
         self.model_info: Dict = {}
         self.emo_map: Dict = {}
@@ -13,6 +16,7 @@ class Live2dModel:
         self.motion_groups: Dict = {}
         self.emo_str: str = ""
         self.motion_str: str = ""
+        self.action_matcher: ActionMatcher = ActionMatcher((), ())
         self.set_model(live2d_model_name)
 
     def set_model(self, model_name: str) -> None:
@@ -30,6 +34,9 @@ class Live2dModel:
         }
         self.motion_str = " ".join([f"[m:{key}]" for key in self.motion_map.keys()])
 
+        # Compiled once per model, used for every sentence of every reply
+        self.action_matcher = ActionMatcher(self.emo_map.keys(), self.motion_map.keys())
+
         # Dynamically load motion groups from the model's .model3.json file
         self._load_motion_groups()
 
@@ -57,8 +64,10 @@ class Live2dModel:
 
 
     def _lookup_model_info(self, model_name: str) -> Dict:
-        with open(self.model_dict_path, 'r', encoding='utf-8') as f:
-            model_dict = json.load(f)
+        model_dict = self._model_dict
+        if model_dict is None:
+            with open(self.model_dict_path, 'r', encoding='utf-8') as f:
+                model_dict = json.load(f)
 
         matched_model = next((model for model in model_dict if model["name"] == model_name), None)
 
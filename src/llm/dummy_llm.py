@@ -7,6 +7,9 @@ class DummyLLM(LLMInterface):
     A dummy LLM implementation for testing purposes.
     """
 
+    def __init__(self, **kwargs):
+        pass
+
     async def chat(
         self,
         messages: List[Dict[str, str]],
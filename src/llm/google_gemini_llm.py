@@ -1,5 +1,5 @@
 import google.generativeai as genai
-from typing import List, Dict, AsyncGenerator
+from typing import List, Dict, AsyncGenerator, Optional
 from .llm_interface import LLMInterface
 
 class GoogleGeminiLLM(LLMInterface):
@@ -7,9 +7,11 @@ class GoogleGeminiLLM(LLMInterface):
     An LLM implementation using the Google Gemini API.
     """
 
-    def __init__(self, api_key: str, model: str):
+    def __init__(self, api_key: str, model: str, timeout: Optional[float] = None):
+        # The async API uses a gRPC channel that is shared by every request
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(model)
+        self.request_options = {"timeout": timeout} if timeout else None
 
     async def chat(
         self,
@@ -39,9 +41,10 @@ class GoogleGeminiLLM(LLMInterface):
             elif role == "model":
                 gemini_messages.append({"role": role, "parts": [msg["content"]]})
 
-        response = self.model.generate_content(
+        response = await self.model.generate_content_async(
             gemini_messages,
             stream=stream,
+            request_options=self.request_options,
             safety_settings={
                 'HARM_CATEGORY_HARASSMENT': 'BLOCK_NONE',
                 'HARM_CATEGORY_HATE_SPEECH': 'BLOCK_NONE',
@@ -51,7 +54,7 @@ class GoogleGeminiLLM(LLMInterface):
         )
 
         if stream:
-            for chunk in response:
+            async for chunk in response:
                 if chunk.parts:
                     yield chunk.text
         else:
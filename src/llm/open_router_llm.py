@@ -1,16 +1,21 @@
-from openai import OpenAI
-from typing import List, Dict, AsyncGenerator
+from openai import AsyncOpenAI
+from typing import List, Dict, AsyncGenerator, Optional
 from .llm_interface import LLMInterface
+from ..http_client import http_clients
 
 class OpenRouterLLM(LLMInterface):
     """
     An LLM implementation using the OpenRouter API via the OpenAI SDK.
     """
 
-    def __init__(self, api_key: str, model: str):
-        self.client = OpenAI(
+    def __init__(self, api_key: str, model: str, timeout: Optional[float] = None, max_retries: int = 2):
+        self.client = AsyncOpenAI(
             base_url="https://openrouter.ai/api/v1",
             api_key=api_key,
+            # Keeps connections to OpenRouter alive across turns and sessions
+            http_client=http_clients.get_client("open_router"),
+            timeout=http_clients.timeout(read=timeout),
+            max_retries=max_retries,
         )
         self.model = model
 
@@ -22,15 +27,15 @@ class OpenRouterLLM(LLMInterface):
         """
         Sends a chat request to the OpenRouter API and yields the response.
         """
-        response = self.client.chat.completions.create(
+        response = await self.client.chat.completions.create(
             model=self.model,
             messages=messages,
             stream=stream,
         )
 
         if stream:
-            for chunk in response:
-                if chunk.choices[0].delta.content is not None:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content is not None:
                     yield chunk.choices[0].delta.content
         else:
             yield response.choices[0].message.content
\ No newline at end of file
@@ -12,7 +12,7 @@ import pyloudnorm as pyln
 import soundfile as sf
 from io import BytesIO
 import wave
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 import os
 from dotenv import load_dotenv
 import time
@@ -20,74 +20,173 @@ import time
 load_dotenv()
 
 from .config import app_config, llm_config, asr_config
-from .connection_manager import manager
-from .session_manager import session_manager, Session
+from .connection_manager import manager, CLOSE_INVALID_RESUME_TOKEN
+from .session_manager import session_manager, Session, ResumeTokenError
 from .character_manager import character_manager
-from .utils.actions_extractor import extract_actions
-from .utils.sentence_splitter import split_sentences
+from .utils.sentence_splitter import StreamingSentenceSplitter
 from . import globals
+from . import binary_protocol
+from .speech_pipeline import SpeechPipeline
+from .http_client import http_clients
+from .readiness import readiness
+from .tracing import TurnTrace, turn_traces
+from . import metrics
+from .context_window import estimate_tokens
 from .asr.asr_factory import ASRFactory
+from .asr.asr_executor import ASRExecutor, ASRQueueFullError
+from .asr.remote_asr import RemoteASR
 from .llm.llm_factory import LLMFactory
-from .tts.tts_factory import TTSFactory
+from .tts.tts_cache import CachedTTS, TTSAudioCache
+from .tts.tts_registry import TTSEngineRegistry
 from loguru import logger
-from .audio.audio_processor import AudioProcessor
-
-def _load_models_sync():
-    """
-    Synchronously loads all AI models. This function is designed to be run in a
-    separate thread to avoid blocking the main asyncio event loop.
-    """
-    logger.info("Loading AI models in a background thread...")
-
-    # Load ASR engine
-    try:
-        globals.asr_engine = ASRFactory.get_asr_system(
-            asr_config.ENGINE,
-            device=asr_config.DEVICE,
-            model=asr_config.MODEL,
-            compute_type=asr_config.COMPUTE_TYPE,
-            num_threads=asr_config.CPU_THREADS
+from .audio.vad import create_vad_stage
+
+# One second of silence, used to run each ASR and VAD model once before real traffic
+WARMUP_AUDIO = np.zeros(16000, dtype=np.float32)
+WARMUP_TEXT = "Hello."
+# Mic audio streamed to a non-streaming ASR engine is decoded when the utterance
+# ends, or in pieces of this length during a long one
+UTTERANCE_FLUSH_SECONDS = 15.0
+
+def _load_asr():
+    if asr_config.SERVER_SOCKET:
+        # The host-wide ASR server owns the model; threads only wait for its answers
+        globals.asr_engine = RemoteASR(asr_config.SERVER_SOCKET, timeout=asr_config.SERVER_TIMEOUT)
+        globals.asr_executor = ASRExecutor(
+            asr_engine=globals.asr_engine,
+            mode="thread",
+            max_workers=max(asr_config.EXECUTOR_WORKERS, asr_config.BATCH_MAX_SIZE),
+            max_pending=asr_config.EXECUTOR_MAX_PENDING,
+            queue_timeout=asr_config.EXECUTOR_QUEUE_TIMEOUT,
         )
-        logger.info("ASR engine loaded.")
-    except Exception as e:
-        logger.error(f"Failed to load ASR engine: {e}")
-
-    # Load LLM engine
-    try:
-        api_key = None
-        if llm_config.LLM_ENGINE == "open_router":
-            api_key = llm_config.OPENROUTER_API_KEY
-        elif llm_config.LLM_ENGINE == "google_gemini":
-            api_key = llm_config.GEMINI_API_KEY
-        globals.llm_engine = LLMFactory.create_llm_engine(
-            llm_config.LLM_ENGINE,
-            api_key=api_key,
-            model=llm_config.LLM_MODEL
+        return globals.asr_executor
+
+    asr_engine_kwargs = ASRFactory.engine_kwargs(asr_config)
+    executor_mode = asr_config.EXECUTOR_MODE
+    if executor_mode == "process" and ASRFactory.is_streaming(asr_config.ENGINE, **asr_engine_kwargs):
+        logger.warning("Streaming ASR keeps per-session streams in-process. Using the thread executor instead.")
+        executor_mode = "thread"
+    if executor_mode == "process" and asr_config.BATCH_MAX_SIZE > 1:
+        # Every process serves one request at a time, so a batch would never fill
+        logger.warning("ASR batching needs the thread executor. Disabling batching in process mode.")
+        asr_engine_kwargs["batch_max_size"] = 1
+    if executor_mode == "process":
+        # Each worker process loads its own engine, so none is needed here.
+        globals.asr_executor = ASRExecutor(
+            mode="process",
+            max_workers=asr_config.EXECUTOR_WORKERS,
+            max_pending=asr_config.EXECUTOR_MAX_PENDING,
+            queue_timeout=asr_config.EXECUTOR_QUEUE_TIMEOUT,
+            engine_name=asr_config.ENGINE,
+            engine_kwargs=asr_engine_kwargs,
         )
-        logger.info("LLM engine loaded.")
-    except Exception as e:
-        logger.error(f"Failed to load LLM engine: {e}")
-
-    # Load TTS engines for all characters
-    characters = character_manager.list_characters()
-    for character in characters:
-        if character:
-            try:
-                tts_engine_config = character.tts_engine.copy()
-                tts_engine_name = tts_engine_config.pop("name")
-                tts_engine = TTSFactory.create_tts_engine(tts_engine_name, **tts_engine_config)
-                globals.tts_engines[character.id] = tts_engine
-                logger.info(f"TTS engine for character '{character.name}' loaded.")
-            except Exception as e:
-                logger.error(f"Failed to load TTS engine for character '{character.name}': {e}")
-
-    logger.info("All AI models loaded.")
+    else:
+        globals.asr_engine = ASRFactory.get_asr_system(asr_config.ENGINE, **asr_engine_kwargs)
+        globals.asr_executor = ASRExecutor(
+            asr_engine=globals.asr_engine,
+            mode="thread",
+            # A batch only fills if that many requests can wait in it at once
+            max_workers=max(asr_config.EXECUTOR_WORKERS, asr_config.BATCH_MAX_SIZE),
+            max_pending=asr_config.EXECUTOR_MAX_PENDING,
+            queue_timeout=asr_config.EXECUTOR_QUEUE_TIMEOUT,
+        )
+    return globals.asr_executor
+
+async def _warm_up_asr(asr_executor: ASRExecutor):
+    if globals.asr_engine and globals.asr_engine.supports_streaming:
+        stream = globals.asr_engine.create_stream()
+        await asr_executor.process_stream(stream, WARMUP_AUDIO)
+        await asr_executor.finalize_stream(stream)
+        return
+    # One request per worker, so every worker process has loaded its engine
+    await asyncio.gather(*(asr_executor.transcribe(WARMUP_AUDIO) for _ in range(asr_executor.max_workers)))
+
+def _load_vad():
+    globals.vad_stage = create_vad_stage(
+        app_config.VAD_ENGINE,
+        max_segment_seconds=app_config.VAD_MAX_SEGMENT_SECONDS,
+        min_speech_ms=app_config.VAD_MIN_SPEECH_MS,
+        min_silence_ms=app_config.VAD_MIN_SILENCE_MS
+    )
+    return globals.vad_stage
+
+async def _warm_up_vad(vad_stage):
+    await asyncio.to_thread(vad_stage.process, WARMUP_AUDIO, 16000)
+
+def _load_llm():
+    api_key = None
+    if llm_config.LLM_ENGINE == "open_router":
+        api_key = llm_config.OPENROUTER_API_KEY
+    elif llm_config.LLM_ENGINE == "google_gemini":
+        api_key = llm_config.GEMINI_API_KEY
+    globals.llm_engine = LLMFactory.create_llm_engine(
+        llm_config.LLM_ENGINE,
+        api_key=api_key,
+        model=llm_config.LLM_MODEL,
+        timeout=llm_config.LLM_TIMEOUT
+    )
+    return globals.llm_engine
+
+def _load_tts():
+    # Shared cache of synthesized sentences
+    if app_config.TTS_CACHE_MAX_BYTES > 0:
+        try:
+            globals.tts_cache = TTSAudioCache(
+                max_bytes=app_config.TTS_CACHE_MAX_BYTES,
+                directory=app_config.TTS_CACHE_DIR or None,
+                disk_max_bytes=app_config.TTS_CACHE_DISK_MAX_BYTES
+            )
+        except OSError as e:
+            logger.error(f"Failed to create TTS cache: {e}")
+
+    # TTS engines are created when a session of their character starts
+    globals.tts_registry = TTSEngineRegistry(
+        cache=globals.tts_cache,
+        idle_seconds=app_config.TTS_ENGINE_IDLE_SECONDS
+    )
+    return globals.tts_registry
+
+async def _warm_up_tts(tts_registry: TTSEngineRegistry):
+    character_ids = [char_id.strip() for char_id in app_config.TTS_WARMUP_CHARACTERS.split(',') if char_id.strip()]
+    for character_id in character_ids:
+        character = character_manager.get_character(character_id)
+        if character is None:
+            logger.warning(f"Cannot warm up TTS of unknown character '{character_id}'.")
+            continue
+        tts_engine = tts_registry.acquire(character.tts_engine)
+        try:
+            # Goes past the cache, which would answer without touching the engine
+            engine = tts_engine.engine if isinstance(tts_engine, CachedTTS) else tts_engine
+            # Engines report most errors by returning no audio
+            if not await engine.synthesize(WARMUP_TEXT):
+                raise RuntimeError(f"TTS of character '{character_id}' returned no audio.")
+            # Otherwise the warm engine would be unloaded if no session starts soon
+            tts_registry.pin(tts_engine)
+        finally:
+            tts_registry.release(tts_engine)
 
 async def load_models_async():
     """
-    Triggers the synchronous model loading function in a separate thread.
+    Loads the independent AI components concurrently, each in a worker thread
+    so the event loop stays responsive, and runs a warm-up inference on each
+    as soon as it is loaded.
     """
-    await asyncio.to_thread(_load_models_sync)
+    logger.info("Loading AI models...")
+    await asyncio.gather(
+        readiness.load("asr", _load_asr, _warm_up_asr),
+        readiness.load("vad", _load_vad, _warm_up_vad),
+        readiness.load("llm", _load_llm),
+        readiness.load("tts", _load_tts, _warm_up_tts),
+    )
+    logger.info("All AI models loaded.")
+
+async def _evict_idle_tts_engines():
+    # Checks a few times per idle period, so engines go soon after they expire
+    interval = max(1.0, app_config.TTS_ENGINE_IDLE_SECONDS / 4)
+    while True:
+        await asyncio.sleep(interval)
+        if globals.tts_registry:
+            globals.tts_registry.evict_idle()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -106,14 +205,25 @@ async def lifespan(app: FastAPI):
     # Start model loading in a background task
     asyncio.create_task(load_models_async())
 
+    background_tasks = [asyncio.create_task(_evict_idle_tts_engines())]
+    if app_config.CHARACTERS_RELOAD_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(character_manager.watch(app_config.CHARACTERS_RELOAD_INTERVAL)))
+
     yield
 
     # Clean up resources if needed on shutdown
     logger.info("Application shutting down.")
+    for task in background_tasks:
+        task.cancel()
+    if globals.asr_executor:
+        globals.asr_executor.shutdown()
+    if isinstance(globals.asr_engine, RemoteASR):
+        globals.asr_engine.close()
+    await http_clients.aclose()
+    await session_manager.store.aclose()
 
 
 app = FastAPI(lifespan=lifespan)
-audio_processor = AudioProcessor()
 
 if app_config.ALLOWED_ORIGINS == "*":
     origins = ["*"]
@@ -137,118 +247,150 @@ async def liveness_check():
 @app.get("/readyz")
 async def readiness_check():
     """
-    Checks if the service is ready to serve requests by verifying that all models are loaded.
+    Checks if the service is ready to serve requests, i.e. all required models
+    are loaded and warmed up. Reports the state and load time of each component.
     """
-    unloaded_models = []
-    if not globals.asr_engine:
-        unloaded_models.append("ASR")
-    if not globals.llm_engine:
-        unloaded_models.append("LLM")
-    if not globals.tts_engines:
-        unloaded_models.append("TTS")
-
-    if unloaded_models:
+    components = readiness.snapshot()
+    if not readiness.is_ready():
         return JSONResponse(
             status_code=503,
-            content={"status": "error", "message": f"The following models are not loaded: {', '.join(unloaded_models)}"}
+            content={
+                "status": "error",
+                "message": f"The following models are not ready: {', '.join(readiness.not_ready())}",
+                "components": components
+            }
         )
 
-    return {"status": "ok"}
+    return {"status": "ok", "components": components}
+
+metrics.active_sessions.set_function(lambda: len(session_manager.sessions))
+metrics.llm_tasks_in_flight.set_function(
+    lambda: sum(1 for session in session_manager.sessions.values() if session.active_llm_task)
+)
+metrics.asr_queue_depth.set_function(lambda: globals.asr_executor.pending if globals.asr_executor else 0)
+metrics.send_queue_depth.set_function(lambda: sum(c.depth for c in manager.active_connections.values()))
+metrics.send_queue_depth_max.set_function(lambda: max((c.depth for c in manager.active_connections.values()), default=0))
+metrics.tts_cache_bytes.set_function(lambda: globals.tts_cache.stats()["bytes"] if globals.tts_cache else 0)
+metrics.tts_cache_disk_bytes.set_function(lambda: globals.tts_cache.stats()["disk_bytes"] if globals.tts_cache else 0)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.registry.expose(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/turns")
+async def recent_turns(limit: int = 20, client_id: str | None = None):
+    """Latency traces of the most recent conversational turns, newest first."""
+    return {"turns": turn_traces.recent(limit=limit, client_id=client_id)}
+
+@app.get("/debug/connections")
+async def connection_stats():
+    """Send queue depth and send latency of each connected client."""
+    return {"connections": manager.stats()}
+
+@app.get("/debug/http")
+async def http_client_stats():
+    """Connection reuse, retries and pool wait of each pooled HTTP client."""
+    return {"clients": http_clients.stats()}
 
 @app.get("/characters")
 async def list_characters():
-    all_characters = character_manager.list_characters()
-    available_characters = [
-        char for char in all_characters if char.id in globals.tts_engines
-    ]
+    # Characters whose Live2D model could not be resolved cannot start a session
+    available_characters = [bundle.character for bundle in character_manager.bundles.values()]
     return {"characters": available_characters}
 
 app.mount("/live2d-models", StaticFiles(directory="live2d-models"), name="live2d-models")
 
-async def handle_text_message(session: Session, text: str):
-    session.history.append({"role": "user", "content": text})
+async def handle_text_message(session: Session, text: str, trace: TurnTrace):
+    session.context.append("user", text)
     session.interrupted = False
 
     llm_response_text = ""
-    llm_stream = session.llm_engine.chat(session.history, stream=True)
-
-    sentence_buffer = ""
-    first_sentence_processed = False
+    llm_stream = session.llm_engine.chat(session.context.build(), stream=True)
+    # Synthesis of the next sentences overlaps with reading the LLM stream and
+    # with delivering the current sentence
+    speech = SpeechPipeline(session, lookahead=app_config.TTS_LOOKAHEAD, trace=trace)
+
+    splitter = StreamingSentenceSplitter(faster_first_response=True)
+    # Action tags are taken out of the stream before sentence splitting, so
+    # they are dispatched as soon as they are complete
+    actions = session.live2d_model.action_matcher.stream()
+    llm_started_at = time.perf_counter()
+    first_chunk_at = None
     try:
         async for chunk in llm_stream:
             if session.interrupted:
                 logger.info("LLM stream processing interrupted.")
                 break
 
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+                metrics.llm_time_to_first_token_seconds.observe(first_chunk_at - llm_started_at)
+                trace.add_span("llm.first_token", llm_started_at, first_chunk_at)
             llm_response_text += chunk
-            sentence_buffer += chunk
-
-            sentences = split_sentences(sentence_buffer, faster_first_response=not first_sentence_processed)
-
-            if sentences:
-                for i, sentence in enumerate(sentences):
-                    if i < len(sentences) - 1:
-                        if sentence.strip():
-                            await process_sentence(session, sentence)
-                            first_sentence_processed = True
-
-                sentence_buffer = sentences[-1]
 
+            text, expressions, motions = actions.feed(chunk)
+            if expressions or motions:
+                speech.push("", expressions, motions)
+            for sentence in splitter.feed(text):
+                speech.push(sentence)
+
+        trace.add_span("llm.stream", llm_started_at, tokens=estimate_tokens(llm_response_text))
+        if first_chunk_at is not None and not session.interrupted:
+            streaming_time = time.perf_counter() - first_chunk_at
+            if streaming_time > 0:
+                metrics.llm_tokens_per_second.observe(estimate_tokens(llm_response_text) / streaming_time)
+
+        for sentence in splitter.feed(actions.flush()):
+            speech.push(sentence)
+        sentence_buffer = splitter.flush()
         if len(sentence_buffer.strip()) > 0 and not session.interrupted:
-            await process_sentence(session, sentence_buffer)
+            speech.push(sentence_buffer)
+
+        if not session.interrupted:
+            with trace.span("speech.finish"):
+                await speech.finish()
 
     except asyncio.CancelledError:
         logger.info("LLM stream cancelled.")
     finally:
+        # Stops any synthesis still in flight after an interruption
+        speech.cancel()
         if llm_response_text:
-            session.history.append({"role": "assistant", "content": llm_response_text})
+            session.context.append("assistant", llm_response_text)
+        # Older turns are summarized in the background, after the reply
+        session.context.maybe_summarize(session.llm_engine)
+        await session_manager.save_session(session)
+        await turn_traces.finish_turn(trace, interrupted=session.interrupted, reply_chars=len(llm_response_text))
         # Signal that the LLM response is complete
         await manager.send_personal_message(json.dumps({"type": "avatar:idle"}), session.client_id)
         session.active_llm_task = None
 
-async def process_sentence(session: Session, sentence: str):
-    text_to_speak, expressions, motions = extract_actions(
-        sentence,
-        list(session.live2d_model.emo_map.keys()),
-        list(session.live2d_model.motion_map.keys())
-    )
-
-    expression_data = [session.live2d_model.emo_map.get(exp) for exp in expressions if session.live2d_model.emo_map.get(exp)]
-    motion_data = [session.live2d_model.motion_map.get(mot) for mot in motions if session.live2d_model.motion_map.get(mot)]
-
-    audio_base64 = ""
-    if text_to_speak.strip():
-        tts_audio = await session.tts_engine.synthesize(text_to_speak)
-        audio_base64 = base64.b64encode(tts_audio).decode('utf-8')
-
-    if text_to_speak.strip() or expression_data or motion_data:
-        playback_payload = {
-            "type": "avatar:speak",
-            "payload": {
-                "text": text_to_speak,
-                "audio": audio_base64,
-                "expressions": expression_data,
-                "motions": motion_data
-            }
-        }
-        await manager.send_personal_message(json.dumps(playback_payload), session.client_id)
-
 async def handle_session_start(session: Session, payload: dict):
     session.initialize_modules(payload["character_id"])
+    session.binary_audio = bool(payload.get("binary_audio", False))
+    await session_manager.save_session(session)
     response = {
         "type": "session:ready",
         "payload": {
             "session_id": session.session_id,
+            # Presented when reconnecting, to resume this session
+            "resume_token": session.resume_token,
             "character": session.character.dict() if hasattr(session.character, 'dict') else session.character.__dict__,
-            "live2d_model_info": session.live2d_model.model_info
+            "live2d_model_info": session.live2d_model.model_info,
+            "binary_audio": session.binary_audio
         }
     }
     await manager.send_personal_message(json.dumps(response), session.client_id)
 
-async def handle_user_text(session: Session, payload: dict):
+async def handle_user_text(session: Session, payload: dict, speech_ended_at: float | None = None, trace: TurnTrace | None = None):
+    # Start of the end-to-end latency measurement for spoken turns
+    session.speech_ended_at = speech_ended_at
+    if trace is None:
+        trace = turn_traces.start_turn(session.client_id, source="text")
     if session.active_llm_task:
         session.active_llm_task.cancel()
-    session.active_llm_task = asyncio.create_task(handle_text_message(session, payload["text"]))
+    session.active_llm_task = asyncio.create_task(handle_text_message(session, payload["text"], trace))
 
 async def handle_user_interrupt(session: Session, payload: dict):
     session.interrupted = True
@@ -257,51 +399,166 @@ async def handle_user_interrupt(session: Session, payload: dict):
         logger.info("LLM task interrupted by client.")
     session.last_asr_text = "" # Clear any partial transcription
 
-async def handle_user_audio_chunk(session: Session, payload: dict):
-    if session.asr_engine:
-        audio_bytes = base64.b64decode(payload["data"])
-        audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-
-        audio_process_start_time = time.time()
-        processed_audio_np = audio_processor.process(audio_np, 16000)
-        logger.info(f"Audio processing took {time.time() - audio_process_start_time} seconds")
+def _barge_in(session: Session, text: str):
+    # Implicit interruption ("barge-in")
+    # Only interrupt if we get actual text from ASR and a task is active
+    if text and session.active_llm_task and not session.interrupted:
+        session.active_llm_task.cancel()
+        session.interrupted = True
+        logger.info("LLM task interrupted by user speech (barge-in).")
 
-        if app_config.DEBUG_SAVE_AUDIO:
-            if not os.path.exists("audio_debug"):
-                os.makedirs("audio_debug")
-            timestamp = int(time.time())
-            sf.write(f"audio_debug/{timestamp}_original.wav", audio_np, 16000)
-            sf.write(f"audio_debug/{timestamp}_processed.wav", processed_audio_np, 16000)
+async def handle_streaming_audio(session: Session, audio_np: np.ndarray):
+    """
+    Feeds audio into the session's online stream. Partial results are sent while
+    the user is talking and an endpoint detected by the recognizer finalizes the
+    utterance without waiting for `user:audio_end`.
+    """
+    if session.asr_stream is None:
+        session.asr_stream = session.asr_engine.create_stream()
+        session.utterance_finalized = False
 
-        audio_np = processed_audio_np
+    try:
+        text, is_endpoint = await session.asr_executor.process_stream(session.asr_stream, audio_np)
+    except ASRQueueFullError as e:
+        logger.warning(f"Dropping audio chunk for client {session.client_id}: {e}")
+        return
+
+    _barge_in(session, text)
+
+    if is_endpoint:
+        # The recognizer needed this chunk to notice the end of speech
+        endpoint_at = time.perf_counter()
+        session.last_asr_text = ""
+        # Audio after the endpoint belongs to the next utterance and opens a new stream
+        session.asr_stream = None
+        session.utterance_finalized = True
+        if text:
+            response = {"type": "asr:final", "payload": {"text": text}}
+            await manager.send_personal_message(json.dumps(response), session.client_id)
+            trace = turn_traces.start_turn(session.client_id, source="audio", started_at=endpoint_at)
+            await handle_user_text(session, {"text": text}, speech_ended_at=endpoint_at, trace=trace)
+        return
+
+    if text != session.last_asr_text:
+        session.last_asr_text = text
+        response = {"type": "asr:partial", "payload": {"text": text}}
+        # Only the latest partial result matters to a client that fell behind
+        await manager.send_personal_message(json.dumps(response), session.client_id, replace_key="asr:partial")
 
+async def handle_user_audio_chunk(session: Session, payload: dict):
+    audio_bytes = base64.b64decode(payload["data"])
+    audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+    await handle_user_audio(session, audio_np)
+
+async def handle_user_audio(session: Session, audio_np: np.ndarray):
+    if session.asr_executor:
+        if session.asr_engine and session.asr_engine.supports_streaming:
+            # Chunk-wise denoising and loudness normalization are not seamless
+            # across chunk boundaries, so streaming engines get raw audio.
+            await handle_streaming_audio(session, audio_np)
+            return
+
+        # Other engines decode the buffered frames once the utterance ends
+        session.audio_buffer.append(audio_np)
+        if sum(len(chunk) for chunk in session.audio_buffer) >= UTTERANCE_FLUSH_SECONDS * 16000:
+            await transcribe_buffered_audio(session)
+
+async def transcribe_buffered_audio(session: Session):
+    if not session.audio_buffer:
+        return
+    audio_np = np.concatenate(session.audio_buffer)
+    session.audio_buffer = []
+
+    audio_process_start_time = time.perf_counter()
+    processed_audio_np = await asyncio.to_thread(session.audio_processor.process, audio_np, 16000)
+    audio_process_time = time.perf_counter() - audio_process_start_time
+    metrics.audio_processing_seconds.observe(audio_process_time)
+    logger.info(f"Audio processing took {audio_process_time} seconds")
+
+    if app_config.DEBUG_SAVE_AUDIO:
+        if not os.path.exists("audio_debug"):
+            os.makedirs("audio_debug")
+        timestamp = int(time.time())
+        sf.write(f"audio_debug/{timestamp}_original.wav", audio_np, 16000)
+        sf.write(f"audio_debug/{timestamp}_processed.wav", processed_audio_np, 16000)
+
+    audio_np = processed_audio_np
+
+    segments = [audio_np]
+    if globals.vad_stage:
+        vad_result = await asyncio.to_thread(globals.vad_stage.process, audio_np, 16000)
+        segments = vad_result.segments
+        if not segments:
+            logger.info(f"No speech detected in audio chunk from client {session.client_id}, skipping ASR.")
+            return
+
+    # Segments of a long monologue are decoded and reported one after another
+    for segment in segments:
         asr_start_time = time.time()
-        partial_text = session.asr_engine.transcribe_np(audio_np)
+        try:
+            asr_result = await session.asr_executor.transcribe(segment)
+        except ASRQueueFullError as e:
+            logger.warning(f"Dropping audio chunk for client {session.client_id}: {e}")
+            return
+        partial_text = asr_result.text
         logger.info(f"ASR transcribe took {time.time() - asr_start_time} seconds")
 
-        # Implicit interruption ("barge-in")
-        # Only interrupt if we get actual text from ASR and a task is active
-        if partial_text and session.active_llm_task and not session.interrupted:
-            session.active_llm_task.cancel()
-            session.interrupted = True
-            logger.info("LLM task interrupted by user speech (barge-in).")
+        _barge_in(session, partial_text)
+        if not partial_text:
+            continue
         if session.last_asr_text:
             session.last_asr_text += " " + partial_text
         else:
             session.last_asr_text = partial_text
 
         response = {"type": "asr:partial", "payload": {"text": session.last_asr_text}}
-        await manager.send_personal_message(json.dumps(response), session.client_id)
+        await manager.send_personal_message(json.dumps(response), session.client_id, replace_key="asr:partial")
 
 async def handle_user_audio_end(session: Session, payload: dict):
+    speech_ended_at = time.perf_counter()
+    if session.utterance_finalized and session.asr_stream is None:
+        # The endpoint already sent this utterance's asr:final and nothing was said since
+        session.utterance_finalized = False
+        return
+    await transcribe_buffered_audio(session)
     final_text = session.last_asr_text
     session.last_asr_text = ""
 
+    asr_finalized_at = None
+    if session.asr_stream is not None:
+        # A finalized stream cannot take more audio; the next chunk opens a new one.
+        stream, session.asr_stream = session.asr_stream, None
+        try:
+            final_text = await session.asr_executor.finalize_stream(stream)
+        except ASRQueueFullError as e:
+            logger.warning(f"Could not finalize ASR stream for client {session.client_id}: {e}")
+        asr_finalized_at = time.perf_counter()
+
     response = {"type": "asr:final", "payload": {"text": final_text}}
     await manager.send_personal_message(json.dumps(response), session.client_id)
 
     if final_text:
-        await handle_user_text(session, {"text": final_text})
+        trace = turn_traces.start_turn(session.client_id, source="audio", started_at=speech_ended_at)
+        if asr_finalized_at is not None:
+            trace.add_span("asr.finalize", speech_ended_at, asr_finalized_at)
+        await handle_user_text(session, {"text": final_text}, speech_ended_at=speech_ended_at, trace=trace)
+
+async def handle_binary_message(session: Session, data: bytes):
+    try:
+        frame = binary_protocol.parse_frame(data)
+        if frame.message_type != binary_protocol.MSG_USER_AUDIO_CHUNK:
+            logger.warning(f"Unknown binary message type: {frame.message_type}")
+            return
+        audio_np = binary_protocol.audio_from_frame(frame)
+    except binary_protocol.BinaryProtocolError as e:
+        logger.warning(f"Invalid binary frame from client {session.client_id}: {e}")
+        return
+
+    if session.last_audio_sequence is not None and frame.sequence != session.last_audio_sequence + 1:
+        logger.warning(f"Audio chunk sequence gap for client {session.client_id}: expected {session.last_audio_sequence + 1}, got {frame.sequence}")
+    session.last_audio_sequence = frame.sequence
+
+    await handle_user_audio(session, audio_np)
 
 message_handlers = {
     "session:start": handle_session_start,
@@ -313,13 +570,28 @@ message_handlers = {
 
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
+    try:
+        session = await session_manager.create_session(client_id, websocket.query_params.get("resume_token"))
+    except ResumeTokenError:
+        # Refused before connecting, so a live connection of the client is left alone
+        logger.warning(f"Refused connection for client {client_id}: invalid resume token.")
+        await websocket.accept()
+        await websocket.close(code=CLOSE_INVALID_RESUME_TOKEN, reason="Invalid resume token")
+        return
     await manager.connect(websocket, client_id)
-    session = session_manager.create_session(client_id)
 
     try:
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+
+            # Binary frames carry raw microphone audio; everything else is JSON.
+            if received.get("bytes") is not None:
+                await handle_binary_message(session, received["bytes"])
+                continue
+
+            message = json.loads(received["text"])
             message_type = message.get("type")
             payload = message.get("payload")
 
@@ -329,8 +601,20 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 logger.warning(f"Unknown message type: {message_type}")
 
     except WebSocketDisconnect:
-        if session.active_llm_task:
-            session.active_llm_task.cancel()
-        manager.disconnect(client_id)
-        session_manager.remove_session(client_id)
         logger.info(f"Client {client_id} disconnected.")
+    except Exception as e:
+        logger.exception(f"Error on the connection of client {client_id}: {e}")
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        # A client that already reconnected shares this session with its new
+        # connection, which keeps it
+        if manager.is_current(client_id, websocket):
+            if session.active_llm_task:
+                session.active_llm_task.cancel()
+            session.context.cancel()
+            manager.disconnect(client_id, websocket)
+            await session_manager.save_session(session)
+            session_manager.remove_session(client_id)
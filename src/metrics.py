@@ -0,0 +1,227 @@
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets in seconds, from a few milliseconds to a long LLM reply
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RATE_BUCKETS = (1, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300)
+TOKEN_BUCKETS = (250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 16000)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """A gauge that is set directly, or read from `function` at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), function: Callable[[], float] | None = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self.function = function
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float]):
+        self.function = function
+
+    def _samples(self) -> Iterable[str]:
+        if self.function is not None:
+            yield f"{self.name} {_format_value(self.function())}"
+            return
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram. Observing costs a binary search and three
+    additions, so it can stay on in production.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: count per bucket (the last one is +Inf), sum and count
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), function: Callable[[], float] | None = None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def expose(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.expose() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+audio_processing_seconds = registry.histogram(
+    "avatar_audio_processing_seconds", "Time spent in the DSP chain per audio chunk."
+)
+asr_decode_seconds = registry.histogram(
+    "avatar_asr_decode_seconds", "ASR decode time per request, excluding queue wait."
+)
+asr_queue_wait_seconds = registry.histogram(
+    "avatar_asr_queue_wait_seconds", "Time ASR requests waited for a worker."
+)
+llm_time_to_first_token_seconds = registry.histogram(
+    "avatar_llm_time_to_first_token_seconds", "Time from sending the prompt to the first streamed chunk of the reply."
+)
+llm_tokens_per_second = registry.histogram(
+    "avatar_llm_tokens_per_second", "Estimated streaming rate of LLM replies after the first chunk.", buckets=RATE_BUCKETS
+)
+llm_prompt_tokens = registry.histogram(
+    "avatar_llm_prompt_tokens", "Estimated size of the prompt sent to the LLM per turn.", buckets=TOKEN_BUCKETS
+)
+tts_synthesis_seconds = registry.histogram(
+    "avatar_tts_synthesis_seconds", "Time to synthesize one sentence, cache hits included.", labelnames=("engine",)
+)
+speech_end_to_first_speak_seconds = registry.histogram(
+    "avatar_speech_end_to_first_speak_seconds", "Time from the end of the user's speech to the first avatar:speak of the reply."
+)
+http_requests = registry.counter(
+    "avatar_http_requests_total", "Requests sent by each pooled HTTP client.", labelnames=("client",)
+)
+http_new_connections = registry.counter(
+    "avatar_http_new_connections_total", "Requests that opened a new connection instead of reusing a pooled one.", labelnames=("client",)
+)
+http_retries = registry.counter(
+    "avatar_http_retries_total", "Retried requests of each pooled HTTP client.", labelnames=("client",)
+)
+http_pool_wait_seconds = registry.histogram(
+    "avatar_http_pool_wait_seconds", "Time from issuing a request to sending its headers, including connection setup.", labelnames=("client",)
+)
+asr_batch_size = registry.histogram(
+    "avatar_asr_batch_size", "Utterances decoded together in one batched ASR call.", buckets=BATCH_SIZE_BUCKETS
+)
+asr_batch_wait_seconds = registry.histogram(
+    "avatar_asr_batch_wait_seconds", "Time an utterance waited for its ASR batch to close."
+)
+tts_cache_lookups = registry.counter(
+    "avatar_tts_cache_lookups_total", "TTS cache lookups by result: hit, disk_hit or miss.", labelnames=("result",)
+)
+tts_cache_evictions = registry.counter(
+    "avatar_tts_cache_evictions_total", "Entries evicted from the memory or disk tier of the TTS cache.", labelnames=("tier",)
+)
+vad_input_seconds = registry.counter(
+    "avatar_vad_input_seconds_total", "Seconds of audio passed through the VAD stage."
+)
+vad_removed_seconds = registry.counter(
+    "avatar_vad_removed_seconds_total", "Seconds of silence the VAD stage kept away from the recognizer."
+)
+vad_dropped_chunks = registry.counter(
+    "avatar_vad_dropped_chunks_total", "Audio chunks without speech, which skipped ASR entirely."
+)
+active_sessions = registry.gauge("avatar_active_sessions", "Sessions connected to this worker.")
+llm_tasks_in_flight = registry.gauge("avatar_llm_tasks_in_flight", "Replies currently being generated.")
+asr_queue_depth = registry.gauge("avatar_asr_queue_depth", "ASR requests queued or running.")
+send_queue_depth = registry.gauge("avatar_send_queue_depth", "Messages waiting in the send queues of all connections.")
+send_queue_depth_max = registry.gauge("avatar_send_queue_depth_max", "Deepest send queue of any connection.")
+tts_cache_bytes = registry.gauge("avatar_tts_cache_bytes", "Audio held in memory by the TTS cache.")
+tts_cache_disk_bytes = registry.gauge("avatar_tts_cache_disk_bytes", "Audio held on disk by the TTS cache.")
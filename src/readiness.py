@@ -0,0 +1,97 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from loguru import logger
+
+
+@dataclass
+class ComponentStatus:
+    # pending, loading, warming_up, ready, disabled or failed
+    state: str = "pending"
+    load_seconds: Optional[float] = None
+    warmup_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.error,
+        }
+
+
+class Readiness:
+    """
+    Load state of the server's components. The service is ready once every
+    required component is loaded and warmed up; optional components are
+    reported but never hold readiness back.
+    """
+
+    def __init__(self, required: Iterable[str], optional: Iterable[str] = ()):
+        self.required = tuple(required)
+        self.components: Dict[str, ComponentStatus] = {
+            name: ComponentStatus() for name in (*self.required, *optional)
+        }
+
+    async def load(
+        self,
+        name: str,
+        load: Callable[[], Any],
+        warm_up: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ):
+        """
+        Runs the blocking `load` in a worker thread, then `warm_up` with what it
+        returned. A `load` that returns None leaves the component disabled.
+        A failed warm-up fails the component, since it could not serve a
+        request either.
+        """
+        status = self.components[name]
+        status.state = "loading"
+        started = time.perf_counter()
+        try:
+            component = await asyncio.to_thread(load)
+        except Exception as e:
+            status.state = "failed"
+            status.error = str(e)
+            logger.error(f"Failed to load {name}: {e}")
+            return
+        finally:
+            status.load_seconds = time.perf_counter() - started
+
+        if component is None:
+            status.state = "disabled"
+            return
+
+        if warm_up is not None:
+            status.state = "warming_up"
+            started = time.perf_counter()
+            try:
+                await warm_up(component)
+            except Exception as e:
+                status.state = "failed"
+                status.error = f"Warm-up failed: {e}"
+                logger.error(f"Warm-up of {name} failed: {e}")
+                return
+            finally:
+                status.warmup_seconds = time.perf_counter() - started
+
+        status.state = "ready"
+        logger.info(
+            f"{name} ready. Load took {status.load_seconds:.2f} seconds"
+            + (f", warm-up {status.warmup_seconds:.2f} seconds." if status.warmup_seconds is not None else ".")
+        )
+
+    def is_ready(self) -> bool:
+        return all(self.components[name].state == "ready" for name in self.required)
+
+    def not_ready(self) -> list:
+        return [name for name in self.required if self.components[name].state != "ready"]
+
+    def snapshot(self) -> dict:
+        return {name: status.to_dict() for name, status in self.components.items()}
+
+
+readiness = Readiness(required=("asr", "llm", "tts"), optional=("vad",))
@@ -1,108 +1,189 @@
 import uuid
 import os
 import asyncio
-from typing import Dict, List
+import secrets
+from typing import Dict
 from loguru import logger
 import numpy as np
 
 from .asr.asr_interface import ASRInterface
+from .asr.asr_executor import ASRExecutor
+from .audio.audio_processor import AudioProcessor
 from .tts.tts_interface import TTSInterface
 from .llm.llm_interface import LLMInterface
 from .character_manager import Character, character_manager
 from .live2d.live2d_model import Live2dModel
-from .prompts import prompt_loader
+from .context_window import ContextWindow
+from .session_store import SessionState, SessionStore, create_session_store
+from .config import app_config
 from . import globals
 
+class ResumeTokenError(PermissionError):
+    """Raised when a client asks for a session without presenting its resume token."""
+
+
 class Session:
-    def __init__(self, session_id: str, client_id: str):
+    def __init__(self, session_id: str, client_id: str, resume_token: str | None = None):
         self.session_id: str = session_id
         self.client_id: str = client_id
+        # Unguessable, unlike the client id, so only the client that started
+        # the session can resume it
+        self.resume_token: str = resume_token or secrets.token_urlsafe(32)
         self.character: Character | None = None
-        self.history: List[Dict[str, str]] = []
+        # Conversation sent to the LLM, bounded by a token budget
+        self.context = self._new_context()
         self.live2d_model: Live2dModel | None = None
 
         # AI module instances
         self.asr_engine: ASRInterface | None = None
+        self.asr_executor: ASRExecutor | None = None
         self.tts_engine: TTSInterface | None = None
         self.llm_engine: LLMInterface | None = None
-        self.asr_stream: "sherpa_onnx.OnlineStream" | None = None
+        # Per-session stream of a streaming ASR engine, created on the first audio chunk
+        self.asr_stream: "sherpa_onnx.OnlineStream | None" = None
+        # Set when the recognizer finalized the utterance at an endpoint, before `user:audio_end`
+        self.utterance_finalized: bool = False
         self.active_llm_task: asyncio.Task | None = None
         self.last_asr_text: str = ""
-        self.audio_buffer = bytearray()
+        # Mic frames of the current utterance, decoded as a whole by non-streaming engines
+        self.audio_buffer: list[np.ndarray] = []
+        # Sequence number of the last binary audio frame, used to spot gaps
+        self.last_audio_sequence: int | None = None
+        # Keeps filter state and a noise profile across this session's audio chunks
+        self.audio_processor = AudioProcessor()
         self.interrupted: bool = False
+        # Whether the client negotiated binary frames for avatar:speak audio
+        self.binary_audio: bool = False
+        self.speak_sequence: int = 0
+        # When the user stopped speaking, until the first avatar:speak of the reply
+        self.speech_ended_at: float | None = None
+
+    @staticmethod
+    def _new_context() -> ContextWindow:
+        return ContextWindow(
+            max_tokens=app_config.CONTEXT_MAX_TOKENS,
+            summarize_tokens=app_config.CONTEXT_SUMMARIZE_TOKENS
+        )
 
     def initialize_modules(self, character_id: str):
-        self.character = character_manager.get_character(character_id)
-        if not self.character:
+        # Everything derived from the character's files was prepared at startup
+        bundle = character_manager.get_bundle(character_id)
+        if not bundle:
             raise ValueError(f"Character '{character_id}' not found.")
 
-        self.live2d_model = Live2dModel(
-            live2d_model_name=self.character.live2d_model_name,
-            model_dict_path="model_dict.json"
-        )
+        if self.character is not None and self.character.id != bundle.character.id:
+            # A conversation never carries over to a different character
+            self.context.cancel()
+            self.context = self._new_context()
+        self.character = bundle.character
+        self.live2d_model = bundle.live2d_model
 
         # Assign pre-loaded engines from globals
         self.asr_engine = globals.asr_engine
+        self.asr_executor = globals.asr_executor
         self.llm_engine = globals.llm_engine
-        if self.character.id in globals.tts_engines:
-            self.tts_engine = globals.tts_engines[self.character.id]
-        else:
-            logger.error(f"TTS engine for character '{self.character.id}' not found in pre-loaded engines.")
-            # As a fallback, you might want to load it on-demand or raise an error
-            # For now, we'll leave it as None and let it fail downstream
-            self.tts_engine = None
-
-        # Initialize conversation history with the character's persona
+        # TTS engines are created on first use and shared by identical configs
+        self.release_tts_engine()
         try:
-            # Load and format expression prompt
-            expression_prompt_template = prompt_loader.load_util("live2d_expression_prompt")
-            expression_prompt = expression_prompt_template.replace(
-                "[<insert_emomap_keys>]", self.live2d_model.emo_str
-            )
+            self.tts_engine = globals.tts_registry.acquire(self.character.tts_engine)
         except Exception as e:
-            logger.error(f"Error loading expression prompt, falling back to default: {e}")
-            expression_prompt = f"You can use the following expressions: {self.live2d_model.emo_str}"
+            logger.error(f"Failed to load TTS engine for character '{self.character.name}': {e}")
+            # Left as None, so synthesis fails downstream
+            self.tts_engine = None
 
-        try:
-            # Load and format motion prompt
-            motion_prompt_template = prompt_loader.load_util("live2d_motion_prompt")
-            motion_prompt = motion_prompt_template.replace(
-                "[<insert_motion_keys>]", self.live2d_model.motion_str
-            )
-        except Exception as e:
-            logger.error(f"Error loading motion prompt, falling back to default: {e}")
-            motion_prompt = f"You can use the following motions: {self.live2d_model.motion_str}"
+        # Initialize conversation history with the character's persona
+        self.context.set_system_prompt(bundle.system_prompt)
+        logger.info(f"Initialized AI modules for session {self.session_id} with character {self.character.name}")
 
-        speakable_prompt = prompt_loader.load_util("speakable_prompt")
-        concise_style_prompt = prompt_loader.load_util("concise_style_prompt")
+    def to_state(self) -> SessionState:
+        return SessionState(
+            session_id=self.session_id,
+            client_id=self.client_id,
+            resume_token=self.resume_token,
+            character_id=self.character.id if self.character else None,
+            binary_audio=self.binary_audio,
+            speak_sequence=self.speak_sequence,
+            summary=self.context.summary,
+            messages=[(message.role, message.content) for message in self.context.messages],
+        )
 
-        system_prompt = f"{self.character.llm_persona}\n\n{speakable_prompt}\n\n{expression_prompt}\n\n{motion_prompt}\n\n{concise_style_prompt}"
+    @classmethod
+    def from_state(cls, state: SessionState) -> "Session":
+        session = cls(state.session_id, state.client_id, state.resume_token)
+        session.binary_audio = state.binary_audio
+        session.speak_sequence = state.speak_sequence
+        session.context.summary = state.summary
+        for role, content in state.messages:
+            session.context.append(role, content)
+        if state.character_id and character_manager.get_bundle(state.character_id):
+            session.initialize_modules(state.character_id)
+        return session
 
-        self.history.append({"role": "system", "content": system_prompt})
-        logger.info(f"Initialized AI modules for session {self.session_id} with character {self.character.name}")
+    def release_tts_engine(self):
+        if self.tts_engine is not None and globals.tts_registry:
+            globals.tts_registry.release(self.tts_engine)
+        self.tts_engine = None
 
 
 class SessionManager:
-    def __init__(self):
-        self.sessions: Dict[str, Session] = {}
+    """
+    Sessions of the clients connected to this worker. The state of a session
+    is also saved to `store` after each turn and on disconnect, so a client
+    that reconnects, to this worker or any other, continues its conversation.
+    """
 
-    def create_session(self, client_id: str) -> Session:
+    def __init__(self, store: SessionStore):
+        self.sessions: Dict[str, Session] = {}
+        self.store = store
+
+    @staticmethod
+    def _check_resume_token(token: str, resume_token: str | None):
+        if not secrets.compare_digest(token.encode(), (resume_token or "").encode()):
+            raise ResumeTokenError("Invalid resume token.")
+
+    async def create_session(self, client_id: str, resume_token: str | None = None) -> Session:
+        """
+        Returns the session of `client_id`, restored from the store if needed,
+        or a new one. An existing session is only handed out for its resume
+        token; otherwise ResumeTokenError is raised.
+        """
         if client_id in self.sessions:
-            return self.sessions[client_id]
+            session = self.sessions[client_id]
+            self._check_resume_token(session.resume_token, resume_token)
+            return session
 
-        session_id = str(uuid.uuid4())
-        session = Session(session_id, client_id)
+        try:
+            state = await self.store.load(client_id)
+        except Exception as e:
+            logger.error(f"Failed to load session state for client {client_id}: {e}")
+            state = None
+        if state is not None:
+            self._check_resume_token(state.resume_token, resume_token)
+            session = Session.from_state(state)
+            logger.info(f"Restored session {session.session_id} for client {client_id} ({len(state.messages)} messages)")
+        else:
+            session = Session(str(uuid.uuid4()), client_id)
+            logger.info(f"Created session {session.session_id} for client {client_id}")
         self.sessions[client_id] = session
-        logger.info(f"Created session {session_id} for client {client_id}")
         return session
 
+    async def save_session(self, session: Session):
+        try:
+            await self.store.save(session.to_state())
+        except Exception as e:
+            # The conversation goes on; only a reconnect would lose it
+            logger.error(f"Failed to save session state for client {session.client_id}: {e}")
+
     def get_session(self, client_id: str) -> Session | None:
         return self.sessions.get(client_id)
 
     def remove_session(self, client_id: str):
         if client_id in self.sessions:
-            session_id = self.sessions[client_id].session_id
-            del self.sessions[client_id]
+            session = self.sessions.pop(client_id)
+            session_id = session.session_id
+            session.release_tts_engine()
             logger.info(f"Removed session {session_id} for client {client_id}")
 
-session_manager = SessionManager()
\ No newline at end of file
+session_manager = SessionManager(
+    store=create_session_store(app_config.SESSION_STORE_URL, ttl=app_config.SESSION_TTL_SECONDS)
+)
\ No newline at end of file
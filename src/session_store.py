@@ -0,0 +1,251 @@
+import asyncio
+import json
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from loguru import logger
+
+
+@dataclass
+class SessionState:
+    """
+    The part of a session that outlives its websocket: conversation, character
+    and turn state. Engines, streams and tasks are rebuilt by the worker that
+    picks the session up.
+    """
+    session_id: str
+    client_id: str
+    # Secret the client presents to resume the session
+    resume_token: str = ""
+    character_id: Optional[str] = None
+    binary_audio: bool = False
+    speak_sequence: int = 0
+    summary: str = ""
+    # (role, content) pairs, oldest first
+    messages: List[Tuple[str, str]] = field(default_factory=list)
+
+    VERSION = 2
+
+    def to_bytes(self) -> bytes:
+        # Short keys and no whitespace, then deflate: conversations are text
+        # and compress several times over
+        data = {
+            "v": self.VERSION,
+            "s": self.session_id,
+            "c": self.client_id,
+            "t": self.resume_token,
+            "ch": self.character_id,
+            "b": int(self.binary_audio),
+            "q": self.speak_sequence,
+            "sm": self.summary,
+            "m": [[role, content] for role, content in self.messages],
+        }
+        return zlib.compress(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "SessionState":
+        data = json.loads(zlib.decompress(payload).decode("utf-8"))
+        if data.get("v") != cls.VERSION:
+            raise ValueError(f"Unsupported session state version: {data.get('v')}")
+        return cls(
+            session_id=data["s"],
+            client_id=data["c"],
+            resume_token=data["t"],
+            character_id=data["ch"],
+            binary_audio=bool(data["b"]),
+            speak_sequence=data["q"],
+            summary=data["sm"],
+            messages=[(role, content) for role, content in data["m"]],
+        )
+
+
+class SessionStore(ABC):
+    """
+    Keeps session state between connections, keyed by client id. Entries
+    expire `ttl` seconds after they were last saved.
+    """
+
+    def __init__(self, ttl: float = 1800.0):
+        self.ttl = ttl
+
+    @abstractmethod
+    async def load(self, client_id: str) -> Optional[SessionState]:
+        pass
+
+    @abstractmethod
+    async def save(self, state: SessionState):
+        pass
+
+    @abstractmethod
+    async def delete(self, client_id: str):
+        pass
+
+    async def aclose(self):
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """Keeps state in this process. Only useful with a single worker."""
+
+    def __init__(self, ttl: float = 1800.0):
+        super().__init__(ttl)
+        self._entries: Dict[str, Tuple[float, bytes]] = {}
+
+    async def load(self, client_id: str) -> Optional[SessionState]:
+        entry = self._entries.get(client_id)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at < time.monotonic():
+            del self._entries[client_id]
+            return None
+        return SessionState.from_bytes(payload)
+
+    async def save(self, state: SessionState):
+        # Stored serialized, so a restored session never shares objects with the old one
+        self._entries[state.client_id] = (time.monotonic() + self.ttl, state.to_bytes())
+        # Expired entries are dropped as new ones come in
+        now = time.monotonic()
+        for client_id in [client_id for client_id, (expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[client_id]
+
+    async def delete(self, client_id: str):
+        self._entries.pop(client_id, None)
+
+
+class RedisProtocolError(RuntimeError):
+    """Raised for error replies and malformed responses from the server."""
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Keeps state in a server speaking the Redis protocol (Redis, Valkey,
+    KeyDB, ...), shared by every worker and node. Uses a single connection
+    with the handful of commands it needs, so no client library is required.
+
+    The URL has the form `redis://[:password@]host[:port][/db]`.
+    """
+
+    def __init__(self, url: str, ttl: float = 1800.0, key_prefix: str = "ai-avatar:session:", timeout: float = 5.0):
+        super().__init__(ttl)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        # Replies are matched to commands by order, so commands run one at a time
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode("utf-8")
+            elif not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def _read_reply(self):
+        line = await self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection to session store closed.")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode("utf-8")
+        if prefix == b"-":
+            raise RedisProtocolError(body.decode("utf-8"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(body)
+            return None if length < 0 else [await self._read_reply() for _ in range(length)]
+        raise RedisProtocolError(f"Unexpected reply: {line!r}")
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self.password:
+                auth = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+                await self._send(*auth)
+            if self.db:
+                await self._send("SELECT", self.db)
+        except BaseException:
+            # Never keep a connection with the wrong credentials or database
+            await self._close_connection()
+            raise
+
+    async def _send(self, *args):
+        self._writer.write(self._encode(*args))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _close_connection(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+    async def execute(self, *args):
+        async with self._lock:
+            # One reconnect attempt covers connections dropped while idle
+            for attempt in range(2):
+                try:
+                    if self._writer is None:
+                        await asyncio.wait_for(self._connect(), timeout=self.timeout)
+                    return await asyncio.wait_for(self._send(*args), timeout=self.timeout)
+                except asyncio.CancelledError:
+                    # The reply may still arrive and would be read as the answer to the next command
+                    if self._writer is not None:
+                        self._writer.close()
+                    self._reader = self._writer = None
+                    raise
+                except (ConnectionError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                    await self._close_connection()
+                    if attempt:
+                        raise ConnectionError(f"Session store unavailable: {e}") from e
+                    logger.warning(f"Session store connection lost, reconnecting: {e}")
+
+    def _key(self, client_id: str) -> str:
+        return f"{self.key_prefix}{client_id}"
+
+    async def load(self, client_id: str) -> Optional[SessionState]:
+        payload = await self.execute("GET", self._key(client_id))
+        return SessionState.from_bytes(payload) if payload is not None else None
+
+    async def save(self, state: SessionState):
+        await self.execute("SET", self._key(state.client_id), state.to_bytes(), "PX", int(self.ttl * 1000))
+
+    async def delete(self, client_id: str):
+        await self.execute("DEL", self._key(client_id))
+
+    async def aclose(self):
+        async with self._lock:
+            await self._close_connection()
+
+
+def create_session_store(url: str, ttl: float = 1800.0) -> SessionStore:
+    if not url or url == "memory":
+        return InMemorySessionStore(ttl=ttl)
+    if url.startswith("redis://"):
+        return RedisSessionStore(url, ttl=ttl)
+    raise ValueError(f"Unknown session store: {url}")
@@ -0,0 +1,185 @@
+import asyncio
+import base64
+import json
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+from loguru import logger
+
+from . import binary_protocol
+from . import metrics
+from .connection_manager import manager
+from .session_manager import Session
+from .tts.tts_cache import CachedTTS
+from .tracing import TurnTrace
+
+
+@dataclass
+class PreparedSentence:
+    text: str
+    payload: dict
+    index: int = 0
+    # Synthesized audio chunks, terminated by None
+    chunks: asyncio.Queue = field(default_factory=asyncio.Queue)
+    task: asyncio.Task | None = None
+
+
+class SpeechPipeline:
+    """
+    Turns the sentences of one LLM reply into avatar:speak messages.
+
+    Sentences are pushed as soon as the splitter emits them, and action tags
+    as soon as they are complete. TTS starts right
+    away for up to `lookahead` sentences beyond the one being delivered, while
+    delivery sends the messages strictly in order. `cancel()` stops delivery
+    and every synthesis still in flight.
+    """
+
+    def __init__(self, session: Session, lookahead: int = 2, trace: TurnTrace | None = None):
+        self.session = session
+        self.trace = trace
+        self._count = 0
+        self.lookahead = max(0, lookahead)
+        self._sentences: asyncio.Queue = asyncio.Queue()
+        self._prepared: asyncio.Queue = asyncio.Queue()
+        # One slot for the sentence being delivered plus one per lookahead sentence
+        self._slots = asyncio.Semaphore(self.lookahead + 1)
+        self._in_flight: set[asyncio.Task] = set()
+        self._scheduler = asyncio.create_task(self._schedule())
+        self._sender = asyncio.create_task(self._send())
+
+    def push(self, sentence: str, expressions: List[str] = (), motions: List[str] = ()):
+        """
+        Queues a sentence, already cleaned of action tags, with the expressions
+        and motions to play with it. A call without text dispatches the actions
+        as soon as the sentences queued before it have been delivered.
+        """
+        self._sentences.put_nowait((sentence, list(expressions), list(motions)))
+
+    async def finish(self):
+        """Waits until every pushed sentence has been delivered."""
+        self._sentences.put_nowait(None)
+        await self._sender
+
+    def cancel(self):
+        for task in (self._scheduler, self._sender, *self._in_flight):
+            task.cancel()
+
+    def _prepare(self, text_to_speak: str, expressions: List[str], motions: List[str]) -> PreparedSentence | None:
+        live2d_model = self.session.live2d_model
+        expression_data = [live2d_model.emo_map[exp] for exp in expressions if live2d_model.emo_map.get(exp)]
+        motion_data = [live2d_model.motion_map[mot] for mot in motions if live2d_model.motion_map.get(mot)]
+
+        text_to_speak = text_to_speak.strip()
+        if not (text_to_speak or expression_data or motion_data):
+            return None
+
+        self._count += 1
+        prepared = PreparedSentence(
+            index=self._count,
+            text=text_to_speak,
+            payload={
+                "text": text_to_speak,
+                "expressions": expression_data,
+                "motions": motion_data
+            },
+        )
+        if text_to_speak:
+            prepared.task = asyncio.create_task(self._synthesize(prepared))
+            self._in_flight.add(prepared.task)
+            prepared.task.add_done_callback(self._in_flight.discard)
+        else:
+            prepared.chunks.put_nowait(None)
+        return prepared
+
+    async def _synthesize(self, prepared: PreparedSentence):
+        tts_engine = self.session.tts_engine
+        started = time.perf_counter()
+        try:
+            if self.session.binary_audio:
+                async for chunk in tts_engine.synthesize_stream(prepared.text):
+                    prepared.chunks.put_nowait(chunk)
+            else:
+                prepared.chunks.put_nowait(await tts_engine.synthesize(prepared.text))
+            engine = tts_engine.engine if isinstance(tts_engine, CachedTTS) else tts_engine
+            metrics.tts_synthesis_seconds.observe(time.perf_counter() - started, engine=type(engine).__name__)
+            if self.trace:
+                self.trace.add_span("tts", started, sentence=prepared.index, engine=type(engine).__name__, chars=len(prepared.text))
+        finally:
+            prepared.chunks.put_nowait(None)
+
+    async def _schedule(self):
+        try:
+            while (item := await self._sentences.get()) is not None:
+                await self._slots.acquire()
+                prepared = self._prepare(*item)
+                if prepared is None:
+                    self._slots.release()
+                    continue
+                self._prepared.put_nowait(prepared)
+        finally:
+            self._prepared.put_nowait(None)
+
+    async def _send(self):
+        while (prepared := await self._prepared.get()) is not None:
+            started = time.perf_counter()
+            try:
+                await self._deliver(prepared)
+                if self.trace:
+                    self.trace.add_span("deliver", started, sentence=prepared.index)
+            except Exception as e:
+                # A failed sentence is skipped; the rest of the reply goes on
+                logger.error(f"Failed to deliver sentence {prepared.index} to client {self.session.client_id}: {e!r}")
+                if self.trace:
+                    self.trace.add_span("deliver", started, sentence=prepared.index, error=repr(e))
+            finally:
+                self._slots.release()
+
+    async def _deliver(self, prepared: PreparedSentence):
+        session = self.session
+        speak_payload = prepared.payload
+        if session.speech_ended_at is not None:
+            metrics.speech_end_to_first_speak_seconds.observe(time.perf_counter() - session.speech_ended_at)
+            session.speech_ended_at = None
+        if self.trace and prepared.index == 1:
+            self.trace.mark("first_speak")
+
+        if session.binary_audio and prepared.task is not None:
+            # Audio chunks are forwarded as soon as the TTS engine produces them, in
+            # binary frames that carry the message's audio_id. The last frame is
+            # flagged as final.
+            session.speak_sequence += 1
+            audio_id = session.speak_sequence
+            speak_payload["audio_id"] = audio_id
+            await manager.send_personal_message(json.dumps({"type": "avatar:speak", "payload": speak_payload}), session.client_id)
+
+            chunk_header = binary_protocol.pack_header(binary_protocol.MSG_AVATAR_SPEAK_AUDIO, audio_id)
+            try:
+                while (chunk := await prepared.chunks.get()) is not None:
+                    await manager.send_personal_bytes(chunk_header + chunk, session.client_id)
+                await prepared.task
+            finally:
+                # Sent even when synthesis failed, so the client stops waiting
+                # for this audio and plays what it received
+                final_header = binary_protocol.pack_header(
+                    binary_protocol.MSG_AVATAR_SPEAK_AUDIO, audio_id, flags=binary_protocol.FLAG_FINAL
+                )
+                await manager.send_personal_bytes(final_header, session.client_id)
+            return
+
+        chunks = []
+        while (chunk := await prepared.chunks.get()) is not None:
+            chunks.append(chunk)
+        if prepared.task is not None:
+            try:
+                await prepared.task
+            except Exception as e:
+                # The text and actions are still shown, without audio
+                logger.error(f"TTS failed for sentence {prepared.index} of client {session.client_id}: {e!r}")
+                chunks = []
+        speak_payload["audio"] = base64.b64encode(b"".join(chunks)).decode('utf-8')
+        # Carries the whole sentence's audio, so it is paced like binary audio frames
+        await manager.send_personal_message(
+            json.dumps({"type": "avatar:speak", "payload": speak_payload}), session.client_id, drain=True
+        )
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from .config import app_config
+
+
+@dataclass
+class Span:
+    name: str
+    # perf_counter() timestamps
+    start: float
+    end: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class TurnTrace:
+    """
+    Timeline of one conversational turn, from the end of the user's speech (or
+    their text message) to the end of the reply. Stages add spans as they
+    finish; `finish()` closes the turn.
+    """
+
+    def __init__(self, client_id: str, source: str, started_at: Optional[float] = None):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.client_id = client_id
+        self.source = source
+        # perf_counter() is used for the spans, the wall clock only to date the turn
+        self.start = started_at if started_at is not None else time.perf_counter()
+        self.wall_start = time.time() - (time.perf_counter() - self.start)
+        self.end: Optional[float] = None
+        self.spans: List[Span] = []
+        self.attributes: Dict[str, Any] = {}
+
+    def add_span(self, name: str, start: float, end: Optional[float] = None, **attributes):
+        self.spans.append(Span(name, start, end if end is not None else time.perf_counter(), attributes))
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            self.add_span(name, start, **attributes)
+
+    def mark(self, name: str, **attributes):
+        """Records an instant, such as the first avatar:speak."""
+        now = time.perf_counter()
+        self.add_span(name, now, now, **attributes)
+
+    def finish(self, **attributes):
+        self.end = time.perf_counter()
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        """The turn as a waterfall: spans by start time, relative to the turn's start."""
+        end = self.end if self.end is not None else time.perf_counter()
+        return {
+            "trace_id": self.trace_id,
+            "client_id": self.client_id,
+            "source": self.source,
+            "started_at": self.wall_start,
+            "duration_ms": round(1000 * (end - self.start), 3),
+            "finished": self.end is not None,
+            "attributes": self.attributes,
+            "spans": [
+                {
+                    "name": span.name,
+                    "start_ms": round(1000 * (span.start - self.start), 3),
+                    "duration_ms": round(1000 * (span.end - span.start), 3),
+                    "attributes": span.attributes,
+                }
+                for span in sorted(self.spans, key=lambda span: span.start)
+            ],
+        }
+
+    def to_trace_events(self, thread_id: int) -> List[dict]:
+        """The turn as Chrome trace events, one row per turn."""
+        pid = os.getpid()
+        to_us = lambda t: (self.wall_start + (t - self.start)) * 1e6
+        end = self.end if self.end is not None else time.perf_counter()
+        events = [{
+            "name": f"turn {self.trace_id}",
+            "ph": "X",
+            "ts": to_us(self.start),
+            "dur": (end - self.start) * 1e6,
+            "pid": pid,
+            "tid": thread_id,
+            "args": {"trace_id": self.trace_id, "client_id": self.client_id, "source": self.source, **self.attributes},
+        }]
+        for span in self.spans:
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": to_us(span.start),
+                "dur": (span.end - span.start) * 1e6,
+                "pid": pid,
+                "tid": thread_id,
+                "args": {"trace_id": self.trace_id, **span.attributes},
+            })
+        return events
+
+
+class TraceBuffer:
+    """
+    Keeps the most recent `capacity` turns in memory. If `export_path` is set,
+    finished turns are also appended to that file in the Chrome trace event
+    format, which chrome://tracing and Perfetto open directly.
+    """
+
+    def __init__(self, capacity: int = 200, export_path: str = ""):
+        self._turns: deque[TurnTrace] = deque(maxlen=max(1, capacity))
+        self.export_path = export_path
+        self._export_lock = threading.Lock()
+        self._exported = 0
+
+    def start_turn(self, client_id: str, source: str, started_at: Optional[float] = None) -> TurnTrace:
+        trace = TurnTrace(client_id, source, started_at)
+        self._turns.append(trace)
+        return trace
+
+    async def finish_turn(self, trace: TurnTrace, **attributes):
+        trace.finish(**attributes)
+        if self.export_path:
+            try:
+                await asyncio.to_thread(self._export, trace)
+            except OSError as e:
+                logger.warning(f"Failed to export trace {trace.trace_id}: {e}")
+
+    def _export(self, trace: TurnTrace):
+        with self._export_lock:
+            self._exported += 1
+            events = trace.to_trace_events(thread_id=self._exported)
+            new_file = not os.path.exists(self.export_path) or os.path.getsize(self.export_path) == 0
+            with open(self.export_path, "a", encoding="utf-8") as f:
+                # The array is never closed, which the trace format allows, so
+                # turns can be appended for as long as the server runs
+                if new_file:
+                    f.write("[\n")
+                for event in events:
+                    f.write(json.dumps(event) + ",\n")
+
+    def recent(self, limit: int = 20, client_id: Optional[str] = None) -> List[dict]:
+        turns = [trace for trace in reversed(self._turns) if client_id is None or trace.client_id == client_id]
+        return [trace.to_dict() for trace in turns[:limit]]
+
+
+turn_traces = TraceBuffer(capacity=app_config.TRACE_BUFFER_SIZE, export_path=app_config.TRACE_EXPORT_PATH)
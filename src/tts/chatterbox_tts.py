@@ -1,15 +1,22 @@
 from loguru import logger
 import httpx
-from .tts_interface import TTSInterface
-from typing import Optional, Any, Dict
+from .tts_interface import TTSInterface, TTSStreamError
+from ..config import http_config
+from ..http_client import http_clients, RETRY_STATUS_CODES
+from typing import Optional, Any, Dict, AsyncIterator
 
 class ChatterboxTTS(TTSInterface):
     """
     A TTS implementation for the custom Chatterbox TTS service.
     """
 
-    def __init__(self, base_url: str, api_key: Optional[str] = None, **kwargs):
+    HTTP_CLIENT_NAME = "chatterbox_tts"
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout: Optional[float] = None, **kwargs):
         self.base_url = base_url
+        # Read timeout of a synthesis request, None uses the shared client's default
+        self._timeout = http_clients.timeout(read=timeout) if timeout else httpx.USE_CLIENT_DEFAULT
+        self._stats = http_clients.get_stats(self.HTTP_CLIENT_NAME)
         self.headers = {}
         if api_key:
             self.headers["X-API-Key"] = api_key
@@ -18,6 +25,13 @@ class ChatterboxTTS(TTSInterface):
         if 'voice' in self.tts_params:
             self.tts_params['voice_id'] = self.tts_params.pop('voice')
 
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        # Shared by every character using Chatterbox, so connections are reused
+        return http_clients.get_client(self.HTTP_CLIENT_NAME)
+
+    def cache_params(self) -> Dict[str, Any]:
+        return {"base_url": self.base_url, **self.tts_params}
 
     async def synthesize(self, text: str) -> bytes:
         """
@@ -35,14 +49,72 @@ class ChatterboxTTS(TTSInterface):
             **self.tts_params
         }
 
-        async with httpx.AsyncClient() as client:
+        # Synthesis is idempotent, so failed attempts are retried
+        for attempt in range(http_config.RETRIES + 1):
+            if attempt:
+                self._stats.record_retry()
+                await http_clients.backoff(attempt)
             try:
-                response = await client.post(url, json=payload, headers=self.headers)
+                response = await self._client.post(url, json=payload, headers=self.headers, timeout=self._timeout)
                 response.raise_for_status()
                 return response.content
             except httpx.RequestError as e:
-                logger.error(f"An error occurred while requesting {e.request.url!r}.")
-                return b""
+                logger.error(f"An error occurred while requesting {e.request.url!r}: {e!r}")
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Error response {e.response.status_code} while requesting {e.request.url!r}.")
+                if e.response.status_code not in RETRY_STATUS_CODES:
+                    break
+        return b""
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """
+        Synthesizes the given text by calling the Chatterbox API and yields the
+        chunks of the HTTP response body as they arrive.
+
+        Args:
+            text: The text to synthesize.
+
+        Yields:
+            Consecutive chunks of the audio data.
+
+        Raises:
+            TTSStreamError: If the response breaks off after audio was yielded,
+                or no attempt produced audio.
+        """
+        url = f"{self.base_url}/tts/generate"
+        payload = {
+            "text": text,
+            **self.tts_params
+        }
+
+        last_error: Exception | None = None
+        for attempt in range(http_config.RETRIES + 1):
+            if attempt:
+                self._stats.record_retry()
+                await http_clients.backoff(attempt)
+            received = False
+            try:
+                async with self._client.stream(
+                    "POST", url, json=payload, headers=self.headers, timeout=self._timeout
+                ) as response:
+                    if response.is_error:
+                        # Reading the short error body lets the connection go back to the pool
+                        await response.aread()
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        received = True
+                        yield chunk
+                return
+            except httpx.RequestError as e:
+                # Audio already yielded cannot be taken back, so the sentence is cut short
+                if received:
+                    raise TTSStreamError(f"Audio stream from {e.request.url!r} broke off: {e!r}") from e
+                logger.error(f"An error occurred while requesting {e.request.url!r}: {e!r}")
+                last_error = e
             except httpx.HTTPStatusError as e:
                 logger.error(f"Error response {e.response.status_code} while requesting {e.request.url!r}.")
-                return b""
\ No newline at end of file
+                last_error = e
+                if e.response.status_code not in RETRY_STATUS_CODES:
+                    break
+        # A plain return would read as a complete, empty sentence to callers such as the TTS cache
+        raise TTSStreamError(f"Chatterbox synthesis failed: {last_error!r}") from last_error
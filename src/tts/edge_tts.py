@@ -1,4 +1,5 @@
 import edge_tts
+from typing import Any, AsyncIterator, Dict
 from .tts_interface import TTSInterface
 
 class EdgeTTS(TTSInterface):
@@ -9,6 +10,9 @@ class EdgeTTS(TTSInterface):
     def __init__(self, voice: str = "en-US-AriaNeural"):
         self.voice = voice
 
+    def cache_params(self) -> Dict[str, Any]:
+        return {"voice": self.voice}
+
     async def synthesize(self, text: str) -> bytes:
         """
         Synthesizes the given text into audio data using edge-tts.
@@ -19,9 +23,20 @@ class EdgeTTS(TTSInterface):
         Returns:
             A bytes object containing the audio data in raw PCM format.
         """
+        return b"".join([chunk async for chunk in self.synthesize_stream(text)])
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """
+        Synthesizes the given text using edge-tts and yields the audio chunks
+        as they arrive from the service.
+
+        Args:
+            text: The text to synthesize.
+
+        Yields:
+            Consecutive chunks of the audio data.
+        """
         communicate = edge_tts.Communicate(text, self.voice)
-        audio_data = b""
         async for chunk in communicate.stream():
             if chunk["type"] == "audio":
-                audio_data += chunk["data"]
-        return audio_data
\ No newline at end of file
+                yield chunk["data"]
\ No newline at end of file
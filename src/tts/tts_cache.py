@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional
+
+from loguru import logger
+from .tts_interface import TTSInterface
+from .. import metrics
+
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace so trivially different sentences share an entry."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class TTSAudioCache:
+    """
+    Content-addressed cache of synthesized audio.
+
+    Entries live in a memory LRU bounded by `max_bytes`. If `directory` is set,
+    entries are also written there as `<key>.audio` files, which survive
+    restarts and are used when an entry has been evicted from memory. The disk
+    tier is bounded by `disk_max_bytes` (0 means unbounded). Once it is over the
+    limit, the least recently used files are evicted until it is down to
+    `DISK_LOW_WATER` of the limit, so not every later write has to scan the
+    directory again.
+    """
+
+    DISK_LOW_WATER = 0.9
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, directory: Optional[str] = None, disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        self._disk_size = 0
+        # Only one write runs the disk eviction at a time
+        self._evicting = False
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._disk_size = sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    @staticmethod
+    def make_key(engine: str, params: Dict[str, Any], text: str) -> str:
+        identity = json.dumps([engine, params, normalize_text(text)], sort_keys=True, default=str)
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def _put_memory(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        evictions = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = audio
+            self._size += len(audio)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                evictions += 1
+            self.evictions += evictions
+        if evictions:
+            metrics.tts_cache_evictions.inc(evictions, tier="memory")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                audio = f.read()
+            # Marks the file as recently used for disk eviction
+            os.utime(self._path(key))
+            return audio
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: str, audio: bytes):
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._disk_size += len(audio)
+            evict = bool(self.disk_max_bytes) and self._disk_size > self.disk_max_bytes and not self._evicting
+            if evict:
+                self._evicting = True
+        if evict:
+            try:
+                self._evict_disk()
+            finally:
+                with self._lock:
+                    self._evicting = False
+
+    def _evict_disk(self):
+        with self._lock:
+            tracked_size = self._disk_size
+        files = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file() and entry.name.endswith(".audio")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        size = sum(entry.stat().st_size for entry in files)
+        low_water = self.disk_max_bytes * self.DISK_LOW_WATER
+        for entry in files:
+            if size <= low_water:
+                break
+            try:
+                entry_size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            size -= entry_size
+            self.disk_evictions += 1
+            metrics.tts_cache_evictions.inc(tier="disk")
+        with self._lock:
+            # Files written while the directory was scanned are still counted
+            self._disk_size = size + self._disk_size - tracked_size
+
+    def _record(self, counter: str, result: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        metrics.tts_cache_lookups.inc(result=result)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+        if audio is not None:
+            self._record("hits", "hit")
+            return audio
+
+        if self.directory:
+            audio = await asyncio.to_thread(self._read_disk, key)
+            if audio is not None:
+                self._put_memory(key, audio)
+                self._record("disk_hits", "disk_hit")
+                return audio
+
+        self._record("misses", "miss")
+        return None
+
+    async def put(self, key: str, audio: bytes):
+        if not audio:
+            return
+        self._put_memory(key, audio)
+        if self.directory:
+            try:
+                await asyncio.to_thread(self._write_disk, key, audio)
+            except OSError as e:
+                logger.warning(f"Failed to write TTS cache entry to disk: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "disk_bytes": self._disk_size,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+class CachedTTS(TTSInterface):
+    """
+    Wraps a TTS engine so sentences it has already synthesized are served from
+    a TTSAudioCache without calling the engine. Engines whose `cache_params()`
+    returns None are not cached.
+    """
+
+    def __init__(self, engine: TTSInterface, cache: TTSAudioCache):
+        self.engine = engine
+        self.cache = cache
+        self._engine_name = type(engine).__name__
+        self._params = engine.cache_params()
+
+    def _key(self, text: str) -> Optional[str]:
+        if self._params is None:
+            return None
+        return self.cache.make_key(self._engine_name, self._params, text)
+
+    def cache_params(self) -> Optional[Dict[str, Any]]:
+        return self._params
+
+    async def synthesize(self, text: str) -> bytes:
+        key = self._key(text)
+        if key is None:
+            return await self.engine.synthesize(text)
+
+        audio = await self.cache.get(key)
+        if audio is not None:
+            return audio
+        audio = await self.engine.synthesize(text)
+        await self.cache.put(key, audio)
+        return audio
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        key = self._key(text)
+        if key is None:
+            async for chunk in self.engine.synthesize_stream(text):
+                yield chunk
+            return
+
+        audio = await self.cache.get(key)
+        if audio is not None:
+            yield audio
+            return
+
+        chunks = []
+        async for chunk in self.engine.synthesize_stream(text):
+            chunks.append(chunk)
+            yield chunk
+        # Engines raise when a stream breaks off, and a consumer that stops
+        # early closes this generator, so only complete audio gets cached
+        await self.cache.put(key, b"".join(chunks))
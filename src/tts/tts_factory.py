@@ -15,6 +15,7 @@ class TTSFactory:
         elif engine_name == "chatterbox_tts":
             kwargs['base_url'] = chatterbox_tts_config.BASE_URL
             kwargs['api_key'] = chatterbox_tts_config.API_KEY
+            kwargs.setdefault('timeout', chatterbox_tts_config.TIMEOUT)
             return ChatterboxTTS(**kwargs)
         else:
             raise ValueError(f"Unknown TTS engine: {engine_name}")
\ No newline at end of file
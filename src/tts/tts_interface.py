@@ -1,4 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class TTSStreamError(RuntimeError):
+    """Raised by `synthesize_stream` when the audio breaks off before its end."""
+
 
 class TTSInterface(ABC):
     """
@@ -16,4 +22,31 @@ class TTSInterface(ABC):
         Returns:
             A bytes object containing the audio data.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """
+        Synthesizes the given text and yields the audio data as it becomes
+        available. Engines that cannot stream yield the complete audio once.
+
+        A stream that breaks off must raise (TTSStreamError if nothing more
+        specific applies) rather than return, since callers such as the TTS
+        cache take a normal return to mean the audio is complete.
+
+        Args:
+            text: The text to synthesize.
+
+        Yields:
+            Consecutive chunks of the audio data.
+        """
+        audio = await self.synthesize(text)
+        if audio:
+            yield audio
+
+    def cache_params(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns everything besides the text that determines the synthesized
+        audio (voice, speed, ...), used to key the TTS cache. Engines that
+        return None are never cached.
+        """
+        return None
@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from .tts_cache import CachedTTS, TTSAudioCache
+from .tts_factory import TTSFactory
+from .tts_interface import TTSInterface
+
+
+@dataclass
+class _RegistryEntry:
+    engine: TTSInterface
+    users: int = 0
+    last_used: float = 0.0
+    # Pinned engines are never evicted, such as those warmed up at startup
+    pinned: bool = False
+
+
+class TTSEngineRegistry:
+    """
+    Creates TTS engines on first use and shares them between every session
+    whose character has an identical `tts_engine` config. An engine no session
+    has used for `idle_seconds` is dropped by `evict_idle()` and created again
+    when it is next needed, unless it was pinned with `pin()`.
+    """
+
+    def __init__(self, cache: Optional[TTSAudioCache] = None, idle_seconds: float = 300.0):
+        self.cache = cache
+        self.idle_seconds = idle_seconds
+        self._entries: Dict[str, _RegistryEntry] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    @staticmethod
+    def make_key(config: Dict[str, Any]) -> str:
+        return json.dumps(config, sort_keys=True, default=str)
+
+    def _create(self, config: Dict[str, Any]) -> TTSInterface:
+        engine_config = dict(config)
+        engine_name = engine_config.pop("name")
+        engine = TTSFactory.create_tts_engine(engine_name, **engine_config)
+        if self.cache and engine.cache_params() is not None:
+            engine = CachedTTS(engine, self.cache)
+        return engine
+
+    def acquire(self, config: Dict[str, Any]) -> TTSInterface:
+        """
+        Returns the engine for `config`, creating it if needed. Every call must
+        be paired with a `release()` once the caller no longer uses the engine.
+        """
+        key = self.make_key(config)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _RegistryEntry(engine=self._create(config))
+                self._entries[key] = entry
+                self.created += 1
+                logger.info(f"TTS engine '{config.get('name')}' created.")
+            entry.users += 1
+            entry.last_used = time.monotonic()
+            return entry.engine
+
+    def release(self, engine: TTSInterface):
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.engine is engine:
+                    entry.users = max(0, entry.users - 1)
+                    entry.last_used = time.monotonic()
+                    return
+
+    def pin(self, engine: TTSInterface):
+        """Keeps an acquired engine loaded even while no session uses it."""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.engine is engine:
+                    entry.pinned = True
+                    return
+
+    def evict_idle(self) -> int:
+        """Drops engines without users that have been idle too long."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                key for key, entry in self._entries.items()
+                if entry.users == 0 and not entry.pinned and now - entry.last_used >= self.idle_seconds
+            ]
+            for key in idle:
+                del self._entries[key]
+            self.evicted += len(idle)
+        if idle:
+            logger.info(f"Evicted {len(idle)} idle TTS engine(s).")
+        return len(idle)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "engines": len(self._entries),
+                "in_use": sum(1 for entry in self._entries.values() if entry.users),
+                "pinned": sum(1 for entry in self._entries.values() if entry.pinned),
+                "created": self.created,
+                "evicted": self.evicted,
+            }
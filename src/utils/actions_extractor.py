@@ -1,5 +1,93 @@
 import re
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+class ActionMatcher:
+    """
+    Finds expression (`[e:key]`) and motion (`[m:key]`) tags for one Live2D
+    model. The pattern is compiled once from the model's keys, and a single
+    pass extracts both kinds of tags and produces the cleaned text.
+    """
+
+    def __init__(self, expression_keys: Iterable[str], motion_keys: Iterable[str]):
+        self.expression_keys = tuple(expression_keys)
+        self.motion_keys = tuple(motion_keys)
+
+        branches = []
+        if self.expression_keys:
+            branches.append(r'e:(?P<e>' + '|'.join(re.escape(key) for key in self.expression_keys) + r')')
+        if self.motion_keys:
+            branches.append(r'm:(?P<m>' + '|'.join(re.escape(key) for key in self.motion_keys) + r')')
+        self.pattern = re.compile(r'\[(?:' + '|'.join(branches) + r')\]') if branches else None
+
+        # Every proper prefix of a valid tag, used to hold back a tag that is
+        # split across stream chunks
+        tags = [f"[e:{key}]" for key in self.expression_keys] + [f"[m:{key}]" for key in self.motion_keys]
+        self.tag_prefixes = frozenset(tag[:i] for tag in tags for i in range(1, len(tag)))
+        self.max_tag_length = max((len(tag) for tag in tags), default=0)
+
+    def extract(self, text: str) -> Tuple[str, List[str], List[str]]:
+        """
+        Returns the text without valid tags, and the expressions and motions
+        found, in order.
+        """
+        if self.pattern is None:
+            return text, [], []
+
+        expressions = []
+        motions = []
+        pieces = []
+        position = 0
+        for match in self.pattern.finditer(text):
+            pieces.append(text[position:match.start()])
+            position = match.end()
+            if match.group('e') is not None:
+                expressions.append(match.group('e'))
+            else:
+                motions.append(match.group('m'))
+        if not pieces:
+            return text, [], []
+        pieces.append(text[position:])
+        return ''.join(pieces), expressions, motions
+
+    def stream(self) -> "ActionStream":
+        return ActionStream(self)
+
+
+class ActionStream:
+    """
+    Extracts tags from a streamed LLM reply as the chunks arrive. A chunk that
+    ends with the beginning of a tag is held back until the tag is complete,
+    so tags split across chunks are still recognized, and each tag is reported
+    as soon as its closing bracket arrives.
+    """
+
+    def __init__(self, matcher: ActionMatcher):
+        self.matcher = matcher
+        self._pending = ""
+
+    def feed(self, chunk: str) -> Tuple[str, List[str], List[str]]:
+        """
+        Adds a chunk and returns the cleaned text that is safe to pass on, with
+        the expressions and motions completed by this chunk.
+        """
+        text = self._pending + chunk
+        self._pending = ""
+
+        start = text.rfind('[', max(0, len(text) - self.matcher.max_tag_length))
+        if start >= 0 and text[start:] in self.matcher.tag_prefixes:
+            text, self._pending = text[:start], text[start:]
+        return self.matcher.extract(text)
+
+    def flush(self) -> str:
+        """Returns text held back at the end of the reply."""
+        pending, self._pending = self._pending, ""
+        return pending
+
+
+@lru_cache(maxsize=32)
+def _get_matcher(expression_keys: Tuple[str, ...], motion_keys: Tuple[str, ...]) -> ActionMatcher:
+    return ActionMatcher(expression_keys, motion_keys)
 
 def extract_actions(text: str, expression_keys: List[str], motion_keys: List[str]) -> Tuple[str, List[str], List[str]]:
     """
@@ -14,20 +102,5 @@ def extract_actions(text: str, expression_keys: List[str], motion_keys: List[str
         A tuple containing the cleaned text, a list of extracted expressions,
         and a list of extracted motions.
     """
-    cleaned_text = text
-    expressions = []
-    motions = []
-
-    # Extract expressions
-    if expression_keys:
-        exp_pattern = r'\[e:(' + '|'.join(re.escape(key) for key in expression_keys) + r')\]'
-        expressions = re.findall(exp_pattern, cleaned_text)
-        cleaned_text = re.sub(exp_pattern, '', cleaned_text)
-
-    # Extract motions
-    if motion_keys:
-        mot_pattern = r'\[m:(' + '|'.join(re.escape(key) for key in motion_keys) + r')\]'
-        motions = re.findall(mot_pattern, cleaned_text)
-        cleaned_text = re.sub(mot_pattern, '', cleaned_text)
-
-    return cleaned_text.strip(), expressions, motions
\ No newline at end of file
+    cleaned_text, expressions, motions = _get_matcher(tuple(expression_keys), tuple(motion_keys)).extract(text)
+    return cleaned_text.strip(), expressions, motions
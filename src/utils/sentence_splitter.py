@@ -1,5 +1,6 @@
 import re
-from typing import List, Tuple
+from functools import lru_cache
+from typing import List, Optional, Tuple
 import pysbd
 from langdetect import detect
 
@@ -40,15 +41,25 @@ def is_complete_sentence(text: str) -> bool:
         return False
     return any(text.endswith(punct) for punct in END_PUNCTUATIONS)
 
-def segment_text_by_pysbd(text: str) -> Tuple[List[str], str]:
+@lru_cache(maxsize=None)
+def get_segmenter(lang: str) -> pysbd.Segmenter:
+    """
+    Returns the shared pysbd Segmenter for a language. Segmenters keep no state
+    between calls, so one instance per language is enough.
+    """
+    return pysbd.Segmenter(language=lang, clean=False)
+
+def segment_text_by_pysbd(text: str, lang: Optional[str] = None) -> Tuple[List[str], str]:
     """
     Segment text into complete sentences and remaining text.
+    The language is detected from the text unless given.
     """
     if not text:
         return [], ""
     try:
-        lang = detect_language(text)
-        segmenter = pysbd.Segmenter(language=lang, clean=False)
+        if lang is None:
+            lang = detect_language(text)
+        segmenter = get_segmenter(lang)
         sentences = segmenter.segment(text)
         if not sentences:
             return [], text
@@ -117,4 +128,94 @@ def split_sentences(text: str, faster_first_response: bool = True) -> List[str]:
 
     if remaining:
         return complete + [remaining]
-    return complete
\ No newline at end of file
+    return complete
+
+_END_CHARS = frozenset("".join(END_PUNCTUATIONS))
+# The first sentence can also be cut at a comma
+_FIRST_SENTENCE_BOUNDARY_CHARS = _END_CHARS | frozenset(COMMAS)
+
+class StreamingSentenceSplitter:
+    """
+    Splits a streamed LLM reply into sentences as the chunks arrive.
+
+    Only the text after the last emitted sentence is kept. It is segmented
+    again only when a newly appended chunk contains a possible boundary, so
+    the work per reply grows linearly with its length. The language is
+    detected once, as soon as `detect_min_chars` characters have arrived, and
+    again every `redetect_chars` characters if that is set.
+
+    The last sentence found is held back until more text arrives, because a
+    later chunk can still extend it (e.g. "3." followed by "50").
+    """
+
+    def __init__(self, faster_first_response: bool = True, detect_min_chars: int = 20, redetect_chars: int = 0):
+        self.faster_first_response = faster_first_response
+        self.detect_min_chars = detect_min_chars
+        self.redetect_chars = redetect_chars
+        self.lang: Optional[str] = None
+        self._buffer = ""
+        self._pending_boundary = False
+        self._received_chars = 0
+        self._detected_at = 0
+        self._first_sentence_emitted = False
+
+    def _update_language(self):
+        if self.lang is None:
+            if self._received_chars >= self.detect_min_chars:
+                self.lang = detect_language(self._buffer)
+                self._detected_at = self._received_chars
+        elif self.redetect_chars and self._received_chars - self._detected_at >= self.redetect_chars:
+            self.lang = detect_language(self._buffer)
+            self._detected_at = self._received_chars
+
+    def _segment(self) -> List[str]:
+        # Until the language is known, detection runs on the text so far
+        lang = self.lang or detect_language(self._buffer)
+        complete, remaining = segment_text_by_pysbd(self._buffer, lang)
+
+        if self.faster_first_response and not self._first_sentence_emitted and complete:
+            first_sentence_parts = split_by_comma(complete[0])
+            if len(first_sentence_parts) > 1:
+                complete = first_sentence_parts + complete[1:]
+
+        return complete + [remaining] if remaining else complete
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Adds a chunk of the reply and returns the sentences it completed.
+        """
+        self._buffer += chunk
+        self._received_chars += len(chunk)
+        self._update_language()
+
+        boundary_chars = self._boundary_chars()
+        self._pending_boundary = self._pending_boundary or any(c in boundary_chars for c in chunk)
+        if not self._pending_boundary:
+            return []
+
+        sentences = self._segment()
+        if len(sentences) > 1:
+            # Keep the held back text as received, including trailing whitespace
+            # that separates it from the next chunk
+            start = self._buffer.rfind(sentences[-1])
+            self._buffer = self._buffer[start:] if start >= 0 else sentences[-1]
+        emitted = [sentence for sentence in sentences[:-1] if sentence.strip()]
+        if emitted:
+            self._first_sentence_emitted = True
+        # A held back sentence that ends at a boundary is emitted once the next
+        # chunk starts a new one, so segmentation has to run again then
+        tail = self._buffer.rstrip()
+        self._pending_boundary = bool(tail) and tail[-1] in self._boundary_chars()
+        return emitted
+
+    def _boundary_chars(self) -> frozenset:
+        if self.faster_first_response and not self._first_sentence_emitted:
+            return _FIRST_SENTENCE_BOUNDARY_CHARS
+        return _END_CHARS
+
+    def flush(self) -> str:
+        """
+        Returns the text that has not been emitted yet, at the end of the reply.
+        """
+        remaining, self._buffer = self._buffer, ""
+        return remaining
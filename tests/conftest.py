@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Settings without defaults, so `src` can be imported without a .env file
+os.environ.setdefault("ASR_COMPUTE_TYPE", "int8")
+os.environ.setdefault("CHATTERBOX_TTS_BASE_URL", "http://127.0.0.1:9")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
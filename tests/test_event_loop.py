@@ -0,0 +1,143 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import uvicorn
+import websockets
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from src import globals
+from src.character_manager import character_manager
+from src.llm.open_router_llm import OpenRouterLLM
+from src.main import app
+from src.tts.dummy_tts import DummyTTS
+
+TOKENS = ["Hello ", "there, ", "this ", "is ", "a ", "rather ", "slow ", "reply."]
+TOKEN_DELAY = 0.3
+PINGS = 10
+PING_INTERVAL = 0.05
+
+
+class SlowLLMServer:
+    """
+    OpenAI-compatible chat endpoint that streams one token every TOKEN_DELAY
+    seconds. It runs in a thread with its own event loop, so it keeps
+    streaming even if the app under test blocks its loop.
+    """
+
+    def __init__(self):
+        # Set once the first token is on its way, so the app is mid-stream
+        self.streaming = threading.Event()
+        self.finished_at: float | None = None
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self.port = self._socket.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(self._app(), lifespan="off", log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [self._socket]}, daemon=True)
+
+    def _app(self) -> FastAPI:
+        llm_app = FastAPI()
+
+        @llm_app.post("/v1/chat/completions")
+        async def chat_completions():
+            async def stream():
+                for token in TOKENS:
+                    await asyncio.sleep(TOKEN_DELAY)
+                    self.streaming.set()
+                    chunk = {
+                        "id": "chatcmpl-slow",
+                        "object": "chat.completion.chunk",
+                        "created": 0,
+                        "model": "slow",
+                        "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                self.finished_at = time.perf_counter()
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        return llm_app
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+class DummyTTSRegistry:
+    """Hands every session a DummyTTS, so no TTS service is needed."""
+
+    def acquire(self, config: dict) -> DummyTTS:
+        return DummyTTS()
+
+    def release(self, engine: DummyTTS):
+        pass
+
+
+async def start_session(ws, character_id: str):
+    await ws.send(json.dumps({"type": "session:start", "payload": {"character_id": character_id}}))
+    while json.loads(await ws.recv())["type"] != "session:ready":
+        pass
+
+
+async def run_slow_turn_and_round_trip(llm_server: SlowLLMServer):
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, lifespan="off", log_level="warning"))
+    serving = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    character_id = next(iter(character_manager.bundles))
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{port}/ws/slow-client") as slow:
+            await start_session(slow, character_id)
+            await slow.send(json.dumps({"type": "user:text", "payload": {"text": "Tell me something."}}))
+            assert await asyncio.to_thread(llm_server.streaming.wait, 5), "the stand-in LLM was never called"
+
+            # Ping round trips over a few tokens of the slow reply. A loop blocked
+            # while a token is handled would delay one of them by TOKEN_DELAY.
+            async with websockets.connect(f"ws://127.0.0.1:{port}/ws/other-client") as other:
+                await start_session(other, character_id)
+                latencies = []
+                for _ in range(PINGS):
+                    started = time.perf_counter()
+                    await asyncio.wait_for(await other.ping(), timeout=5)
+                    latencies.append(time.perf_counter() - started)
+                    await asyncio.sleep(PING_INTERVAL)
+            measured_until = time.perf_counter()
+
+            # The slow reply is drained, so no task outlives the test
+            while json.loads(await asyncio.wait_for(slow.recv(), timeout=10))["type"] != "avatar:idle":
+                pass
+    finally:
+        server.should_exit = True
+        await serving
+
+    return latencies, measured_until
+
+
+def test_slow_llm_reply_does_not_block_other_connections(monkeypatch):
+    assert character_manager.bundles, "no character to start a session with"
+
+    with SlowLLMServer() as llm_server:
+        llm = OpenRouterLLM(api_key="test", model="slow", max_retries=0)
+        llm.client = llm.client.with_options(base_url=f"http://127.0.0.1:{llm_server.port}/v1")
+        monkeypatch.setattr(globals, "llm_engine", llm)
+        monkeypatch.setattr(globals, "tts_registry", DummyTTSRegistry())
+
+        latencies, measured_until = asyncio.run(run_slow_turn_and_round_trip(llm_server))
+
+    # The other client was served while the slow reply was still streaming
+    assert llm_server.finished_at is not None and measured_until < llm_server.finished_at
+    assert max(latencies) < TOKEN_DELAY / 2
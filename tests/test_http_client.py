@@ -0,0 +1,142 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+from fastapi import FastAPI, Response
+
+from src.config import http_config
+from src.http_client import HTTPClientManager
+from src.llm import open_router_llm
+from src.llm.open_router_llm import OpenRouterLLM
+from src.tts import chatterbox_tts
+from src.tts.chatterbox_tts import ChatterboxTTS
+from src.tts.tts_interface import TTSStreamError
+
+AUDIO = b"RIFF-audio"
+
+
+class ScriptedServer:
+    """
+    Serves the Chatterbox and chat completion endpoints in a thread, answering
+    each request with the next status in `statuses` (200 once they run out).
+    """
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.requests = 0
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self.port = self._socket.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(self._app(), lifespan="off", log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [self._socket]}, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def _next_status(self) -> int:
+        self.requests += 1
+        return self.statuses.pop(0) if self.statuses else 200
+
+    def _app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/tts/generate")
+        async def generate():
+            status = self._next_status()
+            return Response(AUDIO if status == 200 else b"", status_code=status)
+
+        @app.post("/v1/chat/completions")
+        async def chat_completions():
+            status = self._next_status()
+            completion = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "test",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hi."}, "finish_reason": "stop"}],
+            }
+            return Response(json.dumps(completion), status_code=status, media_type="application/json")
+
+        return app
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """A fresh client pool for the engines under test, with instant retries."""
+    manager = HTTPClientManager()
+    monkeypatch.setattr(chatterbox_tts, "http_clients", manager)
+    monkeypatch.setattr(open_router_llm, "http_clients", manager)
+    monkeypatch.setattr(http_config, "RETRIES", 2)
+    monkeypatch.setattr(http_config, "RETRY_BACKOFF", 0.0)
+    return manager
+
+
+async def collect_stream(tts: ChatterboxTTS, clients: HTTPClientManager) -> bytes:
+    try:
+        return b"".join([chunk async for chunk in tts.synthesize_stream("Hello.")])
+    finally:
+        await clients.aclose()
+
+
+def test_retried_requests_reuse_the_pooled_connection(clients):
+    with ScriptedServer(statuses=[503]) as server:
+        audio = asyncio.run(collect_stream(ChatterboxTTS(base_url=server.url), clients))
+
+    assert audio == AUDIO
+    assert server.requests == 2
+    stats = clients.stats()["chatterbox_tts"]
+    assert stats["requests"] == 2
+    assert stats["retries"] == 1
+    # The 503 response left its connection alive for the retry
+    assert stats["new_connections"] == 1
+
+
+def test_stream_raises_after_the_last_retry(clients):
+    with ScriptedServer(statuses=[503, 503, 503]) as server:
+        with pytest.raises(TTSStreamError):
+            asyncio.run(collect_stream(ChatterboxTTS(base_url=server.url), clients))
+
+    assert server.requests == 3
+    assert clients.stats()["chatterbox_tts"]["retries"] == 2
+
+
+def test_stream_raises_without_retrying_a_client_error(clients):
+    with ScriptedServer(statuses=[400]) as server:
+        with pytest.raises(TTSStreamError):
+            asyncio.run(collect_stream(ChatterboxTTS(base_url=server.url), clients))
+
+    assert server.requests == 1
+    assert clients.stats()["chatterbox_tts"]["retries"] == 0
+
+
+def test_sdk_requests_and_retries_are_traced(clients):
+    async def chat(llm: OpenRouterLLM) -> list[str]:
+        try:
+            return [text async for text in llm.chat([{"role": "user", "content": "Hello."}])]
+        finally:
+            await clients.aclose()
+
+    with ScriptedServer(statuses=[503]) as server:
+        llm = OpenRouterLLM(api_key="test", model="test", max_retries=1)
+        llm.client = llm.client.with_options(base_url=f"{server.url}/v1")
+        replies = asyncio.run(chat(llm))
+
+    assert replies == ["Hi."]
+    stats = clients.stats()["open_router"]
+    assert stats["requests"] == 2
+    assert stats["retries"] == 1
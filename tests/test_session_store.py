@@ -0,0 +1,56 @@
+import asyncio
+import json
+import zlib
+
+import pytest
+
+from src.session_manager import ResumeTokenError, SessionManager
+from src.session_store import InMemorySessionStore, SessionState
+
+
+def test_state_round_trip_keeps_the_resume_token():
+    state = SessionState(
+        session_id="session-1",
+        client_id="client-1",
+        resume_token="secret-token",
+        binary_audio=True,
+        speak_sequence=7,
+        summary="They talked about the weather.",
+        messages=[("user", "Hello."), ("assistant", "Hi there!")],
+    )
+
+    assert SessionState.from_bytes(state.to_bytes()) == state
+
+
+def test_state_of_another_version_is_rejected():
+    payload = zlib.compress(json.dumps({"v": 1, "s": "session-1", "c": "client-1"}).encode("utf-8"))
+
+    with pytest.raises(ValueError):
+        SessionState.from_bytes(payload)
+
+
+def test_restored_session_requires_its_resume_token():
+    async def run():
+        manager = SessionManager(InMemorySessionStore())
+        session = await manager.create_session("client-1")
+        session.context.append("user", "Remember this.")
+        await manager.save_session(session)
+        # The client disconnected and reconnects to a worker without the session
+        manager.remove_session("client-1")
+
+        for token in (None, "wrong-token"):
+            with pytest.raises(ResumeTokenError):
+                await manager.create_session("client-1", resume_token=token)
+
+        restored = await manager.create_session("client-1", resume_token=session.resume_token)
+        assert restored is not session
+        assert restored.session_id == session.session_id
+        assert restored.resume_token == session.resume_token
+        assert [(m.role, m.content) for m in restored.context.messages] == [("user", "Remember this.")]
+
+        # A live session is only handed out for its token as well
+        with pytest.raises(ResumeTokenError):
+            await manager.create_session("client-1", resume_token="wrong-token")
+        assert await manager.create_session("client-1", resume_token=session.resume_token) is restored
+
+    asyncio.run(run())